@@ -18,6 +18,22 @@ SPEED_LIMIT = 19.5    # limit worker speed to this many SPEED_UNITs per hour
 # Provide more accounts than the product of your grid to allow swapping.
 GRID = (4, 4)  # rows, columns
 
+# Park workers (no requests, session kept) during minutes with few known
+# spawns and wake them ahead of busy ones. AUTOSCALE_RATE is how many known
+# spawns a worker is expected to handle per minute, the busiest minute within
+# AUTOSCALE_LOOKAHEAD minutes decides how many workers are active.
+# With AUTOSCALE_MAX above the size of GRID, extra accounts are started as
+# additional workers when needed and retired when they are not.
+#AUTOSCALE = False
+#AUTOSCALE_RATE = 4
+#AUTOSCALE_LOOKAHEAD = 2
+#AUTOSCALE_MIN = GRID[0] * GRID[1] // 4
+#AUTOSCALE_MAX = GRID[0] * GRID[1]
+
+# Walk idle workers toward the areas with the most known spawns due in the
+# next 1-3 minutes, no faster than SPEED_LIMIT and without any requests
+#REPOSITION_IDLE = False
+
 # the corner points of a rectangle for your workers to spread out over before
 # any spawn points have been discovered
 MAP_START = (40.7913, -111.9398)
@@ -39,6 +55,25 @@ SKIP_SPAWN = 90      # don't even try to find a worker for a spawn if the spawn
 # this will reduce the grouping of workers around the last few mysteries
 #RESCAN_UNKNOWN = 90
 
+# Aim for 90% of known spawns to be visited within this many seconds after
+# they spawn by adjusting how early workers are looked for in each region,
+# GIVE_UP_KNOWN and COROUTINES_LIMIT (up to twice the configured value).
+# Changes are logged. 0 to disable.
+#LATENESS_TARGET = 0
+
+# Log records are written by a separate thread. Records that don't fit in
+# its queue are dropped and counted rather than slowing down the scanner.
+#LOG_QUEUE_SIZE = 10000
+# Log at most this many INFO and DEBUG records with the same message per
+# logger per minute, the rest are counted as rate limited. 0 to disable.
+#LOG_RATE_LIMIT = 0
+
+# Measure how late the event loop runs callbacks and log the stack of
+# whatever blocks it for longer than this many seconds. Lag percentiles
+# are shown in the status. Disabled by default, 0.25 is a good start
+# when looking for what stalls the scanner.
+#LOOP_LAG_THRESHOLD = 0
+
 # filename of accounts CSV
 ACCOUNTS_CSV = 'accounts.csv'
 
@@ -63,6 +98,22 @@ GOOD_ENOUGH = 0.1
 # Seconds to sleep after failing to find an eligible worker before trying again.
 SEARCH_SLEEP = 2.5
 
+# Keep worker locations in NumPy arrays and compute the speed of every worker
+# to a point in one pass, always picking the slowest (GOOD_ENOUGH is ignored).
+# Worthwhile with thousands of workers, requires numpy.
+#VECTORIZE_SPEEDS = False
+
+# Save spawns as NumPy arrays in pickles/spawns instead of spawns.pickle,
+# loaded through mmap on start and used without converting known spawns into
+# Python objects. Worthwhile with hundreds of thousands of spawn points,
+# requires numpy.
+#SPAWNS_SNAPSHOT = False
+
+# Skip visiting a point if another worker's visit within this many seconds
+# (and after the spawn time, for known spawns) was within 50 meters of it.
+# Each skipped visit saves a hash. 0 disables.
+#FRESHNESS_WINDOW = 0
+
 ## alternatively define a Polygon to use as boundaries (requires shapely)
 ## if BOUNDARIES is set, STAY_WITHIN_MAP will be ignored
 ## more information available in the shapely manual:
@@ -81,6 +132,11 @@ SEARCH_SLEEP = 2.5
 # value: how many requests to keep as spare (0.1 = 10%), False to disable
 #SMART_THROTTLE = 0.1
 
+# When the hashes left in the current period can't cover every known spawn
+# due before it ends, skip mysteries and the spawn points whose past
+# sightings were least rare (uses a week of sightings)
+#SHED_LOW_VALUE = False
+
 # Swap the worker that has seen the fewest Pokémon every x seconds
 # Defaults to whatever will allow every worker to be swapped within 6 hours
 #SWAP_OLDEST = 300  # 5 minutes
@@ -100,6 +156,17 @@ INCUBATE_EGGS = True      # incubate eggs if available
 # None will never encounter Pokémon
 ENCOUNTER = None
 #ENCOUNTER_IDS = (3, 6, 9, 45, 62, 71, 80, 85, 87, 89, 91, 94, 114, 130, 131, 134)
+# Encounters are queued for the nearest idle worker instead of holding up the
+# visit. Give up if no worker was free after this many seconds, or 15 seconds
+# before the Pokémon despawns. Notifications wait for the encounter.
+#ENCOUNTER_WAIT = 60
+
+# Gym details (name, image and defenders) are fetched by idle workers within
+# range of a changed gym instead of holding up the visit that saw the change.
+# If none was free in time, the worker that saw it fetches them once it is,
+# as long as it is still in range.
+#GYM_DETAILS_WAIT = 60       # wait this long for an idle worker before falling back to the one that saw the gym
+#GYM_DETAILS_INTERVAL = 300  # request details for the same gym at most once every n seconds
 
 # PokéStops
 SPIN_POKESTOPS = True  # spin all PokéStops that are within range
@@ -209,9 +276,21 @@ FAILURES_ALLOWED = 2
 #MANAGER_ADDRESS = ('127.0.0.1', 5002)  # could be used for CAPTCHA solving and live worker maps on remote systems
 
 # Store the cell IDs so that they don't have to be recalculated every visit.
-# Enabling will (potentially drastically) increase memory usage.
+# They are kept in memory-mapped files in DIRECTORY/pickles (cells.idx and
+# cells.dat) that other scanners using the same DIRECTORY can read, only
+# the first one to start adds to them. An existing cells.pickle is imported.
 #CACHE_CELLS = False
 
+# Record every GetMapObjects response to segment files in DIRECTORY/captures
+# so they can be fed back through scripts/replay_gmo.py for benchmarking.
+#CAPTURE_GMO = False
+
+# Send each cell's timestamp from the previous response so GetMapObjects only
+# returns forts that changed since then, asking for everything again when a
+# cell hasn't had a full response in this many seconds. Forts left out of a
+# partial response aren't spun. 0 always requests full cells.
+#CELL_FULL_REFRESH = 0
+
 # Only for use with web_sanic (requires PostgreSQL)
 #DB = {'host': '127.0.0.1', 'user': 'monocle_role', 'password': 'pik4chu', 'port': '5432', 'database': 'monocle'}
 
@@ -0,0 +1,135 @@
+from gzip import open as gzip_open
+from struct import Struct
+from time import time
+
+from . import db
+
+MAGIC = b'MSPB\x01'
+# creation time, number of spawn points, number of mystery ranges
+HEADER = Struct('<dII')
+# spawn_id, lat, lon, despawn_time (-1 if unknown), duration (0 if unknown), updated
+SPAWN = Struct('<qddhBI')
+# spawn_id, earliest first_seconds, latest last_seconds
+MYSTERY = Struct('<qhh')
+
+
+def export_bundle(path, within=None):
+    """Write spawn points and their mystery ranges to a gzipped bundle
+
+    within, if given, is a callable deciding which points to include.
+    Returns the number of spawn points and mystery ranges written.
+    """
+    with db.session_scope() as session:
+        spawn_ids = set()
+        spawn_records = []
+        for spawn in session.query(db.Spawnpoint):
+            point = spawn.lat, spawn.lon
+            if within and not within(point):
+                continue
+            spawn_ids.add(spawn.spawn_id)
+            spawn_records.append(SPAWN.pack(
+                spawn.spawn_id, spawn.lat, spawn.lon,
+                -1 if spawn.despawn_time is None else spawn.despawn_time,
+                spawn.duration or 0, spawn.updated or 0))
+        mystery_records = [MYSTERY.pack(spawn_id, first, last)
+                           for spawn_id, (first, last) in db.get_mystery_ranges(session).items()
+                           if spawn_id in spawn_ids and first is not None]
+
+    with gzip_open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(HEADER.pack(time(), len(spawn_records), len(mystery_records)))
+        f.writelines(spawn_records)
+        f.writelines(mystery_records)
+    return len(spawn_records), len(mystery_records)
+
+
+def read_bundle(path):
+    """Returns the creation time, the spawn point rows, and a dict of
+    {spawn_id: (first_seconds, last_seconds)}"""
+    with gzip_open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError('{} is not a spawn point bundle.'.format(path))
+        created, spawn_count, mystery_count = HEADER.unpack(f.read(HEADER.size))
+        spawnpoints = []
+        for spawn_id, lat, lon, despawn_time, duration, updated in SPAWN.iter_unpack(
+                f.read(SPAWN.size * spawn_count)):
+            spawnpoints.append({
+                'spawn_id': spawn_id,
+                'lat': lat,
+                'lon': lon,
+                'despawn_time': None if despawn_time == -1 else despawn_time,
+                'duration': duration or None,
+                'updated': updated or None,
+                'failures': 0
+            })
+        mysteries = {spawn_id: (first, last) for spawn_id, first, last in MYSTERY.iter_unpack(
+            f.read(MYSTERY.size * mystery_count))}
+    return created, spawnpoints, mysteries
+
+
+def import_spawnpoints(spawnpoints, batch=5000):
+    """Bulk insert spawn points that aren't in the DB yet and update the
+    ones the bundle has newer information for
+
+    Returns the number of spawn points inserted and updated.
+    """
+    with db.session_scope() as session:
+        existing = {spawn_id: (row_id, row_updated or 0) for row_id, spawn_id, row_updated
+                    in session.query(db.Spawnpoint.id, db.Spawnpoint.spawn_id, db.Spawnpoint.updated)}
+        inserts = []
+        updates = []
+        for spawn in spawnpoints:
+            try:
+                row_id, row_updated = existing[spawn['spawn_id']]
+            except KeyError:
+                inserts.append(spawn)
+                continue
+            if (spawn['updated'] or 0) > row_updated:
+                updates.append(dict(spawn, id=row_id))
+        for i in range(0, len(inserts), batch):
+            session.bulk_insert_mappings(db.Spawnpoint, inserts[i:i + batch])
+        for i in range(0, len(updates), batch):
+            session.bulk_update_mappings(db.Spawnpoint, updates[i:i + batch])
+    return len(inserts), len(updates)
+
+
+def import_mystery_ranges(mysteries, imported, batch=5000):
+    """Store imported ranges in the mystery_ranges table, apart from the
+    sightings so that they are never taken for a single sighting's window
+
+    imported is the time the ranges were recorded at, ranges from a bundle
+    created before LAST_MIGRATION are ignored like old sightings. Rows from
+    an earlier import are widened. Returns the number of rows inserted and
+    updated.
+    """
+    with db.session_scope() as session:
+        existing = {spawn_id: (row_id, first, last) for row_id, spawn_id, first, last in session.query(
+                        db.MysteryRange.id, db.MysteryRange.spawn_id,
+                        db.MysteryRange.first_seconds, db.MysteryRange.last_seconds)}
+        inserts = []
+        updates = []
+        for spawn_id, (first, last) in mysteries.items():
+            try:
+                row_id, row_first, row_last = existing[spawn_id]
+            except KeyError:
+                inserts.append({
+                    'spawn_id': spawn_id,
+                    'first_seconds': first,
+                    'last_seconds': last,
+                    'imported': int(imported)
+                })
+                continue
+            first = min(first, row_first)
+            last = max(last, row_last)
+            if first != row_first or last != row_last:
+                updates.append({
+                    'id': row_id,
+                    'first_seconds': first,
+                    'last_seconds': last,
+                    'imported': int(imported)
+                })
+        for i in range(0, len(inserts), batch):
+            session.bulk_insert_mappings(db.MysteryRange, inserts[i:i + batch])
+        for i in range(0, len(updates), batch):
+            session.bulk_update_mappings(db.MysteryRange, updates[i:i + batch])
+    return len(inserts), len(updates)
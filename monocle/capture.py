@@ -0,0 +1,109 @@
+from os import mkdir, listdir
+from os.path import join, isdir, getsize
+from struct import Struct
+from time import time
+
+from . import sanitized as conf
+from .shared import get_logger
+
+try:
+    from aiopogo.pogoprotos.networking.responses.get_map_objects_response_pb2 import GetMapObjectsResponse
+except ImportError:
+    GetMapObjectsResponse = None
+
+
+MAGIC = b'MGMO\x01'
+# latitude, longitude, unix time of the response, length of the payload
+RECORD = Struct('<dddI')
+SEGMENT_SIZE = 64 * 1024 * 1024
+
+
+def get_folder():
+    folder = join(conf.DIRECTORY, 'captures')
+    try:
+        mkdir(folder)
+    except FileExistsError:
+        pass
+    except Exception as e:
+        raise OSError("Failed to create 'captures' folder, please create it manually") from e
+    return folder
+
+
+class CaptureWriter:
+    """Append GetMapObjects responses to compact segment files
+
+    Each segment starts with MAGIC, followed by records made of a fixed
+    RECORD header and the serialized GetMapObjects response. A new segment
+    is started once the current one exceeds SEGMENT_SIZE.
+    """
+    def __init__(self, segment_size=SEGMENT_SIZE):
+        self.folder = get_folder()
+        self.segment_size = segment_size
+        self.log = get_logger('capture')
+        self.file = None
+        self.written = 0
+        self.records = 0
+
+    def open_segment(self):
+        self.close()
+        location = join(self.folder, 'gmo-{:.0f}.seg'.format(time() * 1000))
+        self.file = open(location, 'wb', buffering=1048576)
+        self.file.write(MAGIC)
+        self.written = len(MAGIC)
+        self.log.info('Capturing GetMapObjects responses to {}', location)
+
+    def add(self, point, timestamp, map_objects):
+        try:
+            payload = map_objects.SerializeToString()
+            if self.file is None or self.written > self.segment_size:
+                self.open_segment()
+            self.file.write(RECORD.pack(point[0], point[1], timestamp, len(payload)))
+            self.file.write(payload)
+            self.written += RECORD.size + len(payload)
+            self.records += 1
+        except Exception:
+            self.log.exception('Failed to capture GetMapObjects response.')
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def segment_paths(paths):
+    """Expand directories into the segment files they contain, oldest first"""
+    for path in paths:
+        if isdir(path):
+            for name in sorted(listdir(path)):
+                if name.endswith('.seg'):
+                    yield join(path, name)
+        else:
+            yield path
+
+
+def read_segment(location):
+    """Yield (point, timestamp, raw bytes) for every record in a segment"""
+    with open(location, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError('{} is not a GetMapObjects capture segment.'.format(location))
+        size = getsize(location)
+        position = len(MAGIC)
+        while position + RECORD.size <= size:
+            lat, lon, timestamp, length = RECORD.unpack(f.read(RECORD.size))
+            payload = f.read(length)
+            if len(payload) < length:
+                # segment was truncated while being written
+                break
+            position += RECORD.size + length
+            yield (lat, lon), timestamp, payload
+
+
+def read_captures(paths):
+    """Yield (point, timestamp, GetMapObjectsResponse) from capture segments"""
+    if GetMapObjectsResponse is None:
+        raise ImportError('aiopogo is required to parse GetMapObjects captures.')
+    for location in segment_paths(paths):
+        for point, timestamp, payload in read_segment(location):
+            map_objects = GetMapObjectsResponse()
+            map_objects.ParseFromString(payload)
+            yield point, timestamp, map_objects
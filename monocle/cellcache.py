@@ -0,0 +1,245 @@
+from array import array
+from bisect import bisect_left
+from heapq import merge
+from mmap import mmap, ACCESS_READ
+from os import mkdir, remove, replace, stat
+from os.path import join
+from struct import Struct, error as StructError
+
+try:
+    from fcntl import flock, LOCK_EX, LOCK_NB
+except ImportError:
+    flock = None
+
+from .shared import get_logger, run_threaded, LOOP
+from .utils import load_pickle, round_coords
+from . import sanitized as conf
+
+HEADER = Struct('<4sI')
+MAGIC = b'MCI1'
+
+
+def pack_point(point):
+    """Pack a point rounded to 4 decimal places into a sortable integer"""
+    return ((round(point[0] * 10000) + 900000) << 32) | (round(point[1] * 10000) + 1800000)
+
+
+class CellCache:
+    """S2 cell IDs for rounded points, stored in memory-mapped files
+
+    cells.idx holds a header, the sorted packed points, and for each point an
+    entry of (offset << 16 | count) into cells.dat, which holds the cell IDs
+    as uint64 and is only ever appended to. Points that are not in the files
+    yet are kept in memory until enough have accumulated, then appended to
+    cells.dat and merged into a new cells.idx which atomically replaces the
+    old one.
+
+    Only the process holding cells.lock writes, other scanners sharing the
+    same DIRECTORY map the files read-only and pick up new points when the
+    index is replaced.
+    """
+    def __init__(self, get_cell_ids, batch=2048):
+        self.get_cell_ids = get_cell_ids
+        self.batch = batch
+        self.next_compaction = batch
+        self.log = get_logger('cellcache')
+        self.folder = join(conf.DIRECTORY, 'pickles')
+        self.index_path = join(self.folder, 'cells.idx')
+        self.data_path = join(self.folder, 'cells.dat')
+        self.pending = {}
+        self.compacting = False
+        self.maps = ()
+        self.keys = self.entries = self.data = ()
+        self.mtime = None
+        try:
+            mkdir(self.folder)
+        except FileExistsError:
+            pass
+        self.writer = self.lock()
+        self.open()
+        if not self.keys and self.writer:
+            self.import_pickle()
+
+    def __len__(self):
+        return len(self.keys) + len(self.pending)
+
+    def lock(self):
+        self.lock_file = open(join(self.folder, 'cells.lock'), 'a')
+        if flock is None:
+            return True
+        try:
+            flock(self.lock_file.fileno(), LOCK_EX | LOCK_NB)
+            return True
+        except OSError:
+            self.log.warning('Cell cache is locked by another process, using it read-only.')
+            self.lock_file.close()
+            self.lock_file = None
+            return False
+
+    def import_pickle(self):
+        cells = load_pickle('cells')
+        if cells:
+            self.log.warning('Importing {} points from cells.pickle.', len(cells))
+            for point, cell_ids in cells.items():
+                self.pending[pack_point(point)] = cell_ids
+
+    def open(self):
+        self.release()
+        maps = []
+        views = []
+        try:
+            self.mtime = stat(self.index_path).st_mtime
+            with open(self.index_path, 'rb') as f:
+                maps.append(mmap(f.fileno(), 0, access=ACCESS_READ))
+            magic, count = HEADER.unpack_from(maps[0])
+            if magic != MAGIC or len(maps[0]) < HEADER.size + count * 16:
+                raise ValueError('invalid header')
+            if not count:
+                maps[0].close()
+                return
+            with open(self.data_path, 'rb') as f:
+                maps.append(mmap(f.fileno(), 0, access=ACCESS_READ))
+            views.append(memoryview(maps[0]))
+            start = HEADER.size
+            middle = start + count * 8
+            views.append(views[0][start:middle].cast('Q'))
+            views.append(views[0][middle:middle + count * 8].cast('Q'))
+            views.append(memoryview(maps[1]))
+            views.append(views[3].cast('Q'))
+        except (FileNotFoundError, ValueError, TypeError, StructError) as e:
+            for view in reversed(views):
+                view.release()
+            for m in maps:
+                m.close()
+            # an index that exists but is damaged or lacks its data file
+            if maps or not isinstance(e, FileNotFoundError):
+                self.rebuild()
+            return
+        self.maps = tuple(maps)
+        self.keys, self.entries, self.data = views[1], views[2], views[4]
+
+    def rebuild(self):
+        """Start over with empty files, the writer fills them again"""
+        self.log.warning('The cell cache files are damaged, rebuilding them.')
+        if not self.writer:
+            return
+        for path in (self.index_path, self.data_path):
+            try:
+                remove(path)
+            except FileNotFoundError:
+                pass
+
+    def release(self):
+        for view in (self.keys, self.entries, self.data):
+            if isinstance(view, memoryview):
+                view.release()
+        for m in self.maps:
+            m.close()
+        self.maps = ()
+        self.keys = self.entries = self.data = ()
+
+    def get(self, point):
+        rounded = round_coords(point, 4)
+        key = pack_point(rounded)
+        try:
+            return self.pending[key]
+        except KeyError:
+            pass
+        keys = self.keys
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            entry = self.entries[i]
+            offset = entry >> 16
+            return self.data[offset:offset + (entry & 0xffff)].tolist()
+        cells = self.get_cell_ids(rounded)
+        self.pending[key] = cells
+        if len(self.pending) >= self.next_compaction and not self.compacting:
+            # set here since many points are looked up before the task starts
+            self.compacting = True
+            LOOP.create_task(self.compact())
+        return cells
+
+    def read_index(self):
+        """Load the index as it currently is on disk"""
+        try:
+            with open(self.index_path, 'rb') as f:
+                magic, count = HEADER.unpack(f.read(HEADER.size))
+                if magic != MAGIC:
+                    raise ValueError('invalid header')
+                keys = array('Q')
+                entries = array('Q')
+                keys.fromfile(f, count)
+                entries.fromfile(f, count)
+                return keys, entries
+        except (FileNotFoundError, ValueError, EOFError, StructError):
+            return array('Q'), array('Q')
+
+    def write(self, snapshot):
+        """Append new cells to the data file and write a merged index
+
+        Returns the location of the new index, which still has to replace
+        the current one.
+        """
+        keys, entries = self.read_index()
+        new = []
+        with open(self.data_path, 'ab') as f:
+            offset = f.seek(0, 2) // 8
+            for key in sorted(snapshot):
+                i = bisect_left(keys, key)
+                if i < len(keys) and keys[i] == key:
+                    continue
+                cells = array('Q', snapshot[key])
+                cells.tofile(f)
+                new.append((key, offset << 16 | len(cells)))
+                offset += len(cells)
+
+        merged_keys = array('Q')
+        merged_entries = array('Q')
+        for key, entry in merge(zip(keys, entries), new):
+            merged_keys.append(key)
+            merged_entries.append(entry)
+
+        location = self.index_path + '.tmp'
+        with open(location, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, len(merged_keys)))
+            merged_keys.tofile(f)
+            merged_entries.tofile(f)
+        return location
+
+    async def compact(self):
+        self.compacting = True
+        try:
+            snapshot = self.pending.copy()
+            if self.writer:
+                location = await run_threaded(self.write, snapshot)
+                self.release()
+                replace(location, self.index_path)
+                self.open()
+            elif stat(self.index_path).st_mtime != self.mtime:
+                self.open()
+            else:
+                return
+            for key in snapshot:
+                i = bisect_left(self.keys, key)
+                if i < len(self.keys) and self.keys[i] == key:
+                    del self.pending[key]
+        except FileNotFoundError:
+            if not self.maps:
+                self.open()
+        except Exception:
+            self.log.exception('Failed to compact the cell cache.')
+            self.open()
+        finally:
+            self.next_compaction = len(self.pending) + self.batch
+            self.compacting = False
+
+    def close(self):
+        try:
+            if self.writer and self.pending:
+                location = self.write(self.pending)
+                self.release()
+                replace(location, self.index_path)
+        finally:
+            self.release()
+            if self.lock_file is not None:
+                self.lock_file.close()
@@ -2,6 +2,7 @@ from datetime import datetime
 from collections import OrderedDict
 from contextlib import contextmanager
 from enum import Enum
+from math import log2
 from time import time, mktime
 
 from sqlalchemy import Column, Integer, String, Float, Boolean, SmallInteger, BigInteger, ForeignKey, UniqueConstraint, create_engine, cast, func, desc, asc, and_, exists
@@ -10,6 +11,7 @@ from sqlalchemy.types import TypeDecorator, Numeric, Text
 from sqlalchemy.ext.declarative import declarative_base
 
 from . import bounds, spawns, db_proc, sanitized as conf
+from .records import MysteryRecord, MysteryUpdateRecord
 from .utils import time_until_time, dump_pickle, load_pickle
 from .shared import call_at, get_logger
 
@@ -81,7 +83,7 @@ class Team(Enum):
 
 
 def combine_key(sighting):
-    return sighting['encounter_id'], sighting['spawn_id']
+    return sighting.encounter_id, sighting.spawn_id
 
 
 class SightingCache:
@@ -97,8 +99,8 @@ class SightingCache:
         return len(self.store)
 
     def add(self, sighting):
-        self.store[sighting['spawn_id']] = sighting['expire_timestamp']
-        call_at(sighting['expire_timestamp'], self.remove, sighting['spawn_id'])
+        self.store[sighting.spawn_id] = sighting.expire_timestamp
+        call_at(sighting.expire_timestamp, self.remove, sighting.spawn_id)
 
     def remove(self, spawn_id):
         try:
@@ -108,10 +110,10 @@ class SightingCache:
 
     def __contains__(self, raw_sighting):
         try:
-            expire_timestamp = self.store[raw_sighting['spawn_id']]
+            expire_timestamp = self.store[raw_sighting.spawn_id]
             return (
-                expire_timestamp > raw_sighting['expire_timestamp'] - 2 and
-                expire_timestamp < raw_sighting['expire_timestamp'] + 2)
+                expire_timestamp > raw_sighting.expire_timestamp - 2 and
+                expire_timestamp < raw_sighting.expire_timestamp + 2)
         except KeyError:
             return False
 
@@ -130,8 +132,8 @@ class MysteryCache:
 
     def add(self, sighting):
         key = combine_key(sighting)
-        self.store[combine_key(sighting)] = [sighting['seen']] * 2
-        call_at(sighting['seen'] + 3510, self.remove, key)
+        self.store[key] = [sighting.seen] * 2
+        call_at(sighting.seen + 3510, self.remove, key)
 
     def __contains__(self, raw_sighting):
         key = combine_key(raw_sighting)
@@ -139,28 +141,122 @@ class MysteryCache:
             first, last = self.store[key]
         except (KeyError, TypeError):
             return False
-        new_time = raw_sighting['seen']
+        new_time = raw_sighting.seen
         if new_time > last:
             self.store[key][1] = new_time
         return True
 
+    def touch(self, key, seen):
+        try:
+            times = self.store[key]
+        except KeyError:
+            return False
+        if seen > times[1]:
+            times[1] = seen
+        return True
+
     def remove(self, key):
         first, last = self.store[key]
         del self.store[key]
         if last != first:
             encounter_id, spawn_id = key
-            db_proc.add({
-                'type': 'mystery-update',
-                'spawn': spawn_id,
-                'encounter': encounter_id,
-                'first': first,
-                'last': last
-            })
+            db_proc.add(MysteryUpdateRecord(spawn_id, encounter_id, first, last))
 
     def items(self):
         return self.store.items()
 
 
+class MysteryTimes:
+    """Earliest first and latest last seconds of mystery sightings by spawn_id
+
+    Holds what get_first_last would return for every spawn point, so that
+    remaining times can be estimated without a query. Kept up to date by
+    add_mystery and update_mystery, and merged with the DB on every load.
+    """
+    def __init__(self):
+        self.store = {}
+        self.loaded = False
+
+    def __len__(self):
+        return len(self.store)
+
+    def extend(self, spawn_id, first, last):
+        try:
+            times = self.store[spawn_id]
+        except KeyError:
+            self.store[spawn_id] = [first, last]
+            return
+        if first < times[0]:
+            times[0] = first
+        if last > times[1]:
+            times[1] = last
+
+    def load(self, ranges):
+        """Merge ranges from get_mystery_ranges, sightings added since the
+        query was made may not be committed yet so nothing is replaced"""
+        for spawn_id, (first, last) in ranges.items():
+            if first is not None:
+                self.extend(spawn_id, first, last)
+        self.loaded = True
+
+    def get(self, spawn_id):
+        try:
+            return tuple(self.store[spawn_id])
+        except KeyError:
+            return None, None
+
+
+class RepeatCache:
+    """Cache for recognizing repeat sightings before they are normalized
+
+    Keyed on the raw encounter_id and spawn_point_id so that Pokemon that have
+    already been queued for the DB can be skipped without building a dict.
+    Entries are removed when the sighting expires.
+    """
+    def __init__(self):
+        self.store = {}
+
+    def __len__(self):
+        return len(self.store)
+
+    def add(self, raw, sighting):
+        key = raw.encounter_id, raw.spawn_point_id
+        if sighting.__class__ is MysteryRecord:
+            self.store[key] = (None, sighting.spawn_id, combine_key(sighting))
+            call_at(sighting.seen + 3510, self.remove, key)
+        else:
+            expire_ms = None if sighting.inferred else sighting.expire_timestamp * 1000
+            self.store[key] = (expire_ms, sighting.spawn_id, None)
+            call_at(sighting.expire_timestamp, self.remove, key)
+
+    def remove(self, key):
+        try:
+            del self.store[key]
+        except KeyError:
+            pass
+
+    def check(self, raw):
+        """Return the normalized spawn_id of a repeat sighting, or None"""
+        try:
+            expire_ms, spawn_id, mystery_key = self.store[raw.encounter_id, raw.spawn_point_id]
+        except KeyError:
+            return None
+        tth = raw.time_till_hidden_ms
+        if tth > 0 and tth <= 90000:
+            # a valid time_till_hidden teaches us the despawn time, so
+            # mysteries and inferred sightings have to take the slow path
+            if expire_ms is None:
+                return None
+            expire_diff = raw.last_modified_timestamp_ms + tth - expire_ms
+            if expire_diff > 2000 or expire_diff < -2000:
+                return None
+        elif mystery_key is not None:
+            seen = round(raw.last_modified_timestamp_ms / 1000)
+            if not MYSTERY_CACHE.touch(mystery_key, seen):
+                return None
+        return spawn_id
+
+
 class RaidCache:
     """Simple cache for storing actual raids
 
@@ -174,8 +270,8 @@ class RaidCache:
         return len(self.store)
 
     def add(self, raid):
-        self.store[raid['fort_external_id']] = raid
-        call_at(raid['time_end'], self.remove, raid['fort_external_id'])
+        self.store[raid.fort_external_id] = raid.time_end, raid.pokemon_id
+        call_at(raid.time_end, self.remove, raid.fort_external_id)
 
     def remove(self, cache_id):
         try:
@@ -185,12 +281,12 @@ class RaidCache:
 
     def __contains__(self, raw_fort):
         try:
-            raid = self.store[raw_fort.id]
+            time_end, pokemon_id = self.store[raw_fort.id]
             if raw_fort.raid_info.raid_pokemon:
                 return (
-                    raid['time_end'] > raw_fort.raid_info.raid_end_ms // 1000 - 2 and
-                    raid['time_end'] < raw_fort.raid_info.raid_end_ms // 1000 + 2 and
-                    raid['pokemon_id'] == raw_fort.raid_info.raid_pokemon.pokemon_id)
+                    time_end > raw_fort.raid_info.raid_end_ms // 1000 - 2 and
+                    time_end < raw_fort.raid_info.raid_end_ms // 1000 + 2 and
+                    pokemon_id == raw_fort.raid_info.raid_pokemon.pokemon_id)
             return True
         except KeyError:
             return False
@@ -204,11 +300,7 @@ class RaidCache:
                 fort = session.query(Fort) \
                     .filter(Fort.id == raid.fort_id) \
                     .scalar()
-                r = {}
-                r['fort_external_id'] = fort.external_id
-                r['time_end'] = raid.time_end
-                r['pokemon_id'] = raid.pokemon_id
-                self.store[r['fort_external_id']] = r
+                self.store[fort.external_id] = raid.time_end, raid.pokemon_id
 
 
 class PokestopCache:
@@ -221,16 +313,16 @@ class PokestopCache:
         return len(self.store)
 
     def add(self, pokestop):
-        self.store[pokestop['external_id']] = pokestop
+        self.store[pokestop.external_id] = pokestop
 
     def __contains__(self, pokestop):
         if pokestop.id in self.store:
             p = self.store[pokestop.id]
-            if (p['lat'] == pokestop.latitude and
-                p['lon'] == pokestop.longitude):
+            if (p.lat == pokestop.latitude and
+                p.lon == pokestop.longitude):
                 if 501 in pokestop.active_fort_modifier: #501 is the code for lure
                     lure_start = pokestop.last_modified_timestamp_ms // 1000
-                    return p['lure_start'] == lure_start
+                    return p.lure_start == lure_start
                 else:
                     return True
         return False
@@ -247,7 +339,7 @@ class GymCache:
         return len(self.gyms)
 
     def add(self, sighting):
-        self.gyms[sighting['external_id']] = sighting['last_modified']
+        self.gyms[sighting.external_id] = sighting.last_modified
 
     def __contains__(self, sighting):
         try:
@@ -285,7 +377,7 @@ class WeatherCache:
         return len(self.store)
 
     def add(self, weather):
-        self.store[weather['s2_cell_id']] = weather
+        self.store[weather.s2_cell_id] = weather
 
     def remove(self, cache_id):
         try:
@@ -295,17 +387,19 @@ class WeatherCache:
 
     def __contains__(self, raw_weather):
         try:
-            weather = self.store[raw_weather['s2_cell_id']]
-            return (weather['condition'] == raw_weather['condition'] and
-                weather['alert_severity'] == raw_weather['alert_severity'] and
-                weather['warn'] == raw_weather['warn'] and
-                weather['day'] == raw_weather['day'])
+            weather = self.store[raw_weather.s2_cell_id]
+            return (weather.condition == raw_weather.condition and
+                weather.alert_severity == raw_weather.alert_severity and
+                weather.warn == raw_weather.warn and
+                weather.day == raw_weather.day)
         except KeyError:
             return False
 
 
 SIGHTING_CACHE = SightingCache()
 MYSTERY_CACHE = MysteryCache()
+MYSTERY_TIMES = MysteryTimes()
+REPEAT_CACHE = RepeatCache()
 POKESTOP_CACHE = PokestopCache()
 GYM_CACHE = GymCache()
 RAID_CACHE = RaidCache()
@@ -414,6 +508,22 @@ class Mystery(Base):
     )
 
 
+class MysteryRange(Base):
+    """Range a mystery spawn was seen in by another scanner, imported from
+    a spawn bundle, kept apart from the sightings it was aggregated from"""
+    __tablename__ = 'mystery_ranges'
+
+    id = Column(Integer, primary_key=True)
+    spawn_id = Column(HUGE_TYPE, unique=True, index=True)
+    first_seconds = Column(SmallInteger)
+    last_seconds = Column(SmallInteger)
+    imported = Column(Integer)
+
+
+# newer than the other tables, so create it for DBs made before it existed
+MysteryRange.__table__.create(_engine, checkfirst=True)
+
+
 class Spawnpoint(Base):
     __tablename__ = 'spawnpoints'
 
@@ -535,27 +645,27 @@ def add_sighting(session, pokemon):
     if pokemon in SIGHTING_CACHE:
         return
     if session.query(exists().where(and_(
-                Sighting.expire_timestamp == pokemon['expire_timestamp'],
-                Sighting.encounter_id == pokemon['encounter_id']))
+                Sighting.expire_timestamp == pokemon.expire_timestamp,
+                Sighting.encounter_id == pokemon.encounter_id))
             ).scalar():
         SIGHTING_CACHE.add(pokemon)
         return
     obj = Sighting(
-        pokemon_id=pokemon['pokemon_id'],
-        spawn_id=pokemon['spawn_id'],
-        encounter_id=pokemon['encounter_id'],
-        expire_timestamp=pokemon['expire_timestamp'],
-        lat=pokemon['lat'],
-        lon=pokemon['lon'],
-        atk_iv=pokemon.get('individual_attack'),
-        def_iv=pokemon.get('individual_defense'),
-        sta_iv=pokemon.get('individual_stamina'),
-        move_1=pokemon.get('move_1'),
-        move_2=pokemon.get('move_2'),
-        display=pokemon.get('display'),
-        gender=pokemon.get('gender', 0),
-        cp=pokemon.get('cp'),
-        level=pokemon.get('level')
+        pokemon_id=pokemon.pokemon_id,
+        spawn_id=pokemon.spawn_id,
+        encounter_id=pokemon.encounter_id,
+        expire_timestamp=pokemon.expire_timestamp,
+        lat=pokemon.lat,
+        lon=pokemon.lon,
+        atk_iv=getattr(pokemon, 'individual_attack', None),
+        def_iv=getattr(pokemon, 'individual_defense', None),
+        sta_iv=getattr(pokemon, 'individual_stamina', None),
+        move_1=getattr(pokemon, 'move_1', None),
+        move_2=getattr(pokemon, 'move_2', None),
+        display=getattr(pokemon, 'display', None),
+        gender=getattr(pokemon, 'gender', 0),
+        cp=getattr(pokemon, 'cp', None),
+        level=getattr(pokemon, 'level', None)
     )
     session.add(obj)
     SIGHTING_CACHE.add(pokemon)
@@ -563,7 +673,7 @@ def add_sighting(session, pokemon):
 
 def add_gym_defenders(session, fort_internal_id, gym_defenders, raw_fort):
 
-    fort = session.query(Fort).filter(Fort.external_id==raw_fort['external_id']).first()
+    fort = session.query(Fort).filter(Fort.external_id==raw_fort.external_id).first()
     fort_internal_id = fort.id
 
     session.query(GymDefender).filter(
@@ -572,23 +682,23 @@ def add_gym_defenders(session, fort_internal_id, gym_defenders, raw_fort):
     for gym_defender in gym_defenders:
         obj = GymDefender(
             fort_id=fort_internal_id,
-            external_id=gym_defender['external_id'],
-            pokemon_id=gym_defender['pokemon_id'],
-            owner_name=gym_defender['owner_name'],
-            nickname=gym_defender['nickname'],
-            cp=gym_defender['cp'],
-            stamina=gym_defender['stamina'],
-            stamina_max=gym_defender['stamina_max'],
-            atk_iv=gym_defender['atk_iv'],
-            def_iv=gym_defender['def_iv'],
-            sta_iv=gym_defender['sta_iv'],
-            move_1=gym_defender['move_1'],
-            move_2=gym_defender['move_2'],
-            team=raw_fort.get('team', 0),
-            last_modified=raw_fort['last_modified'],
-            battles_attacked=gym_defender['battles_attacked'],
-            battles_defended=gym_defender['battles_defended'],
-            num_upgrades=gym_defender['num_upgrades'],
+            external_id=gym_defender.external_id,
+            pokemon_id=gym_defender.pokemon_id,
+            owner_name=gym_defender.owner_name,
+            nickname=gym_defender.nickname,
+            cp=gym_defender.cp,
+            stamina=gym_defender.stamina,
+            stamina_max=gym_defender.stamina_max,
+            atk_iv=gym_defender.atk_iv,
+            def_iv=gym_defender.def_iv,
+            sta_iv=gym_defender.sta_iv,
+            move_1=gym_defender.move_1,
+            move_2=gym_defender.move_2,
+            team=raw_fort.team,
+            last_modified=raw_fort.last_modified,
+            battles_attacked=gym_defender.battles_attacked,
+            battles_defended=gym_defender.battles_defended,
+            num_upgrades=gym_defender.num_upgrades,
             created=round(time()),
         )
         session.add(obj)
@@ -596,8 +706,8 @@ def add_gym_defenders(session, fort_internal_id, gym_defenders, raw_fort):
 
 def add_spawnpoint(session, pokemon):
     # Check if the same entry already exists
-    spawn_id = pokemon['spawn_id']
-    new_time = pokemon['expire_timestamp'] % 3600
+    spawn_id = pokemon.spawn_id
+    new_time = pokemon.expire_timestamp % 3600
     try:
         if new_time == spawns.despawn_times[spawn_id]:
             return
@@ -607,7 +717,7 @@ def add_spawnpoint(session, pokemon):
         .filter(Spawnpoint.spawn_id == spawn_id) \
         .first()
     now = round(time())
-    point = pokemon['lat'], pokemon['lon']
+    point = pokemon.lat, pokemon.lon
     spawns.add_known(spawn_id, new_time, point)
     if existing:
         existing.updated = now
@@ -630,8 +740,8 @@ def add_spawnpoint(session, pokemon):
         session.add(Spawnpoint(
             spawn_id=spawn_id,
             despawn_time=new_time,
-            lat=pokemon['lat'],
-            lon=pokemon['lon'],
+            lat=pokemon.lat,
+            lon=pokemon.lon,
             updated=now,
             duration=duration,
             failures=0
@@ -640,8 +750,8 @@ def add_spawnpoint(session, pokemon):
 
 def add_mystery_spawnpoint(session, pokemon):
     # Check if the same entry already exists
-    spawn_id = pokemon['spawn_id']
-    point = pokemon['lat'], pokemon['lon']
+    spawn_id = pokemon.spawn_id
+    point = pokemon.lat, pokemon.lon
     if point in spawns.unknown or session.query(exists().where(
             Spawnpoint.spawn_id == spawn_id)).scalar():
         return
@@ -649,15 +759,15 @@ def add_mystery_spawnpoint(session, pokemon):
     session.add(Spawnpoint(
         spawn_id=spawn_id,
         despawn_time=None,
-        lat=pokemon['lat'],
-        lon=pokemon['lon'],
+        lat=pokemon.lat,
+        lon=pokemon.lon,
         updated=0,
         duration=None,
         failures=0
     ))
 
     if point in bounds:
-        spawns.add_unknown(point)
+        spawns.add_unknown(point, spawn_id)
 
 
 def add_mystery(session, pokemon):
@@ -665,67 +775,92 @@ def add_mystery(session, pokemon):
         return
     add_mystery_spawnpoint(session, pokemon)
     existing = session.query(Mystery) \
-        .filter(Mystery.encounter_id == pokemon['encounter_id']) \
-        .filter(Mystery.spawn_id == pokemon['spawn_id']) \
+        .filter(Mystery.encounter_id == pokemon.encounter_id) \
+        .filter(Mystery.spawn_id == pokemon.spawn_id) \
         .first()
     if existing:
         key = combine_key(pokemon)
-        MYSTERY_CACHE.store[key] = [existing.first_seen, pokemon['seen']]
+        MYSTERY_CACHE.store[key] = [existing.first_seen, pokemon.seen]
         return
-    seconds = pokemon['seen'] % 3600
+    seconds = pokemon.seen % 3600
     obj = Mystery(
-        pokemon_id=pokemon['pokemon_id'],
-        spawn_id=pokemon['spawn_id'],
-        encounter_id=pokemon['encounter_id'],
-        lat=pokemon['lat'],
-        lon=pokemon['lon'],
-        first_seen=pokemon['seen'],
+        pokemon_id=pokemon.pokemon_id,
+        spawn_id=pokemon.spawn_id,
+        encounter_id=pokemon.encounter_id,
+        lat=pokemon.lat,
+        lon=pokemon.lon,
+        first_seen=pokemon.seen,
         first_seconds=seconds,
         last_seconds=seconds,
         seen_range=0,
-        atk_iv=pokemon.get('individual_attack'),
-        def_iv=pokemon.get('individual_defense'),
-        sta_iv=pokemon.get('individual_stamina'),
-        move_1=pokemon.get('move_1'),
-        move_2=pokemon.get('move_2')
+        atk_iv=getattr(pokemon, 'individual_attack', None),
+        def_iv=getattr(pokemon, 'individual_defense', None),
+        sta_iv=getattr(pokemon, 'individual_stamina', None),
+        move_1=getattr(pokemon, 'move_1', None),
+        move_2=getattr(pokemon, 'move_2', None)
     )
     session.add(obj)
     MYSTERY_CACHE.add(pokemon)
+    if pokemon.seen > conf.LAST_MIGRATION:
+        MYSTERY_TIMES.extend(pokemon.spawn_id, seconds, seconds)
+
+
+def add_encounter(session, encounter):
+    if encounter.expire_timestamp is None:
+        obj = session.query(Mystery) \
+            .filter(Mystery.encounter_id == encounter.encounter_id) \
+            .filter(Mystery.spawn_id == encounter.spawn_id) \
+            .first()
+    else:
+        obj = session.query(Sighting) \
+            .filter(Sighting.encounter_id == encounter.encounter_id) \
+            .filter(Sighting.expire_timestamp == encounter.expire_timestamp) \
+            .first()
+    if not obj:
+        return
+    obj.atk_iv = encounter.individual_attack
+    obj.def_iv = encounter.individual_defense
+    obj.sta_iv = encounter.individual_stamina
+    obj.move_1 = encounter.move_1
+    obj.move_2 = encounter.move_2
+    obj.gender = encounter.gender
+    obj.cp = encounter.cp
+    obj.level = encounter.level
 
 
 def add_fort_sighting(session, raw_fort):
     # Check if fort exists
     fort = session.query(Fort) \
-        .filter(Fort.external_id == raw_fort['external_id']) \
+        .filter(Fort.external_id == raw_fort.external_id) \
         .first()
     if not fort:
         fort = Fort(
-            external_id=raw_fort['external_id'],
-            lat=raw_fort['lat'],
-            lon=raw_fort['lon'],
-            name=raw_fort['name'],
-            url=raw_fort['url']
+            external_id=raw_fort.external_id,
+            lat=raw_fort.lat,
+            lon=raw_fort.lon,
+            name=raw_fort.name,
+            url=raw_fort.url
         )
         session.add(fort)
 
     if fort.id and session.query(exists().where(and_(
                 FortSighting.fort_id == fort.id,
-                FortSighting.last_modified == raw_fort['last_modified']
+                FortSighting.last_modified == raw_fort.last_modified
             ))).scalar():
         # Why is it not in the cache? It should be there!
         GYM_CACHE.add(raw_fort)
         return
 
-    if fort.id and ( 'gym_defenders' in raw_fort and len(raw_fort['gym_defenders']) > 0 ):
-            add_gym_defenders(session, fort.id, raw_fort['gym_defenders'], raw_fort)
+    if fort.id and raw_fort.gym_defenders:
+        add_gym_defenders(session, fort.id, raw_fort.gym_defenders, raw_fort)
 
     obj = FortSighting(
         fort=fort,
-        team=raw_fort['team'],
-        prestige=raw_fort['prestige'],
-        guard_pokemon_id=raw_fort['guard_pokemon_id'],
-        last_modified=raw_fort['last_modified'],
-        slots_available=raw_fort['slots_available'],
+        team=raw_fort.team,
+        prestige=raw_fort.prestige,
+        guard_pokemon_id=raw_fort.guard_pokemon_id,
+        last_modified=raw_fort.last_modified,
+        slots_available=raw_fort.slots_available,
         updated=int(time())
     )
     session.add(obj)
@@ -734,73 +869,73 @@ def add_fort_sighting(session, raw_fort):
 
 def add_raid(session, raw_raid):
     fort = session.query(Fort) \
-        .filter(Fort.external_id == raw_raid['fort_external_id']) \
+        .filter(Fort.external_id == raw_raid.fort_external_id) \
         .first()
     if not fort:
         fort = Fort(
-            external_id=raw_raid['fort_external_id'],
-            lat=raw_raid['lat'],
-            lon=raw_raid['lon'],
+            external_id=raw_raid.fort_external_id,
+            lat=raw_raid.lat,
+            lon=raw_raid.lon,
         )
         session.add(fort)
 
     raid = session.query(Raid) \
-        .filter(Raid.external_id == raw_raid['external_id']) \
+        .filter(Raid.external_id == raw_raid.external_id) \
         .first()
     if fort.id and raid:
-        if raid.pokemon_id == 0 and raw_raid['pokemon_id'] != 0:
-            raid.pokemon_id = raw_raid['pokemon_id']
-            raid.move_1 = raw_raid['move_1']
-            raid.move_2 = raw_raid['move_2']
+        if raid.pokemon_id == 0 and raw_raid.pokemon_id != 0:
+            raid.pokemon_id = raw_raid.pokemon_id
+            raid.move_1 = raw_raid.move_1
+            raid.move_2 = raw_raid.move_2
         # Why is it not in the cache? It should be there!
         RAID_CACHE.add(raw_raid)
         return
 
     raid = Raid(
-        external_id=raw_raid['external_id'],
+        external_id=raw_raid.external_id,
         fort=fort,
-        level=raw_raid['level'],
-        pokemon_id=raw_raid['pokemon_id'],
-        move_1=raw_raid['move_1'],
-        move_2=raw_raid['move_2'],
-        time_spawn=raw_raid['time_spawn'],
-        time_battle=raw_raid['time_battle'],
-        time_end=raw_raid['time_end'],
-        cp=raw_raid['cp']
+        level=raw_raid.level,
+        pokemon_id=raw_raid.pokemon_id,
+        move_1=raw_raid.move_1,
+        move_2=raw_raid.move_2,
+        time_spawn=raw_raid.time_spawn,
+        time_battle=raw_raid.time_battle,
+        time_end=raw_raid.time_end,
+        cp=raw_raid.cp
     )
     session.add(raid)
     RAID_CACHE.add(raw_raid)
 
 
 def add_pokestop(session, raw_pokestop):
-    pokestop_id = raw_pokestop['external_id']
+    pokestop_id = raw_pokestop.external_id
     pokestop = session.query(Pokestop) \
         .filter(Pokestop.external_id == pokestop_id) \
         .first()
     if pokestop:
-        pokestop.lat = raw_pokestop['lat']
-        pokestop.lon = raw_pokestop['lon']
-        pokestop.lure_start = raw_pokestop['lure_start']
-        pokestop.name = raw_pokestop['name']
-        pokestop.url = raw_pokestop['url']
+        pokestop.lat = raw_pokestop.lat
+        pokestop.lon = raw_pokestop.lon
+        pokestop.lure_start = raw_pokestop.lure_start
+        pokestop.name = raw_pokestop.name
+        pokestop.url = raw_pokestop.url
         # Why is it not in the cache? It should be there!
         POKESTOP_CACHE.add(raw_pokestop)
         return
 
     pokestop = Pokestop(
         external_id=pokestop_id,
-        lat=raw_pokestop['lat'],
-        lon=raw_pokestop['lon'],
-        lure_start=raw_pokestop['lure_start'],
-        name=raw_pokestop['name'],
-        url=raw_pokestop['url']
+        lat=raw_pokestop.lat,
+        lon=raw_pokestop.lon,
+        lure_start=raw_pokestop.lure_start,
+        name=raw_pokestop.name,
+        url=raw_pokestop.url
     )
     session.add(pokestop)
     POKESTOP_CACHE.add(raw_pokestop)
 
 
 def add_weather(session, raw_weather):
-    s2_cell_id = raw_weather['s2_cell_id']
+    s2_cell_id = raw_weather.s2_cell_id
 
     weather = session.query(Weather) \
         .filter(Weather.s2_cell_id == s2_cell_id) \
@@ -808,17 +943,17 @@ def add_weather(session, raw_weather):
     if not weather:
         weather = Weather(
             s2_cell_id=s2_cell_id,
-            condition=raw_weather['condition'],
-            alert_severity=raw_weather['alert_severity'],
-            warn=raw_weather['warn'],
-            day=raw_weather['day']
+            condition=raw_weather.condition,
+            alert_severity=raw_weather.alert_severity,
+            warn=raw_weather.warn,
+            day=raw_weather.day
         )
         session.add(weather)
     else:
-        weather.condition = raw_weather['condition']
-        weather.alert_severity = raw_weather['alert_severity']
-        weather.warn = raw_weather['warn']
-        weather.day = raw_weather['day']
+        weather.condition = raw_weather.condition
+        weather.alert_severity = raw_weather.alert_severity
+        weather.warn = raw_weather.warn
+        weather.day = raw_weather.day
     WEATHER_CACHE.add(raw_weather)
 
 
@@ -849,14 +984,16 @@ def update_failures(session, spawn_id, success, allowed=conf.FAILURES_ALLOWED):
 
 def update_mystery(session, mystery):
     encounter = session.query(Mystery) \
-                .filter(Mystery.spawn_id == mystery['spawn']) \
-                .filter(Mystery.encounter_id == mystery['encounter']) \
+                .filter(Mystery.spawn_id == mystery.spawn) \
+                .filter(Mystery.encounter_id == mystery.encounter) \
                 .first()
     if not encounter:
         return
     hour = encounter.first_seen - (encounter.first_seen % 3600)
-    encounter.last_seconds = mystery['last'] - hour
-    encounter.seen_range = mystery['last'] - mystery['first']
+    encounter.last_seconds = mystery.last - hour
+    encounter.seen_range = mystery.last - mystery.first
+    if encounter.first_seen > conf.LAST_MIGRATION:
+        MYSTERY_TIMES.extend(mystery.spawn, encounter.first_seconds, encounter.last_seconds)
 
 
 def get_pokestops(session):
@@ -934,6 +1071,88 @@ def get_first_last(session, spawn_id):
         .first()
 
 
+def get_mystery_ranges(session):
+    """Earliest first and latest last seconds of every mystery spawn,
+    including ranges imported from spawn bundles"""
+    ranges = {spawn_id: (first, last) for spawn_id, first, last in session.query(
+                  MysteryRange.spawn_id, MysteryRange.first_seconds, MysteryRange.last_seconds)
+              .filter(MysteryRange.imported > conf.LAST_MIGRATION)}
+    query = session.query(Mystery.spawn_id, func.min(Mystery.first_seconds), func.max(Mystery.last_seconds)) \
+        .filter(Mystery.first_seen > conf.LAST_MIGRATION) \
+        .group_by(Mystery.spawn_id)
+    for spawn_id, first, last in query:
+        try:
+            imported_first, imported_last = ranges[spawn_id]
+        except KeyError:
+            ranges[spawn_id] = first, last
+            continue
+        if first is not None:
+            ranges[spawn_id] = min(first, imported_first), max(last, imported_last)
+    return ranges
+
+
+def get_unknown_windows(session, batch=50000):
+    """spawn_id, first_seconds and last_seconds of every mystery sighting of
+    a spawn point that is still unknown, fetched batch rows at a time"""
+    unknown = session.query(Spawnpoint.spawn_id) \
+        .filter(Spawnpoint.updated.is_(None) | (Spawnpoint.updated <= conf.LAST_MIGRATION))
+    return session.query(Mystery.spawn_id, Mystery.first_seconds, Mystery.last_seconds) \
+        .filter(Mystery.first_seen > conf.LAST_MIGRATION) \
+        .filter(Mystery.spawn_id.in_(unknown.subquery())) \
+        .filter(Mystery.last_seconds.isnot(None)) \
+        .yield_per(batch)
+
+
+def update_inferred_spawnpoints(session, inferred, batch=5000, chunk=500):
+    """Mark spawn points as known in bulk from {spawn_id: (despawn_time,
+    duration)}, returns how many were updated"""
+    spawn_ids = list(inferred)
+    now = round(time())
+    mappings = []
+    # in chunks to stay below SQLite's limit on query parameters
+    for i in range(0, len(spawn_ids), chunk):
+        for row_id, spawn_id in session.query(Spawnpoint.id, Spawnpoint.spawn_id) \
+                .filter(Spawnpoint.spawn_id.in_(spawn_ids[i:i + chunk])):
+            despawn_time, duration = inferred[spawn_id]
+            mappings.append({
+                'id': row_id,
+                'despawn_time': despawn_time,
+                'duration': duration or None,
+                'updated': now,
+                'failures': 0
+            })
+    for i in range(0, len(mappings), batch):
+        session.bulk_update_mappings(Spawnpoint, mappings[i:i + batch])
+    return len(mappings)
+
+
+def load_mystery_times():
+    with session_scope() as session:
+        MYSTERY_TIMES.load(get_mystery_ranges(session))
+
+
+def get_spawn_values(session, history=604800):
+    """How rare the Pokemon seen at each spawn point were on average
+
+    A species making up a share p of all sightings is worth -log2(p), a
+    spawn point is worth the mean of its sightings.
+    """
+    query = session.query(Sighting.spawn_id, Sighting.pokemon_id, func.count(Sighting.id)) \
+        .filter(Sighting.expire_timestamp > time() - history) \
+        .group_by(Sighting.spawn_id, Sighting.pokemon_id)
+    rows = query.all()
+    species = {}
+    for _, pokemon_id, count in rows:
+        species[pokemon_id] = species.get(pokemon_id, 0) + count
+    total = sum(species.values())
+    values = {}
+    counts = {}
+    for spawn_id, pokemon_id, count in rows:
+        values[spawn_id] = values.get(spawn_id, 0) - count * log2(species[pokemon_id] / total)
+        counts[spawn_id] = counts.get(spawn_id, 0) + count
+    return {spawn_id: value / counts[spawn_id] for spawn_id, value in values.items()}
+
+
 def get_widest_range(session, spawn_id):
     return session.query(func.max(Mystery.seen_range)) \
         .filter(Mystery.spawn_id == spawn_id) \
@@ -941,8 +1160,8 @@ def get_widest_range(session, spawn_id):
         .scalar()
 
 
-def estimate_remaining_time(session, spawn_id, seen):
-    first, last = get_first_last(session, spawn_id)
+def estimate_remaining_time(spawn_id, seen):
+    first, last = MYSTERY_TIMES.get(spawn_id)
 
     if not first:
         return 90, 1800
@@ -5,6 +5,7 @@ from threading import Thread
 from time import sleep
 
 from . import db
+from .records import SightingRecord, MysteryRecord, FortRecord, RaidRecord, PokestopRecord, WeatherRecord, TargetRecord, MysteryUpdateRecord, EncounterRecord
 from .shared import get_logger, LOOP
 
 class DatabaseProcessor(Thread):
@@ -23,45 +24,54 @@ class DatabaseProcessor(Thread):
     def stop(self):
         self.update_mysteries()
         self.running = False
-        self.queue.put({'type': False})
+        self.queue.put(None)
 
     def add(self, obj):
         self.queue.put(obj)
 
+    def add_sighting(self, session, item):
+        db.add_sighting(session, item)
+        self.count += 1
+        if not item.inferred:
+            db.add_spawnpoint(session, item)
+
+    def add_mystery(self, session, item):
+        db.add_mystery(session, item)
+        self.count += 1
+
+    def update_failures(self, session, item):
+        db.update_failures(session, item.spawn_id, item.seen)
+
+    def get_handlers(self):
+        """Map each record class to a function(session, item) that saves it"""
+        return {
+            SightingRecord: self.add_sighting,
+            MysteryRecord: self.add_mystery,
+            RaidRecord: db.add_raid,
+            FortRecord: db.add_fort_sighting,
+            PokestopRecord: db.add_pokestop,
+            WeatherRecord: db.add_weather,
+            TargetRecord: self.update_failures,
+            MysteryUpdateRecord: db.update_mystery,
+            EncounterRecord: db.add_encounter
+        }
+
     def run(self):
         session = db.Session()
+        handlers = self.get_handlers()
         LOOP.call_soon_threadsafe(self.commit)
 
         while self.running or not self.queue.empty():
             try:
                 item = self.queue.get()
-                if not 'type' in item:
-                    item['type'] = False
-                else:
-                    item_type = item['type']
-
-                if item_type == 'pokemon':
-                    db.add_sighting(session, item)
-                    self.count += 1
-                    if not item['inferred']:
-                        db.add_spawnpoint(session, item)
-                elif item_type == 'mystery':
-                    db.add_mystery(session, item)
-                    self.count += 1
-                elif item_type == 'raid':
-                    db.add_raid(session, item)
-                elif item_type == 'fort':
-                    db.add_fort_sighting(session, item)
-                elif item_type == 'pokestop':
-                    db.add_pokestop(session, item)
-                elif item_type == 'weather':
-                    db.add_weather(session, item)
-                elif item_type == 'target':
-                    db.update_failures(session, item['spawn_id'], item['seen'])
-                elif item_type == 'mystery-update':
-                    db.update_mystery(session, item)
-                elif item_type is False:
+                if item is None:
                     break
+                try:
+                    handler = handlers[item.__class__]
+                except KeyError:
+                    self.log.error('Unknown item type: {}', item.__class__.__name__)
+                    continue
+                handler(session, item)
                 self.log.debug('Item saved to db')
                 if self._commit:
                     session.commit()
@@ -86,13 +96,6 @@ class DatabaseProcessor(Thread):
            first, last = times
            if last != first:
                encounter_id, spawn_id = key
-               mystery = {
-                   'type': 'mystery-update',
-                   'spawn': spawn_id,
-                   'encounter': encounter_id,
-                   'first': first,
-                   'last': last
-               }
-               self.add(mystery)
+               self.add(MysteryUpdateRecord(spawn_id, encounter_id, first, last))
 
 sys.modules[__name__] = DatabaseProcessor()
@@ -0,0 +1,302 @@
+from abc import ABC, abstractmethod
+from asyncio import sleep, CancelledError
+from time import time
+
+from pogeo import get_distance
+
+from .records import EncounterRecord
+from .shared import call_at, get_logger, LOOP
+from . import db_proc, sanitized as conf
+
+
+class Job:
+    """Something waiting for an idle worker"""
+    __slots__ = ('item', 'point', 'deadline', 'priority')
+
+    def __init__(self, item, point, deadline, priority):
+        self.item = item
+        self.point = point
+        self.deadline = deadline
+        self.priority = priority
+
+
+class GymJob(Job):
+    __slots__ = ('fallback', 'fetched')
+
+    def __init__(self, gym, deadline, priority, fallback):
+        super().__init__(gym, (gym.lat, gym.lon), deadline, priority)
+        self.fallback = fallback
+        self.fetched = False
+
+
+class EncounterJob(Job):
+    __slots__ = ('spawn_point_id', 'future', 'callback')
+
+    def __init__(self, sighting, spawn_point_id, deadline, future, callback):
+        super().__init__(sighting, (sighting.lat, sighting.lon), deadline, deadline)
+        self.spawn_point_id = spawn_point_id
+        self.future = future
+        self.callback = callback
+
+
+class EncounterCache:
+    """Encounter results by encounter_id, shared by every worker
+
+    Holds a future from the moment an encounter is queued, so a Pokemon seen
+    again before the first encounter finished waits for it instead of being
+    encountered twice. Successful results are kept until the Pokemon
+    despawns, failed ones are dropped so that it can be tried again.
+    """
+    fields = ('move_1', 'move_2', 'individual_attack', 'individual_defense',
+              'individual_stamina', 'gender', 'cp', 'level')
+
+    def __init__(self):
+        self.store = {}
+        self.hits = 0
+
+    def __len__(self):
+        return len(self.store)
+
+    def get(self, encounter_id):
+        return self.store.get(encounter_id)
+
+    def add(self, sighting):
+        encounter_id = sighting.encounter_id
+        future = LOOP.create_future()
+        self.store[encounter_id] = future
+        try:
+            expires = sighting.expire_timestamp
+        except AttributeError:
+            expires = sighting.seen + 3600
+        call_at(expires, self.remove, encounter_id, future)
+        return future
+
+    def remove(self, encounter_id, future):
+        if self.store.get(encounter_id) is future:
+            del self.store[encounter_id]
+
+    def copy(self, result, sighting):
+        for field in self.fields:
+            setattr(sighting, field, getattr(result, field))
+
+
+class WorkerQueue(ABC):
+    """Jobs served by the nearest idle worker that can reach them
+
+    Jobs with the lowest priority value are offered first. Subclasses decide
+    whether a worker can reach a job, what serving it involves, and how to
+    finish a job, which happens exactly once whether it was served, failed,
+    or nobody was available before its deadline.
+    """
+    def __init__(self, name):
+        self.log = get_logger(name)
+        self.jobs = {}
+        self.running = True
+        self.served = 0
+        self.expired = 0
+
+    def __len__(self):
+        return len(self.jobs)
+
+    async def run(self, workers, interval=conf.SEARCH_SLEEP):
+        while self.running:
+            if self.jobs:
+                try:
+                    self.dispatch(workers)
+                except Exception:
+                    self.log.exception('An exception occurred while dispatching.')
+            await sleep(interval, loop=LOOP)
+
+    def dispatch(self, workers):
+        now = time()
+        idle = [w for w in workers if not w.busy.locked() and w.authenticated]
+        for key, job in sorted(self.jobs.items(), key=lambda j: j[1].priority):
+            if job.deadline < now:
+                del self.jobs[key]
+                self.expired += 1
+                self.expire(key, job)
+            elif idle:
+                worker = min(idle, key=lambda w: get_distance(w.location, job.point))
+                if self.reachable(worker, job):
+                    del self.jobs[key]
+                    idle.remove(worker)
+                    LOOP.create_task(self.serve_job(worker, key, job))
+
+    async def serve_job(self, worker, key, job):
+        requeued = False
+        try:
+            async with worker.busy:
+                # another scheduler may have taken and moved the worker
+                # before it was free again
+                if not self.reachable(worker, job):
+                    if key not in self.jobs and self.running:
+                        self.jobs[key] = job
+                        requeued = True
+                    return
+                await self.serve(worker, job)
+            self.served += 1
+        except CancelledError:
+            raise
+        except Exception as e:
+            self.log.warning('{} while serving job for worker {}',
+                             e.__class__.__name__, worker.worker_no)
+        finally:
+            if not requeued:
+                self.finish(job)
+
+    def expire(self, key, job):
+        """Called for jobs nobody was available for before their deadline"""
+        self.finish(job)
+
+    def close(self):
+        """Stop dispatching and finish every job that is still waiting"""
+        self.running = False
+        for job in self.jobs.values():
+            self.finish(job)
+        self.jobs.clear()
+
+    @abstractmethod
+    def reachable(self, worker, job):
+        """Whether worker can get to job in time"""
+
+    @abstractmethod
+    async def serve(self, worker, job):
+        """Do the job with worker, which is held busy meanwhile"""
+
+    @abstractmethod
+    def finish(self, job):
+        """Runs once for every job that leaves the queue"""
+
+
+class GymQueue(WorkerQueue):
+    """Changed gyms waiting for a worker in range to fetch their details
+
+    Gyms whose details were fetched least recently go first. A gym is only
+    queued again once GYM_DETAILS_INTERVAL has passed since its last
+    request; changes seen before then are saved without details. When no
+    idle worker got to a gym in time, the worker that saw it fetches the
+    details once it is free, if it is still in range.
+    """
+    def __init__(self):
+        super().__init__('gym-queue')
+        self.fetched = {}
+        self.next_prune = 0
+        self.skipped = 0
+        self.dropped = 0
+
+    def put(self, gym, fallback=None, wait=conf.GYM_DETAILS_WAIT,
+            interval=conf.GYM_DETAILS_INTERVAL):
+        gym_id = gym.external_id
+        try:
+            # replace a queued gym with the most recent sighting of it
+            self.jobs[gym_id].item = gym
+            return
+        except KeyError:
+            pass
+        now = time()
+        if now > self.next_prune:
+            self.fetched = {k: v for k, v in self.fetched.items() if now - v < interval}
+            self.next_prune = now + interval
+        last_fetched = self.fetched.get(gym_id, 0)
+        if now - last_fetched < interval:
+            self.skipped += 1
+            db_proc.add(gym)
+            return
+        deadline = now + wait
+        self.jobs[gym_id] = GymJob(gym, deadline, (last_fetched, deadline), fallback)
+
+    def reachable(self, worker, job, speed_limit=conf.SPEED_LIMIT):
+        return (get_distance(worker.location, job.point) < 240
+                and worker.travel_speed(job.point) < speed_limit)
+
+    async def serve(self, worker, job):
+        self.fetched[job.item.external_id] = time()
+        await worker.gym_get_info(job.item)
+        job.fetched = True
+
+    def expire(self, key, job):
+        worker = job.fallback
+        # only once, serve_job puts the job back if the worker moved away
+        job.fallback = None
+        if worker is not None and self.running and self.reachable(worker, job):
+            LOOP.create_task(self.serve_job(worker, key, job))
+        else:
+            self.finish(job)
+
+    def finish(self, job):
+        if not job.fetched:
+            self.dropped += 1
+            self.log.info('Saving gym {} without details, no worker in range was free.',
+                          job.item.external_id)
+        db_proc.add(job.item)
+
+
+class EncounterQueue(WorkerQueue):
+    """Sightings waiting for a worker within SPEED_LIMIT to encounter them
+
+    The sighting is saved right after it is queued, its IVs and moves are
+    added by an EncounterRecord once the encounter succeeds. Sightings
+    closest to their deadline go first, and a callback (used for
+    notifications) runs once the encounter succeeds, fails or runs out of
+    time. Pokemon already in the results cache are never queued again.
+    """
+    def __init__(self):
+        super().__init__('encounter-queue')
+        self.results = EncounterCache()
+
+    def put(self, sighting, spawn_point_id, callback=None,
+            wait=conf.ENCOUNTER_WAIT, margin=15):
+        encounter_id = sighting.encounter_id
+        future = self.results.get(encounter_id)
+        if future is not None:
+            self.results.hits += 1
+            if future.done():
+                result = future.result()
+                if result is not None:
+                    self.results.copy(result, sighting)
+                if callback:
+                    LOOP.create_task(callback())
+            else:
+                LOOP.create_task(self.follow(future, sighting, callback))
+            return
+        deadline = time() + wait
+        try:
+            deadline = min(deadline, sighting.expire_timestamp - margin)
+        except AttributeError:
+            pass
+        future = self.results.add(sighting)
+        self.jobs[encounter_id] = EncounterJob(
+            sighting, spawn_point_id, deadline, future, callback)
+
+    async def follow(self, future, sighting, callback):
+        """Wait for an encounter that was requested by an earlier sighting"""
+        result = await future
+        if result is not None:
+            self.results.copy(result, sighting)
+            if (result.__class__ is not sighting.__class__
+                    or getattr(result, 'expire_timestamp', None)
+                    != getattr(sighting, 'expire_timestamp', None)):
+                # saved as a different row than the first sighting
+                db_proc.add(EncounterRecord(sighting))
+        if callback:
+            await callback()
+
+    def reachable(self, worker, job, speed_limit=conf.SPEED_LIMIT):
+        return worker.travel_speed(job.point) < speed_limit
+
+    async def serve(self, worker, job):
+        await worker.encounter(job.item, job.spawn_point_id)
+        if hasattr(job.item, 'move_1'):
+            db_proc.add(EncounterRecord(job.item))
+            job.future.set_result(job.item)
+
+    def finish(self, job):
+        if not job.future.done():
+            self.results.remove(job.item.encounter_id, job.future)
+            job.future.set_result(None)
+        if job.callback:
+            LOOP.create_task(job.callback())
+
+
+GYM_QUEUE = GymQueue()
+ENCOUNTER_QUEUE = EncounterQueue()
@@ -0,0 +1,24 @@
+def hilbert_index(point, bounds, order=16):
+    """Position of point along a Hilbert curve filling the bounds
+
+    Points close to each other are close along the curve, so sorting by
+    this gives a route that rarely jumps across the map.
+    """
+    side = 1 << order
+    height = (bounds.north - bounds.south) or 1
+    width = (bounds.east - bounds.west) or 1
+    x = min(max(int((point[1] - bounds.west) / width * side), 0), side - 1)
+    y = min(max(int((point[0] - bounds.south) / height * side), 0), side - 1)
+    index = 0
+    s = side >> 1
+    while s:
+        rx = 1 if x & s else 0
+        ry = 1 if y & s else 0
+        index += s * s * ((3 * rx) ^ ry)
+        if not ry:
+            if rx:
+                x = side - 1 - x
+                y = side - 1 - y
+            x, y = y, x
+        s >>= 1
+    return index
@@ -0,0 +1,81 @@
+from itertools import islice
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError('Despawn time inference requires numpy.') from e
+
+
+def load_windows(rows, batch=50000):
+    """spawn_id, first_seconds and last_seconds from rows of mystery
+    sightings, such as db.get_unknown_windows, as arrays sorted by spawn_id"""
+    # only one batch of rows is held as tuples at a time
+    rows = iter(rows)
+    chunks = [np.empty((0, 3), dtype=np.int64)]
+    while True:
+        chunk = list(islice(rows, batch))
+        if not chunk:
+            break
+        chunks.append(np.array(chunk, dtype=np.int64))
+    rows = np.concatenate(chunks)
+    rows = rows[np.argsort(rows[:, 0], kind='mergesort')]
+    return rows[:, 0], rows[:, 1], rows[:, 2]
+
+
+def feasible(group, firsts, lasts, duration, groups):
+    """Seconds of the hour each group's despawn time can be at if its
+    Pokemon stay for duration seconds, as a (groups, 3600) bool array
+
+    A Pokemon seen from first to last despawns between last and first +
+    duration. Windows are counted on two laps of the hour so that those
+    wrapping around it need no special case, the seconds covered by every
+    window of a group are where its despawn time can be.
+    """
+    starts = lasts % 3600
+    lengths = np.clip(firsts + duration - lasts + 1, 0, 3600)
+    edges = np.zeros((groups, 7201), dtype=np.int32)
+    np.add.at(edges, (group, starts), 1)
+    np.add.at(edges, (group, starts + lengths), -1)
+    counts = edges.cumsum(axis=1)
+    counts = counts[:, :3600] + counts[:, 3600:7200]
+    return counts == np.bincount(group, minlength=groups)[:, np.newaxis]
+
+
+def infer(spawn_ids, firsts, lasts, min_sightings=3, tolerance=120, chunk=256):
+    """Despawn second and duration per spawn point from its sightings
+
+    Both durations are tried for every spawn point. A spawn point is only
+    inferred when its sightings rule out one of them, and narrow the other
+    down to a single window of at most tolerance seconds. Sightings alone
+    rule out 30 minutes once they are spread over more than half an hour,
+    but never rule out an hour, so in practice only hour spawns are found.
+
+    Returns arrays of spawn_id, despawn_time and duration (60 or 0) for the
+    spawn points inferred. The latest possible despawn time is used, so
+    that visits planned from it never come before the Pokemon appeared.
+    """
+    empty = np.empty(0, dtype=np.int64)
+    if not len(spawn_ids):
+        return empty, empty, empty
+    ids, starts, counts = np.unique(spawn_ids, return_index=True, return_counts=True)
+    found_ids = [empty]
+    despawn_times = [empty]
+    durations = [empty]
+    for i in range(0, len(ids), chunk):
+        # sightings of this chunk of spawn points, which are sorted by spawn_id
+        begin = starts[i]
+        end = starts[i + chunk] if i + chunk < len(ids) else len(spawn_ids)
+        group = np.repeat(np.arange(min(chunk, len(ids) - i)), counts[i:i + chunk])
+        half = feasible(group, firsts[begin:end], lasts[begin:end], 1800, len(counts[i:i + chunk]))
+        hour = feasible(group, firsts[begin:end], lasts[begin:end], 3600, len(counts[i:i + chunk]))
+        is_half = half.any(axis=1)
+        is_hour = hour.any(axis=1)
+        window = np.where(is_hour[:, np.newaxis], hour, half)
+        # a single window ends where a feasible second is followed by one that isn't
+        window_ends = window & ~np.roll(window, -1, axis=1)
+        found = ((counts[i:i + chunk] >= min_sightings) & (is_half != is_hour)
+                 & (window_ends.sum(axis=1) == 1) & (window.sum(axis=1) <= tolerance + 1))
+        found_ids.append(ids[i:i + chunk][found])
+        despawn_times.append(window_ends[found].argmax(axis=1).astype(np.int64))
+        durations.append(np.where(is_hour[found], 60, 0))
+    return np.concatenate(found_ids), np.concatenate(despawn_times), np.concatenate(durations)
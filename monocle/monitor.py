@@ -0,0 +1,113 @@
+import sys
+
+from asyncio import __file__ as asyncio_file
+from os.path import basename, dirname
+from threading import Thread, get_ident
+from time import monotonic, sleep
+from traceback import extract_stack, format_list
+from collections import deque
+
+from .shared import get_logger, LOOP
+from . import sanitized as conf
+
+ASYNCIO_DIR = dirname(asyncio_file)
+
+
+def percentile(ordered, p):
+    return ordered[min(int(len(ordered) * p), len(ordered) - 1)]
+
+
+class LoopMonitor(Thread):
+    """Measures event loop lag and records what blocks the loop
+
+    A callback scheduled every interval on the loop measures how late it
+    runs. This thread checks that the callback keeps coming around, and
+    captures the stack of the loop's thread when it hasn't for threshold
+    seconds. The blocking callback or task is logged with its stack once
+    the loop comes around again.
+    """
+    def __init__(self, threshold=conf.LOOP_LAG_THRESHOLD, interval=.1, history=600):
+        super().__init__(daemon=True)
+        self.threshold = threshold
+        self.interval = interval
+        self.lags = deque(maxlen=history)
+        self.blocked = deque(maxlen=20)
+        self.blocked_count = 0
+        self.log = get_logger('loopmonitor')
+        self.running = True
+        self.loop_thread = None
+        self.beat = monotonic()
+        self.depth = 0
+        # (beat, name, stack) of the stall since beat
+        self.captured = None
+
+    def start(self):
+        self.loop_thread = get_ident()
+        LOOP.call_soon(self.tick)
+        super().start()
+
+    def stop(self):
+        self.running = False
+
+    def tick(self, expected=None):
+        now = monotonic()
+        if expected is not None:
+            lag = now - expected
+            self.lags.append(lag)
+            captured = self.captured
+            if lag >= self.threshold and captured and captured[0] == self.beat:
+                _, name, stack = captured
+                self.blocked.append((lag, name))
+                self.blocked_count += 1
+                self.log.warning('Loop blocked for {:.0f}ms by {}\n{}',
+                                 lag * 1000, name, ''.join(format_list(stack)).rstrip())
+        self.captured = None
+        self.beat = now
+
+        # callbacks run at the same depth as this one
+        depth = 0
+        frame = sys._getframe(1)
+        while frame:
+            depth += 1
+            frame = frame.f_back
+        self.depth = depth
+
+        if self.running:
+            LOOP.call_later(self.interval, self.tick, now + self.interval)
+
+    def run(self):
+        while self.running:
+            sleep(self.threshold / 2)
+            beat = self.beat
+            if monotonic() - beat < self.threshold + self.interval:
+                continue
+            if self.captured and self.captured[0] == beat:
+                continue
+            frame = sys._current_frames().get(self.loop_thread)
+            if frame is None:
+                continue
+            stack = extract_stack(frame)[self.depth:]
+            # skip Task._step and the like to get to the coroutine
+            while len(stack) > 1 and stack[0].filename.startswith(ASYNCIO_DIR):
+                stack = stack[1:]
+            if not stack:
+                continue
+            entry = stack[0]
+            name = '{} ({}:{})'.format(entry.name, basename(entry.filename), entry.lineno)
+            self.captured = beat, name, stack
+
+    def status(self):
+        if not self.lags:
+            return 'Loop lag: -'
+        ordered = sorted(self.lags)
+        output = 'Loop lag: p50 {:.0f}ms, p90 {:.0f}ms, p99 {:.0f}ms, max {:.0f}ms, blocked {} times'.format(
+            *(x * 1000 for x in (percentile(ordered, .5), percentile(ordered, .9),
+                                 percentile(ordered, .99), ordered[-1])),
+            self.blocked_count)
+        if self.blocked:
+            lag, name = self.blocked[-1]
+            output += ', last {:.0f}ms by {}'.format(lag * 1000, name)
+        return output
+
+
+sys.modules[__name__] = LoopMonitor()
@@ -602,7 +602,7 @@ class Notifier:
         LOOP.call_later(3600, self.set_notify_ids)
 
     async def _set_notify_ids(self):
-        await run_threaded(self.set_ranking)
+        await run_threaded(self.set_ranking, pool='db')
         self.notify_ids = self.pokemon_ranking[0:self.notify_ranking]
         self.always_notify = set(self.pokemon_ranking[0:conf.ALWAYS_NOTIFY])
         self.always_notify |= set(conf.ALWAYS_NOTIFY_IDS)
@@ -730,8 +730,7 @@ class Notifier:
             seen = pokemon['seen'] % 3600
             cache_handle = self.cache.store.add(pokemon['encounter_id'])
             try:
-                with session_scope() as session:
-                    tth = await run_threaded(estimate_remaining_time, session, pokemon['spawn_id'], seen)
+                tth = estimate_remaining_time(pokemon['spawn_id'], seen)
             except Exception:
                 self.log.exception('An exception occurred while trying to estimate remaining time.')
                 now_epoch = time()
@@ -4,18 +4,25 @@ from statistics import median
 from sys import platform
 from cyrandom import shuffle
 from collections import deque
-from itertools import dropwhile
+from itertools import count, dropwhile
+from math import ceil
+from queue import Full
 from time import time, monotonic
 
 from aiopogo import HashServer
+from pogeo import get_distance
 from sqlalchemy.exc import OperationalError
 
-from .db import SIGHTING_CACHE, MYSTERY_CACHE, POKESTOP_CACHE, RAID_CACHE, GYM_CACHE
-from .utils import get_current_hour, dump_pickle, get_start_coords, get_bootstrap_points, randomize_point, best_factors, percentage_split
-from .shared import get_logger, LOOP, run_threaded, ACCOUNTS
-from . import bounds, db_proc, spawns, sanitized as conf
+from .db import SIGHTING_CACHE, MYSTERY_CACHE, MYSTERY_TIMES, POKESTOP_CACHE, RAID_CACHE, GYM_CACHE, REPEAT_CACHE, load_mystery_times
+from .dispatch import GYM_QUEUE, ENCOUNTER_QUEUE
+from .utils import get_current_hour, dump_pickle, get_start_coords, get_bootstrap_points, randomize_point, best_factors, percentage_split, round_coords
+from .shared import get_logger, LOOP, LOG_QUEUE, POOLS, run_threaded, ACCOUNTS
+from . import bounds, db_proc, monitor, spawns, sanitized as conf
 from .worker import Worker
 
+if conf.VECTORIZE_SPEEDS:
+    from .speeds import SPEEDS
+
 ANSI = '\x1b[2J\x1b[H'
 if platform == 'win32':
     try:
@@ -66,9 +73,25 @@ class Overseer:
         self.visits = 0
         self.coroutine_semaphore = Semaphore(conf.COROUTINES_LIMIT, loop=LOOP)
         self.redundant = 0
+        self.fresh = 0
+        self.shed = 0
+        self.threshold = None
+        self.next_threshold = 0
+        self.nudges = 0
+        # recent visit delays of workers that were or weren't repositioned
+        self.delays = {True: deque(maxlen=500), False: deque(maxlen=500)}
+        # controlled by control_lateness when LATENESS_TARGET is set
+        self.regions = {}
+        self.lateness = {}
+        self.leads = {}
+        self.give_up_known = conf.GIVE_UP_KNOWN
+        self.coroutines_limit = conf.COROUTINES_LIMIT
+        # slots still to be taken out of use since coroutines_limit was lowered
+        self.coroutines_withheld = 0
         self.running = True
         self.all_seen = False
         self.idle_seconds = 0
+        self.bootstrap_stats = None
         self.log.info('Overseer initialized')
         self.pokemon_found = ''
 
@@ -89,8 +112,15 @@ class Overseer:
             else:
                 self.extra_queue.put(account)
 
-        self.workers = tuple(Worker(worker_no=x) for x in range(conf.GRID[0] * conf.GRID[1]))
+        # never reused, so a retiring worker can't collide with its replacement
+        self.worker_numbers = count()
+        # a list so that workers can be added and retired while running
+        self.workers = [Worker(worker_no=next(self.worker_numbers))
+                        for _ in range(conf.GRID[0] * conf.GRID[1])]
         db_proc.start()
+        LOOP.create_task(GYM_QUEUE.run(self.workers))
+        if conf.ENCOUNTER:
+            LOOP.create_task(ENCOUNTER_QUEUE.run(self.workers))
         LOOP.call_later(10, self.update_count)
         LOOP.call_later(max(conf.SWAP_OLDEST, conf.MINIMUM_RUNTIME), self.swap_oldest)
         LOOP.call_soon(self.update_stats)
@@ -139,7 +169,7 @@ class Overseer:
             except Exception as e:
                 self.log.exception('A wild {} appeared in exit_progress!', e.__class__.__name__)
 
-    def update_stats(self, refresh=conf.STAT_REFRESH, med=median, count=conf.GRID[0] * conf.GRID[1]):
+    def update_stats(self, refresh=conf.STAT_REFRESH, med=median):
         visits = []
         seen_per_worker = []
         after_spawns = []
@@ -168,14 +198,14 @@ class Overseer:
         self.update_coroutines_count()
         self.counts = (
             'Known spawns: {}, unknown: {}, more: {}\n'
-            '{} workers, {} coroutines\n'
-            'sightings cache: {}, mystery cache: {}, DB queue: {}\n'
-            'pokestops cache: {}, gyms cache: {}, raids cache: {}\n'
+            '{} workers, {} parked, {} coroutines\n'
+            'sightings cache: {}, mystery cache: {}, repeat cache: {}, DB queue: {}\n'
+            'pokestops cache: {}, gyms cache: {}, raids cache: {}, gym queue: {}\n'
         ).format(
             len(spawns), len(spawns.unknown), spawns.cells_count,
-            count, self.coroutines_count,
-            len(SIGHTING_CACHE), len(MYSTERY_CACHE), len(db_proc),
-            len(POKESTOP_CACHE), len(GYM_CACHE), len(RAID_CACHE)
+            len(self.workers), sum(w.parked is not None for w in self.workers), self.coroutines_count,
+            len(SIGHTING_CACHE), len(MYSTERY_CACHE), len(REPEAT_CACHE), len(db_proc),
+            len(POKESTOP_CACHE), len(GYM_CACHE), len(RAID_CACHE), len(GYM_QUEUE)
         )
         LOOP.call_later(refresh, self.update_stats)
 
@@ -192,6 +222,7 @@ class Overseer:
         $ = spinning a PokéStop
         * = sending a notification
         ~ = encountering a Pokémon
+        P = parked, not needed for the spawns due (AUTOSCALE)
         I = initial, haven't done anything yet
         » = waiting to log in (limited by SIMULTANEOUS_LOGINS)
         ° = waiting to start app simulation (limited by SIMULTANEOUS_SIMULATION)
@@ -242,16 +273,28 @@ class Overseer:
             self.stats,
             self.pokemon_found,
             ('Visits: {}, per second: {:.2f}\n'
-             'Skipped: {}, unnecessary: {}').format(
+             'Skipped: {}, unnecessary: {}, recently scanned (hashes saved): {}').format(
                 self.visits, self.visits / seconds_since_start,
-                self.skipped, self.redundant)
+                self.skipped, self.redundant, self.fresh)
         ]
 
+        if self.bootstrap_stats:
+            stats = self.bootstrap_stats
+            output.append('Bootstrap cells converged: {}/{}, spawn points found: {}, per hash: {:.2f}'.format(
+                stats['converged'], stats['cells'], stats['found'],
+                stats['found'] / (stats['visits'] or 1)))
+
         try:
             seen = Worker.g['seen']
             captchas = Worker.g['captchas']
             output.append('Seen per visit: {v:.2f}, per minute: {m:.0f}'.format(
                 v=seen / self.visits, m=seen / (seconds_since_start / 60)))
+            repeats = Worker.g['repeats']
+            output.append('Repeat sightings skipped: {r}, {p:.1f}% of seen'.format(
+                r=repeats, p=repeats / seen * 100))
+            cells_skipped = Worker.g['cells_skipped']
+            output.append('Unchanged map cells skipped: {s}, {p:.1f}% of cells with forts'.format(
+                s=cells_skipped, p=cells_skipped / Worker.g['cells'] * 100))
 
             if captchas:
                 captchas_per_request = captchas / (self.visits / 1000)
@@ -262,6 +305,33 @@ class Overseer:
         except ZeroDivisionError:
             pass
 
+        for kind in ('full', 'partial'):
+            count, size, seconds = Worker.gmo_stats[kind]
+            if count:
+                output.append('GetMapObjects {}: {}, avg {:.1f}KB, processed in {:.2f}ms'.format(
+                    kind, count, size / count / 1024, seconds / count * 1000))
+
+        if conf.LATENESS_TARGET:
+            output.append('Lead times: {}, give up known after {}s, coroutines limit {}'.format(
+                ', '.join('{}s'.format(self.leads.get(r, 0)) for r in sorted(self.lateness)) or '-',
+                self.give_up_known, self.coroutines_limit))
+        if conf.REPOSITION_IDLE:
+            output.append('Idle workers repositioned: {}, visit delay med {}s after repositioning, {}s otherwise'.format(
+                self.nudges, *('{:.1f}'.format(median(d)) if d else '-'
+                               for d in (self.delays[True], self.delays[False]))))
+
+        if monitor.is_alive():
+            output.append(monitor.status())
+        output.append('Threads: ' + '; '.join(POOLS[name].status() for name in sorted(POOLS)))
+        if LOG_QUEUE.listener:
+            output.append(LOG_QUEUE.status())
+        output.append('Gym details fetched: {}, expired: {}, saved without details: {}, within refresh interval: {}'.format(
+            GYM_QUEUE.served, GYM_QUEUE.expired, GYM_QUEUE.dropped, GYM_QUEUE.skipped))
+        if conf.ENCOUNTER:
+            output.append('Encounters: {}, expired: {}, queued: {}, shared results: {}'.format(
+                ENCOUNTER_QUEUE.served, ENCOUNTER_QUEUE.expired, len(ENCOUNTER_QUEUE),
+                ENCOUNTER_QUEUE.results.hits))
+
         try:
             hash_status = HashServer.status
             output.append('Hashes: {}/{}, refresh in {:.0f}'.format(
@@ -269,6 +339,9 @@ class Overseer:
                 hash_status['maximum'],
                 hash_status['period'] - time()
             ))
+            if conf.SHED_LOW_VALUE:
+                output.append('Low value spawns shed: {}, minimum value: {}'.format(
+                    self.shed, 'none' if self.threshold is None else '{:.2f}'.format(self.threshold)))
         except (KeyError, TypeError):
             pass
 
@@ -300,7 +373,7 @@ class Overseer:
         print('\n'.join(output))
 
     def longest_running(self):
-        workers = (x for x in self.workers if x.start_time)
+        workers = (x for x in self.workers if x.start_time and x.parked is None)
         worker = next(workers)
         earliest = worker.start_time
         for w in workers:
@@ -310,6 +383,170 @@ class Overseer:
         minutes = ((time() * 1000) - earliest) / 60000
         return worker, minutes
 
+    def autoscale(self, interval=15, lookahead=conf.AUTOSCALE_LOOKAHEAD, rate=conf.AUTOSCALE_RATE):
+        """Match the number of active workers to the known spawns due
+
+        Workers for the busiest minute within the lookahead are kept active
+        so that they are woken before dense minutes and only parked once
+        those have passed.
+        """
+        try:
+            if not self.paused:
+                density = spawns.density()
+                minute = int(time() % 3600 // 60)
+                due = max(density[(minute + i) % 60] for i in range(lookahead + 1))
+                wanted = min(max(ceil(due / rate), conf.AUTOSCALE_MIN), conf.AUTOSCALE_MAX)
+                self.scale(wanted)
+        except Exception:
+            self.log.exception('An exception occurred while autoscaling.')
+        if self.running:
+            LOOP.call_later(interval, self.autoscale)
+
+    def scale(self, wanted, grid=conf.GRID[0] * conf.GRID[1]):
+        """Wake, add, park or retire workers until wanted are active
+
+        Workers beyond GRID are only added once every other worker is
+        awake, and are retired before any worker is parked.
+        """
+        active = [w for w in self.workers if w.parked is None]
+        parked = [w for w in self.workers if w.parked is not None]
+        change = wanted - len(active)
+        if change > 0:
+            woken = parked[:change]
+            for worker in woken:
+                worker.wake()
+            added = 0
+            while added < change - len(woken) and self.add_worker():
+                added += 1
+            if woken or added:
+                self.log.info('Woke {} and added {} workers, {} wanted.', len(woken), added, wanted)
+        elif change < 0:
+            retired = 0
+            while change < 0 and len(self.workers) > grid:
+                worker = self.workers.pop()
+                if worker.parked is None:
+                    change += 1
+                worker.retire()
+                retired += 1
+            active = [w for w in self.workers if w.parked is None]
+            to_park = active[len(active) + change:] if change < 0 else ()
+            for worker in to_park:
+                worker.park()
+            self.log.info('Retired {} and parked {} workers, {} wanted.', retired, len(to_park), wanted)
+
+    def add_worker(self):
+        """Start another worker if there is an extra account for it"""
+        if self.extra_queue.empty():
+            return False
+        try:
+            self.workers.append(Worker(worker_no=next(self.worker_numbers)))
+        except ValueError:
+            return False
+        return True
+
+    def hotspots(self, start=60, end=180, precision=2):
+        """Centers of the areas with the most known spawns due between
+        start and end seconds from now, busiest first"""
+        seconds = time() % 3600
+        areas = {}
+        for point, spawn in spawns.known.items():
+            if spawn and start <= (spawn[1] - seconds) % 3600 < end:
+                key = round_coords(point, precision)
+                try:
+                    area = areas[key]
+                    area[0] += 1
+                    area[1] += point[0]
+                    area[2] += point[1]
+                except KeyError:
+                    areas[key] = [1, point[0], point[1]]
+        return [(lat / count, lon / count)
+                for count, lat, lon in sorted(areas.values(), reverse=True)]
+
+    def reposition(self, interval=10, near=100):
+        """Walk idle workers toward the upcoming hotspots, without requests"""
+        try:
+            idle = [w for w in self.workers
+                    if not w.busy.locked() and w.parked is None and w.authenticated]
+            for point in self.hotspots():
+                if not idle:
+                    break
+                worker = min(idle, key=lambda w: get_distance(w.location, point))
+                idle.remove(worker)
+                if get_distance(worker.location, point) > near and worker.nudge(point):
+                    self.nudges += 1
+        except Exception:
+            self.log.exception('An exception occurred while repositioning workers.')
+        if self.running:
+            LOOP.call_later(interval, self.reposition)
+
+    def region(self, point):
+        try:
+            return self.regions[point]
+        except KeyError:
+            region = self.regions[point] = spawns.region(point)
+            return region
+
+    def control_lateness(self, interval=60, target=conf.LATENESS_TARGET,
+                         step=2, max_lead=30, minimum=20):
+        """Hold the 90th percentile of visit delays near target
+
+        Regions running late start searching for a worker earlier, the
+        worker found is held busy until the spawn is due and then visits
+        it right away. Regions well ahead stop doing so. When
+        the latest region is late more coroutines are allowed and searches
+        give up sooner so hopeless spawns don't hold them, when every region
+        is well ahead both go back towards their configured values so that
+        fewer visits are made. A region's delays are collected anew after its
+        lead time changed.
+        """
+        try:
+            worst = 0
+            for region, delays in self.lateness.items():
+                if len(delays) < minimum:
+                    continue
+                p90 = sorted(delays)[int(len(delays) * .9)]
+                worst = max(worst, p90)
+                lead = self.leads.get(region, 0)
+                if p90 > target * 1.2:
+                    new_lead = min(lead + step, max_lead)
+                elif p90 < target * .8:
+                    new_lead = max(lead - step, 0)
+                else:
+                    continue
+                if new_lead != lead:
+                    self.log.info('Region {}: p90 delay {:.1f}s over {} visits, lead time {}s -> {}s.',
+                                  region, p90, len(delays), lead, new_lead)
+                    self.leads[region] = new_lead
+                    delays.clear()
+
+            if worst > target * 1.2:
+                give_up = max(self.give_up_known - 5, target)
+                limit = min(self.coroutines_limit + ceil(self.coroutines_limit / 10), conf.COROUTINES_LIMIT * 2)
+            elif worst and worst < target * .8:
+                give_up = min(self.give_up_known + 5, conf.GIVE_UP_KNOWN)
+                limit = max(self.coroutines_limit - ceil(self.coroutines_limit / 10), conf.COROUTINES_LIMIT)
+            else:
+                give_up, limit = self.give_up_known, self.coroutines_limit
+
+            if give_up != self.give_up_known or limit != self.coroutines_limit:
+                self.log.info('Worst p90 delay {:.1f}s, target {}s: GIVE_UP_KNOWN {} -> {}, coroutines {} -> {}.',
+                              worst, target, self.give_up_known, give_up, self.coroutines_limit, limit)
+                self.give_up_known = give_up
+                change = limit - self.coroutines_limit
+                if change > 0:
+                    kept = min(change, self.coroutines_withheld)
+                    self.coroutines_withheld -= kept
+                    for _ in range(change - kept):
+                        self.coroutine_semaphore.release()
+                else:
+                    # taken out of use by _launch as they are freed
+                    self.coroutines_withheld -= change
+                self.coroutines_limit = limit
+        except Exception:
+            self.log.exception('An exception occurred while controlling lateness.')
+        if self.running:
+            LOOP.call_later(interval, self.control_lateness)
+
     def get_start_point(self):
         smallest_diff = float('inf')
         now = time() % 3600
@@ -324,11 +561,45 @@ class Overseer:
                 break
         return closest
 
+    def shedding_threshold(self, interval=5):
+        """Lowest value of a known spawn worth the hashes that are left
+
+        None while the hashes left in this period cover every known spawn
+        due before it ends, otherwise the value of the least valuable spawn
+        that still fits.
+        """
+        now = monotonic()
+        if now < self.next_threshold:
+            return self.threshold
+        self.next_threshold = now + interval
+        try:
+            status = HashServer.status
+            seconds_left = status['period'] - time()
+            remaining = status['remaining'] - (conf.SMART_THROTTLE or 0) * status['maximum']
+        except (KeyError, TypeError):
+            self.threshold = None
+            return None
+        values = spawns.upcoming_values(time() % 3600, seconds_left) if seconds_left > 0 else ()
+        if len(values) <= remaining:
+            threshold = None
+        elif remaining < 1:
+            threshold = float('inf')
+        else:
+            threshold = sorted(values)[-int(remaining)]
+        if threshold != self.threshold:
+            if threshold is None:
+                self.log.info('Enough hashes left for the {} spawns due, stopped shedding.', len(values))
+            else:
+                self.log.info('{} spawns due in {:.0f}s with {:.0f} hashes left, minimum value {:.2f}',
+                              len(values), seconds_left, remaining, threshold)
+            self.threshold = threshold
+        return threshold
+
     async def update_spawns(self, initial=False):
         while True:
             try:
-                await run_threaded(spawns.update)
-                LOOP.create_task(run_threaded(spawns.pickle))
+                await run_threaded(spawns.update, pool='db')
+                LOOP.create_task(run_threaded(spawns.pickle, pool='cpu'))
             except OperationalError as e:
                 self.log.exception('Operational error while trying to update spawns.')
                 if initial:
@@ -348,6 +619,8 @@ class Overseer:
 
         if not pickle or not spawns.unpickle():
             await self.update_spawns(initial=True)
+        if not MYSTERY_TIMES.loaded:
+            await run_threaded(load_mystery_times, pool='db')
 
         if not spawns or bootstrap:
             try:
@@ -358,6 +631,12 @@ class Overseer:
 
         update_spawns = False
         self.mysteries = spawns.mystery_gen()
+        if conf.AUTOSCALE:
+            LOOP.call_soon(self.autoscale)
+        if conf.REPOSITION_IDLE:
+            LOOP.call_soon(self.reposition)
+        if conf.LATENESS_TARGET:
+            LOOP.call_later(60, self.control_lateness)
         while True:
             try:
                 await self._launch(update_spawns)
@@ -373,6 +652,15 @@ class Overseer:
                     self.log.exception('Error occured in launcher loop.')
                     update_spawns = False
 
+    async def acquire_coroutine(self):
+        """Wait for a coroutine slot, keeping freed slots out of use for as
+        long as more are in use than coroutines_limit allows"""
+        while True:
+            await self.coroutine_semaphore.acquire()
+            if not self.coroutines_withheld:
+                return
+            self.coroutines_withheld -= 1
+
     async def _launch(self, update_spawns):
         if update_spawns:
             await self.update_spawns()
@@ -392,11 +680,19 @@ class Overseer:
 
         captcha_limit = conf.MAX_CAPTCHAS
         skip_spawn = conf.SKIP_SPAWN
+        shed_low_value = conf.SHED_LOW_VALUE
+        control_lateness = conf.LATENESS_TARGET
         for point, (spawn_id, spawn_seconds) in spawns_iter:
             try:
                 if self.captcha_queue.qsize() > captcha_limit:
                     self.paused = True
-                    self.idle_seconds += await run_threaded(self.captcha_queue.full_wait, conf.MAX_CAPTCHAS)
+                    while True:
+                        try:
+                            self.idle_seconds += await run_threaded(
+                                self.captcha_queue.full_wait, captcha_limit, 5, pool='captcha')
+                            break
+                        except Full:
+                            self.idle_seconds += 5
                     self.paused = False
             except (EOFError, BrokenPipeError, FileNotFoundError):
                 pass
@@ -406,19 +702,26 @@ class Overseer:
             # negative = hasn't happened yet
             # positive = already happened
             time_diff = time() - spawn_time
-
-            while time_diff < 0.5:
+            # start looking for a worker this much earlier
+            lead = self.leads.get(self.region(point), 0) if control_lateness else 0
+
+            while time_diff < 0.5 - lead:
+                if shed_low_value and self.shedding_threshold() is not None:
+                    # no hashes to spare for mysteries
+                    await sleep(min(spawn_time - lead - time() + .5, 5), loop=LOOP)
+                    time_diff = time() - spawn_time
+                    continue
                 try:
                     mystery_point = next(self.mysteries)
 
-                    await self.coroutine_semaphore.acquire()
+                    await self.acquire_coroutine()
                     LOOP.create_task(self.try_point(mystery_point))
                 except StopIteration:
                     if self.next_mystery_reload < monotonic():
                         self.mysteries = spawns.mystery_gen()
                         self.next_mystery_reload = monotonic() + conf.RESCAN_UNKNOWN
                     else:
-                        await sleep(min(spawn_time - time() + .5, self.next_mystery_reload - monotonic()), loop=LOOP)
+                        await sleep(min(spawn_time - lead - time() + .5, self.next_mystery_reload - monotonic()), loop=LOOP)
                 time_diff = time() - spawn_time
 
             if time_diff > 5 and spawn_id in SIGHTING_CACHE.store:
@@ -427,8 +730,11 @@ class Overseer:
             elif time_diff > skip_spawn:
                 self.skipped += 1
                 continue
+            elif shed_low_value and spawns.values.get(spawn_id, 0) < (self.shedding_threshold() or 0):
+                self.shed += 1
+                continue
 
-            await self.coroutine_semaphore.acquire()
+            await self.acquire_coroutine()
             LOOP.create_task(self.try_point(point, spawn_time, spawn_id))
 
     async def try_again(self, point):
@@ -458,10 +764,19 @@ class Overseer:
         self.log.warning('Starting bootstrap phase 3.')
         unknowns = list(spawns.unknown)
         shuffle(unknowns)
-        tasks = (self.try_again(point) for point in unknowns)
-        await gather(*tasks, loop=LOOP)
+        await self.bounded(self.try_again(point) for point in unknowns)
         self.log.warning('Finished bootstrapping.')
 
+    async def bounded(self, coroutines, limit=conf.COROUTINES_LIMIT):
+        """Await coroutines with at most limit of them running, each one is
+        only created once there is room for it"""
+        coroutines = iter(coroutines)
+
+        async def consume():
+            for coroutine in coroutines:
+                await coroutine
+        await gather(*(consume() for _ in range(limit)), loop=LOOP)
+
     async def bootstrap_one(self):
         async def visit_release(worker, num, *args):
             async with self.coroutine_semaphore:
@@ -484,24 +799,66 @@ class Overseer:
             tasks = (visit_release(w, n) for n, w in enumerate(self.workers))
         await gather(*tasks, loop=LOOP)
 
-    async def bootstrap_two(self):
-        async def bootstrap_try(point):
-            async with self.coroutine_semaphore:
-                randomized = randomize_point(point, randomization)
-                LOOP.call_later(1790, LOOP.create_task, self.try_again(randomized))
-                worker = await self.best_worker(point, False)
-                async with worker.busy:
-                    self.visits += await worker.bootstrap_visit(point)
+    async def bootstrap_two(self, revisit=1790, max_visits=4, limit=conf.COROUTINES_LIMIT):
+        """Visit every cell of the bootstrap grid, with at most limit visits
+        in progress
 
+        Each cell is visited again half an hour later in the background, and
+        again after that for as long as the last visit found new spawn
+        points, while the known spawns are already being served.
+        """
         # randomize to within ~140m of the nearest neighbor on the second visit
         randomization = conf.BOOTSTRAP_RADIUS / 155555 - 0.00045
-        tasks = (bootstrap_try(x) for x in get_bootstrap_points(bounds))
-        await gather(*tasks, loop=LOOP)
+        centers = get_bootstrap_points(bounds)
+        stats = self.bootstrap_stats = {
+            'cells': len(centers), 'converged': 0, 'visits': 0, 'found': 0}
+        seen_ids = set()
+        seen_points = set()
+
+        async def visit(center, visits=0):
+            point = randomize_point(center, randomization) if visits else center
+            try:
+                async with self.coroutine_semaphore:
+                    worker = await self.best_worker(point, False)
+                    async with worker.busy:
+                        self.visits += await worker.bootstrap_visit(point)
+                        new_ids = worker.spawn_ids_seen - seen_ids
+                        new_points = worker.spawn_points_seen - seen_points
+            except CancelledError:
+                raise
+            except Exception:
+                self.log.exception('An exception occurred while bootstrapping a cell.')
+                new_ids = new_points = ()
+            seen_ids.update(new_ids)
+            seen_points.update(new_points)
+            visits += 1
+            stats['visits'] += 1
+            # not every response lists the cells' spawn points
+            stats['found'] = max(len(seen_ids), len(seen_points))
+            if self.running and (visits == 1 or ((new_ids or new_points) and visits < max_visits)):
+                LOOP.call_later(revisit, schedule, center, visits)
+                return
+            stats['converged'] += 1
+            if stats['converged'] == stats['cells']:
+                self.log.warning('Bootstrap phase 2: {} cells converged, {} spawn points found in {} visits.',
+                                 stats['cells'], stats['found'], stats['visits'])
+
+        def schedule(center, visits):
+            if self.running:
+                LOOP.create_task(visit(center, visits))
+
+        await self.bounded((visit(center) for center in centers), limit)
 
     async def try_point(self, point, spawn_time=None, spawn_id=None):
         try:
+            if spawn_time and conf.LATENESS_TARGET:
+                region = self.region(point)
             point = randomize_point(point)
-            skip_time = monotonic() + (conf.GIVE_UP_KNOWN if spawn_time else conf.GIVE_UP_UNKNOWN)
+            if conf.FRESHNESS_WINDOW and Worker.recently_scanned(
+                    point, max(time() - conf.FRESHNESS_WINDOW, spawn_time or 0)):
+                self.fresh += 1
+                return
+            skip_time = monotonic() + (self.give_up_known if spawn_time else conf.GIVE_UP_UNKNOWN)
             worker = await self.best_worker(point, skip_time)
             if not worker:
                 if spawn_time:
@@ -509,7 +866,18 @@ class Overseer:
                 return
             async with worker.busy:
                 if spawn_time:
+                    if spawn_time + .5 > time():
+                        # found ahead of the spawn thanks to the lead time,
+                        # the worker is held for this visit until it is due
+                        await sleep(spawn_time + .5 - time(), loop=LOOP)
                     worker.after_spawn = time() - spawn_time
+                    self.delays[worker.nudged].append(worker.after_spawn)
+                    if conf.LATENESS_TARGET:
+                        try:
+                            self.lateness[region].append(worker.after_spawn)
+                        except KeyError:
+                            self.lateness[region] = deque((worker.after_spawn,), maxlen=200)
+                worker.nudged = False
 
                 if await worker.visit(point, spawn_id):
                     self.visits += 1
@@ -543,6 +911,25 @@ class Overseer:
                 return None
             await sleep(conf.SEARCH_SLEEP, loop=LOOP)
 
+    async def _vectorized_best_worker(self, point, skip_time):
+        """best_worker in one vectorized pass over all workers"""
+        scan_delay = Worker.scan_delay
+        while self.running:
+            # free rows and rows of retiring workers are always busy
+            speeds = SPEEDS.travel_speeds(point, scan_delay)
+            i = speeds.argmin()
+            lowest_speed = float(speeds[i])
+            if lowest_speed < conf.SPEED_LIMIT:
+                worker = SPEEDS.owners[i]
+                worker.speed = lowest_speed
+                return worker
+            if skip_time and monotonic() > skip_time:
+                return None
+            await sleep(conf.SEARCH_SLEEP, loop=LOOP)
+
+    if conf.VECTORIZE_SPEEDS:
+        best_worker = _vectorized_best_worker
+
     def refresh_dict(self):
         while not self.extra_queue.empty():
             account = self.extra_queue.get()
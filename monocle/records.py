@@ -0,0 +1,199 @@
+class Record:
+    """Base for normalized map objects passed from workers to the DB processor
+
+    Records use __slots__ instead of a per-instance dict. Optional fields are
+    left unset rather than set to None, and the small mapping interface below
+    lets code written for the old dicts (notifications, webhooks) keep using
+    record['field'], record.get('field') and 'field' in record.
+    """
+    __slots__ = ()
+    type = None
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return hasattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def copy(self):
+        other = self.__class__.__new__(self.__class__)
+        for field in self.fields():
+            try:
+                setattr(other, field, getattr(self, field))
+            except AttributeError:
+                pass
+        return other
+
+    def __repr__(self):
+        fields = ', '.join('{}={!r}'.format(k, getattr(self, k))
+                           for k in self.fields() if hasattr(self, k))
+        return '{}({})'.format(self.__class__.__name__, fields)
+
+    @classmethod
+    def fields(cls):
+        for klass in reversed(cls.__mro__):
+            yield from getattr(klass, '__slots__', ())
+
+
+class SightingRecord(Record):
+    """Wild or lured Pokemon with a known or inferred expiration time"""
+    __slots__ = ('encounter_id', 'pokemon_id', 'lat', 'lon', 'spawn_id',
+                 'seen', 'expire_timestamp', 'time_till_hidden', 'inferred',
+                 'display', 'move_1', 'move_2', 'individual_attack',
+                 'individual_defense', 'individual_stamina', 'gender', 'cp',
+                 'level', 'height', 'weight', 'earliest_tth', 'latest_tth')
+    type = 'pokemon'
+
+    def __init__(self, encounter_id, pokemon_id, lat, lon, spawn_id):
+        self.encounter_id = encounter_id
+        self.pokemon_id = pokemon_id
+        self.lat = lat
+        self.lon = lon
+        self.spawn_id = spawn_id
+
+
+class MysteryRecord(SightingRecord):
+    """Wild Pokemon whose expiration time is not known"""
+    __slots__ = ()
+    type = 'mystery'
+
+
+class FortRecord(Record):
+    __slots__ = ('external_id', 'lat', 'lon', 'team', 'prestige',
+                 'guard_pokemon_id', 'last_modified', 'slots_available',
+                 'name', 'url', 'gym_defenders')
+    type = 'fort'
+
+    def __init__(self, external_id, lat, lon, team, prestige,
+                 guard_pokemon_id, last_modified, slots_available):
+        self.external_id = external_id
+        self.lat = lat
+        self.lon = lon
+        self.team = team
+        self.prestige = prestige
+        self.guard_pokemon_id = guard_pokemon_id
+        self.last_modified = last_modified
+        self.slots_available = slots_available
+        self.name = None
+        self.url = None
+        self.gym_defenders = []
+
+
+class GymDefenderRecord(Record):
+    __slots__ = ('external_id', 'pokemon_id', 'owner_name', 'nickname', 'cp',
+                 'stamina', 'stamina_max', 'atk_iv', 'def_iv', 'sta_iv',
+                 'move_1', 'move_2', 'battles_attacked', 'battles_defended',
+                 'num_upgrades')
+    type = 'gym_defender'
+
+    def __init__(self, external_id, pokemon_id, owner_name, nickname, cp,
+                 stamina, stamina_max, atk_iv, def_iv, sta_iv, move_1, move_2,
+                 battles_attacked, battles_defended, num_upgrades=0):
+        self.external_id = external_id
+        self.pokemon_id = pokemon_id
+        self.owner_name = owner_name
+        self.nickname = nickname
+        self.cp = cp
+        self.stamina = stamina
+        self.stamina_max = stamina_max
+        self.atk_iv = atk_iv
+        self.def_iv = def_iv
+        self.sta_iv = sta_iv
+        self.move_1 = move_1
+        self.move_2 = move_2
+        self.battles_attacked = battles_attacked
+        self.battles_defended = battles_defended
+        self.num_upgrades = num_upgrades
+
+
+class RaidRecord(Record):
+    __slots__ = ('external_id', 'fort_external_id', 'lat', 'lon', 'level',
+                 'pokemon_id', 'move_1', 'move_2', 'time_spawn', 'time_battle',
+                 'time_end', 'cp')
+    type = 'raid'
+
+    def __init__(self, external_id, fort_external_id, lat, lon, level,
+                 pokemon_id, move_1, move_2, time_spawn, time_battle,
+                 time_end, cp):
+        self.external_id = external_id
+        self.fort_external_id = fort_external_id
+        self.lat = lat
+        self.lon = lon
+        self.level = level
+        self.pokemon_id = pokemon_id
+        self.move_1 = move_1
+        self.move_2 = move_2
+        self.time_spawn = time_spawn
+        self.time_battle = time_battle
+        self.time_end = time_end
+        self.cp = cp
+
+
+class PokestopRecord(Record):
+    __slots__ = ('external_id', 'lat', 'lon', 'lure_start', 'lure_username',
+                 'name', 'url')
+    type = 'pokestop'
+
+    def __init__(self, external_id, lat, lon, lure_start):
+        self.external_id = external_id
+        self.lat = lat
+        self.lon = lon
+        self.lure_start = lure_start
+        self.lure_username = None
+        self.name = None
+        self.url = None
+
+
+class WeatherRecord(Record):
+    __slots__ = ('s2_cell_id', 'condition', 'alert_severity', 'warn', 'day')
+    type = 'weather'
+
+    def __init__(self, s2_cell_id, condition, alert_severity, warn, day):
+        self.s2_cell_id = s2_cell_id
+        self.condition = condition
+        self.alert_severity = alert_severity
+        self.warn = warn
+        self.day = day
+
+
+class TargetRecord(Record):
+    """Whether a known spawn point had a Pokemon when it was visited"""
+    __slots__ = ('spawn_id', 'seen')
+    type = 'target'
+
+    def __init__(self, spawn_id, seen):
+        self.spawn_id = spawn_id
+        self.seen = seen
+
+
+class MysteryUpdateRecord(Record):
+    """First and last times a mystery Pokemon was seen"""
+    __slots__ = ('spawn', 'encounter', 'first', 'last')
+    type = 'mystery-update'
+
+    def __init__(self, spawn, encounter, first, last):
+        self.spawn = spawn
+        self.encounter = encounter
+        self.first = first
+        self.last = last
+
+
+class EncounterRecord(Record):
+    """Encounter details to add to a sighting that was already saved"""
+    __slots__ = ('encounter_id', 'spawn_id', 'expire_timestamp', 'move_1',
+                 'move_2', 'individual_attack', 'individual_defense',
+                 'individual_stamina', 'gender', 'cp', 'level')
+    type = 'encounter'
+
+    def __init__(self, sighting):
+        for field in self.__slots__:
+            setattr(self, field, getattr(sighting, field, None))
@@ -27,11 +27,18 @@ _valid_types = {
     'APP_SIMULATION': bool,
     'AREA_NAME': str,
     'AUTHKEY': bytes,
+    'AUTOSCALE': bool,
+    'AUTOSCALE_LOOKAHEAD': int,
+    'AUTOSCALE_MAX': int,
+    'AUTOSCALE_MIN': int,
+    'AUTOSCALE_RATE': Number,
     'BOOTSTRAP_RADIUS': Number,
     'BOUNDARIES': object,
     'CACHE_CELLS': bool,
     'CAPTCHAS_ALLOWED': int,
     'CAPTCHA_KEY': str,
+    'CAPTURE_GMO': bool,
+    'CELL_FULL_REFRESH': Number,
     'COMPLETE_TUTORIAL': bool,
     'COROUTINES_LIMIT': int,
     'DB': dict,
@@ -40,17 +47,21 @@ _valid_types = {
     'DISCORD_INVITE_ID': str,
     'ENCOUNTER': str,
     'ENCOUNTER_IDS': set_sequence_range,
+    'ENCOUNTER_WAIT': Number,
     'FAILURES_ALLOWED': int,
     'FAVOR_CAPTCHA': bool,
     'FB_PAGE_ID': str,
     'FIXED_OPACITY': bool,
     'FORCED_KILL': bool,
+    'FRESHNESS_WINDOW': Number,
     'FULL_TIME': Number,
     'GIVE_UP_KNOWN': Number,
     'GIVE_UP_UNKNOWN': Number,
     'GOOD_ENOUGH': Number,
     'GOOGLE_MAPS_KEY': str,
     'GRID': sequence,
+    'GYM_DETAILS_INTERVAL': Number,
+    'GYM_DETAILS_WAIT': Number,
     'HASHTAGS': set_sequence,
     'HASH_KEY': (str,) + set_sequence,
     'HEATMAP': bool,
@@ -65,10 +76,14 @@ _valid_types = {
     'LANDMARKS': object,
     'LANGUAGE': str,
     'LAST_MIGRATION': Number,
+    'LATENESS_TARGET': Number,
     'LOAD_CUSTOM_CSS_FILE': bool,
     'LOAD_CUSTOM_HTML_FILE': bool,
     'LOAD_CUSTOM_JS_FILE': bool,
     'LOGIN_TIMEOUT': Number,
+    'LOG_QUEUE_SIZE': int,
+    'LOG_RATE_LIMIT': Number,
+    'LOOP_LAG_THRESHOLD': Number,
     'LURE_DURATION': Number,
     'MANAGER_ADDRESS': (str, tuple, list),
     'MAP_END': sequence,
@@ -104,9 +119,11 @@ _valid_types = {
     'REFRESH_RATE': Number,
     'REPORT_MAPS': bool,
     'REPORT_SINCE': datetime,
+    'REPOSITION_IDLE': bool,
     'RESCAN_UNKNOWN': Number,
     'SCAN_DELAY': Number,
     'SEARCH_SLEEP': Number,
+    'SHED_LOW_VALUE': bool,
     'SHOW_TIMER': bool,
     'SHOW_TIMER_RAIDS': bool,
     'SIMULTANEOUS_LOGINS': int,
@@ -114,6 +131,7 @@ _valid_types = {
     'SKIP_SPAWN': Number,
     'SMART_THROTTLE': Number,
     'SPAWN_ID_INT': bool,
+    'SPAWNS_SNAPSHOT': bool,
     'SPEED_LIMIT': Number,
     'SPEED_UNIT': str,
     'SPIN_COOLDOWN': Number,
@@ -136,6 +154,7 @@ _valid_types = {
     'TWITTER_SCREEN_NAME': str,
     'TZ_OFFSET': Number,
     'UVLOOP': bool,
+    'VECTORIZE_SPEEDS': bool,
     'WEBHOOKS': set_sequence
 }
 
@@ -149,11 +168,18 @@ _defaults = {
     'APP_SIMULATION': True,
     'AREA_NAME': 'Area',
     'AUTHKEY': b'm3wtw0',
+    'AUTOSCALE': False,
+    'AUTOSCALE_LOOKAHEAD': 2,
+    'AUTOSCALE_MAX': worker_count,
+    'AUTOSCALE_MIN': max(worker_count // 4, 1),
+    'AUTOSCALE_RATE': 4,
     'BOOTSTRAP_RADIUS': 120,
     'BOUNDARIES': None,
     'CACHE_CELLS': False,
     'CAPTCHAS_ALLOWED': 3,
     'CAPTCHA_KEY': None,
+    'CAPTURE_GMO': False,
+    'CELL_FULL_REFRESH': 0,
     'COMPLETE_TUTORIAL': False,
     'CONTROL_SOCKS': None,
     'COROUTINES_LIMIT': worker_count,
@@ -161,16 +187,20 @@ _defaults = {
     'DISCORD_INVITE_ID': None,
     'ENCOUNTER': None,
     'ENCOUNTER_IDS': None,
+    'ENCOUNTER_WAIT': 60,
     'FAVOR_CAPTCHA': True,
     'FAILURES_ALLOWED': 2,
     'FB_PAGE_ID': None,
     'FIXED_OPACITY': False,
     'FORCED_KILL': None,
+    'FRESHNESS_WINDOW': 0,
     'FULL_TIME': 1800,
     'GIVE_UP_KNOWN': 75,
     'GIVE_UP_UNKNOWN': 60,
     'GOOD_ENOUGH': 0.1,
     'GOOGLE_MAPS_KEY': '',
+    'GYM_DETAILS_INTERVAL': 300,
+    'GYM_DETAILS_WAIT': 60,
     'HASHTAGS': None,
     'ICONS_URL': "https://raw.githubusercontent.com/ZeChrales/monocle-icons/larger-outlined/larger-icons/{}.png",
     'IGNORE_IVS': False,
@@ -183,10 +213,14 @@ _defaults = {
     'LANDMARKS': None,
     'LANGUAGE': 'EN',
     'LAST_MIGRATION': 1481932800,
+    'LATENESS_TARGET': 0,
     'LOAD_CUSTOM_CSS_FILE': False,
     'LOAD_CUSTOM_HTML_FILE': False,
     'LOAD_CUSTOM_JS_FILE': False,
     'LOGIN_TIMEOUT': 2.5,
+    'LOG_QUEUE_SIZE': 10000,
+    'LOG_RATE_LIMIT': 0,
+    'LOOP_LAG_THRESHOLD': 0,
     'LURE_DURATION': 1800,
     'MANAGER_ADDRESS': None,
     'MAP_FILTER_IDS': None,
@@ -219,9 +253,11 @@ _defaults = {
     'REFRESH_RATE': 0.6,
     'REPORT_MAPS': True,
     'REPORT_SINCE': None,
+    'REPOSITION_IDLE': False,
     'RESCAN_UNKNOWN': 90,
     'SCAN_DELAY': 10,
     'SEARCH_SLEEP': 2.5,
+    'SHED_LOW_VALUE': False,
     'SHOW_TIMER': False,
     'SHOW_TIMER_RAIDS': False,
     'SIMULTANEOUS_LOGINS': 2,
@@ -229,6 +265,7 @@ _defaults = {
     'SKIP_SPAWN': 90,
     'SMART_THROTTLE': False,
     'SPAWN_ID_INT': True,
+    'SPAWNS_SNAPSHOT': False,
     'SPEED_LIMIT': 19.5,
     'SPEED_UNIT': 'miles',
     'SPIN_COOLDOWN': 300,
@@ -251,6 +288,7 @@ _defaults = {
     'TWITTER_SCREEN_NAME': None,
     'TZ_OFFSET': None,
     'UVLOOP': True,
+    'VECTORIZE_SPEEDS': False,
     'WEBHOOKS': None
 }
 
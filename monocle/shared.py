@@ -1,13 +1,18 @@
-from logging import getLogger, LoggerAdapter
+from logging import getLogger, Filter, LoggerAdapter, WARNING
+from logging.handlers import QueueHandler, QueueListener
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
-from time import time
+from statistics import median
+from time import monotonic, time
 from asyncio import get_event_loop
+from queue import Queue, Full
 
 from aiohttp import ClientSession
 from aiopogo import json_dumps
 from aiopogo.session import SESSIONS
 
 from .utils import load_accounts
+from . import sanitized as conf
 
 
 LOOP = get_event_loop()
@@ -60,6 +65,78 @@ def get_logger(name=None):
     return StyleAdapter(getLogger(name))
 
 
+class RateLimit(Filter):
+    """Let through at most limit records of each message per period
+
+    Records are told apart by logger and format string, warnings and
+    above are always let through.
+    """
+    def __init__(self, limit, period=60):
+        super().__init__()
+        self.limit = limit
+        self.period = period
+        self.counts = {}
+        self.reset = monotonic() + period
+        self.limited = 0
+
+    def filter(self, record):
+        if record.levelno >= WARNING:
+            return True
+        now = monotonic()
+        if now > self.reset:
+            self.counts.clear()
+            self.reset = now + self.period
+        key = record.name, getattr(record.msg, 'fmt', record.msg)
+        count = self.counts.get(key, 0) + 1
+        self.counts[key] = count
+        if count > self.limit:
+            self.limited += 1
+            return False
+        return True
+
+
+class LogQueue(QueueHandler):
+    """Hands log records to a listener thread
+
+    Records are queued as they are, so Message formatting and file writes
+    both happen on the listener thread. Records that don't fit in the
+    queue are dropped and counted instead of blocking the loop.
+    """
+    def __init__(self, size=conf.LOG_QUEUE_SIZE, limit=conf.LOG_RATE_LIMIT):
+        super().__init__(Queue(size))
+        self.dropped = 0
+        self.listener = None
+        self.limiter = RateLimit(limit) if limit else None
+        if self.limiter:
+            self.addFilter(self.limiter)
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except Full:
+            self.dropped += 1
+
+    def listen(self, handlers):
+        self.listener = QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self.listener.start()
+
+    def stop(self):
+        """Write out the queued records and stop the listener"""
+        if self.listener:
+            self.listener.stop()
+            self.listener = None
+
+    def status(self):
+        return 'Log records queued: {}, rate limited: {}, dropped: {}'.format(
+            self.queue.qsize(), self.limiter.limited if self.limiter else 0, self.dropped)
+
+
+LOG_QUEUE = LogQueue()
+
+
 def call_later(delay, cb, *args):
     """Thread-safe wrapper for call_later"""
     try:
@@ -75,6 +152,60 @@ def call_at(when, cb, *args):
     return call_later(delay, cb, *args)
 
 
-async def run_threaded(cb, *args):
-    with ThreadPoolExecutor(max_workers=1) as x:
-        return await LOOP.run_in_executor(x, cb, *args)
+class ThreadPool:
+    """Long-lived, bounded thread pool for blocking calls from the loop
+
+    Counts the calls waiting for a thread and keeps the recent times calls
+    waited for a thread and ran for.
+    """
+    def __init__(self, name, workers, history=100):
+        self.name = name
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.active = 0
+        self.calls = 0
+        self.waits = deque(maxlen=history)
+        self.durations = deque(maxlen=history)
+
+    @property
+    def queued(self):
+        return max(self.active - self.workers, 0)
+
+    async def run(self, cb, *args):
+        timings = []
+
+        def call():
+            timings.append(monotonic())
+            try:
+                return cb(*args)
+            finally:
+                timings.append(monotonic())
+
+        submitted = monotonic()
+        self.active += 1
+        try:
+            return await LOOP.run_in_executor(self.executor, call)
+        finally:
+            self.active -= 1
+            self.calls += 1
+            if len(timings) == 2:
+                self.waits.append(timings[0] - submitted)
+                self.durations.append(timings[1] - timings[0])
+
+    def status(self):
+        return '{} {}/{} busy, {} queued, wait {}ms, run {}ms'.format(
+            self.name, min(self.active, self.workers), self.workers, self.queued,
+            *('{:.0f}'.format(median(t) * 1000) if t else '-'
+              for t in (self.waits, self.durations)))
+
+
+# cpu: serializing large structures, db: reading from the DB, io: writing
+# files, wait: polling for extra accounts, captcha: waiting for CAPTCHAs to
+# be solved, kept apart so that workers waiting for accounts can't hold it up
+POOLS = {name: ThreadPool(name, workers) for name, workers in (
+    ('captcha', 1), ('cpu', 1), ('db', 2), ('io', 2), ('wait', 8))}
+
+
+async def run_threaded(cb, *args, pool='io'):
+    """Run cb in the named thread pool without blocking the loop"""
+    return await POOLS[pool].run(cb, *args)
@@ -0,0 +1,161 @@
+from collections import OrderedDict
+from json import dump as json_dump, load as json_load
+from os import mkdir, replace
+from os.path import join
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError('SPAWNS_SNAPSHOT is set but numpy is not available.') from e
+
+KNOWN = np.dtype([('lat', '<f8'), ('lon', '<f8'), ('spawn_id', '<i8'), ('spawn_seconds', '<i2')])
+DESPAWN = np.dtype([('spawn_id', '<i8'), ('despawn_time', '<i2'), ('value', '<f4')])
+UNKNOWN = np.dtype([('lat', '<f8'), ('lon', '<f8'), ('spawn_id', '<i8')])
+POINTS = np.dtype([('lat', '<f8'), ('lon', '<f8')])
+
+
+class KnownSpawns:
+    """{(lat, lon): (spawn_id, spawn_seconds)} backed by a structured array
+
+    Behaves like the OrderedDict it replaces: iteration follows the array,
+    which is sorted by spawn_seconds, and points set later (MoreSpawns
+    marks new known points with None) follow after it. Tuples are only
+    created while iterating, and the point index used for lookups and
+    membership tests is only built on the first one.
+    """
+    def __init__(self, array, extra=None):
+        self.array = array
+        self.extra = extra or OrderedDict()
+        self.index = None
+
+    @classmethod
+    def from_items(cls, items):
+        """From (point, (spawn_id, spawn_seconds)) pairs in order"""
+        array = np.array([(p[0], p[1], s[0], s[1]) for p, s in items], dtype=KNOWN)
+        return cls(array)
+
+    def __len__(self):
+        return len(self.array) + len(self.extra)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def keys(self):
+        yield from zip(self.array['lat'].tolist(), self.array['lon'].tolist())
+        yield from self.extra
+
+    __iter__ = keys
+
+    def values(self):
+        yield from zip(self.array['spawn_id'].tolist(), self.array['spawn_seconds'].tolist())
+        yield from self.extra.values()
+
+    def items(self):
+        return zip(self.keys(), self.values())
+
+    def __reversed__(self):
+        yield from reversed(self.extra)
+        array = self.array
+        for i in range(len(array) - 1, -1, -1):
+            yield float(array['lat'][i]), float(array['lon'][i])
+
+    def get_index(self):
+        if self.index is None:
+            self.index = {p: i for i, p in enumerate(
+                zip(self.array['lat'].tolist(), self.array['lon'].tolist()))}
+        return self.index
+
+    def __getitem__(self, point):
+        try:
+            return self.extra[point]
+        except KeyError:
+            pass
+        row = self.array[self.get_index()[point]]
+        return int(row['spawn_id']), int(row['spawn_seconds'])
+
+    def __contains__(self, point):
+        return point in self.extra or point in self.get_index()
+
+    def __setitem__(self, point, value):
+        self.extra[point] = value
+
+    def copy(self):
+        other = KnownSpawns(self.array, self.extra.copy())
+        # the array is shared, and so can be its index
+        other.index = self.index
+        return other
+
+
+def points_array(points):
+    return np.array([(p[0], p[1]) for p in points], dtype=POINTS)
+
+
+def save(spawns, state, folder):
+    """Write spawns as .npy arrays to folder, meta.json holds state for
+    validation
+
+    meta.json is replaced last, and records the length of every array so
+    that a snapshot that was only partly replaced is never used.
+    """
+    try:
+        mkdir(folder)
+    except FileExistsError:
+        pass
+    known = spawns.known
+    if not isinstance(known, KnownSpawns) or known.extra:
+        known = KnownSpawns.from_items(sorted(
+            ((p, s) for p, s in known.items() if s), key=lambda k: k[1][1]))
+    values = spawns.values
+    arrays = {
+        'known': known.array,
+        'despawn': np.array([(spawn_id, despawn_time, values.get(spawn_id, np.nan))
+                             for spawn_id, despawn_time in spawns.despawn_times.items()],
+                            dtype=DESPAWN),
+        'unknown': np.array([(p[0], p[1], spawn_id) for p, spawn_id in spawns.unknown.items()],
+                            dtype=UNKNOWN),
+        'cell_points': points_array(getattr(spawns, 'cell_points', ()))
+    }
+    meta = dict(state, lengths={name: len(array) for name, array in arrays.items()})
+    for name, array in arrays.items():
+        location = join(folder, name + '.npy')
+        with open(location + '.tmp', 'wb') as f:
+            np.save(f, array)
+        replace(location + '.tmp', location)
+    location = join(folder, 'meta.json')
+    with open(location + '.tmp', 'w') as f:
+        json_dump(meta, f)
+    replace(location + '.tmp', location)
+
+
+def load(state, folder):
+    """Returns the arrays in folder if the snapshot matches state,
+    otherwise None"""
+    with open(join(folder, 'meta.json')) as f:
+        meta = json_load(f)
+    lengths = meta.pop('lengths')
+    if meta != state:
+        return None
+    arrays = {}
+    for name, length in lengths.items():
+        # empty files can't be mapped
+        array = np.load(join(folder, name + '.npy'), mmap_mode='r' if length else None)
+        if len(array) != length:
+            return None
+        arrays[name] = array
+    return arrays
+
+
+def restore(spawns, arrays):
+    """Back the spawn structures with the snapshot arrays"""
+    spawns.known = KnownSpawns(arrays['known'])
+    despawn = arrays['despawn']
+    spawn_ids = despawn['spawn_id'].tolist()
+    spawns.despawn_times = dict(zip(spawn_ids, despawn['despawn_time'].tolist()))
+    spawns.values = {spawn_id: value for spawn_id, value in zip(spawn_ids, despawn['value'].tolist())
+                     if value == value}
+    unknown = arrays['unknown']
+    spawns.unknown = dict(zip(zip(unknown['lat'].tolist(), unknown['lon'].tolist()),
+                              unknown['spawn_id'].tolist()))
+    if hasattr(spawns, 'cell_points'):
+        cell_points = arrays['cell_points']
+        spawns.cell_points = set(zip(cell_points['lat'].tolist(), cell_points['lon'].tolist()))
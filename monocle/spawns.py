@@ -1,14 +1,19 @@
 import sys
 
 from collections import deque, OrderedDict
-from time import time
-from itertools import chain
+from time import time, monotonic
+from itertools import chain, zip_longest
 from hashlib import sha256
+from os.path import join
 
 from . import bounds, db, sanitized as conf
+from .hilbert import hilbert_index
 from .shared import get_logger
 from .utils import dump_pickle, load_pickle, get_current_hour, time_until_time
 
+if conf.SPAWNS_SNAPSHOT:
+    from . import snapshot
+
 
 class BaseSpawns:
     """Manage spawn points and times"""
@@ -19,11 +24,14 @@ class BaseSpawns:
         # {spawn_id: despawn_seconds}
         self.despawn_times = {}
 
-        ## Spawns with unknown times
-        # {(lat, lon)}
-        self.unknown = set()
+        ## Spawns with unknown times, their ranges are in db.MYSTERY_TIMES
+        # {(lat, lon): spawn_id}
+        self.unknown = {}
+
+        # {spawn_id: value}
+        self.values = {}
 
-        self.class_version = 3
+        self.class_version = 6
         self.db_hash = sha256(conf.DB_ENGINE.encode()).digest()
         self.log = get_logger('spawns')
 
@@ -45,6 +53,9 @@ class BaseSpawns:
                                      db.Spawnpoint.lon >= bounds.west,
                                      db.Spawnpoint.lon <= bounds.east)
             known = {}
+            db.MYSTERY_TIMES.load(db.get_mystery_ranges(session))
+            if conf.SHED_LOW_VALUE:
+                self.values = db.get_spawn_values(session)
             for spawn in query:
                 point = spawn.lat, spawn.lon
 
@@ -53,9 +64,12 @@ class BaseSpawns:
                     continue
 
                 if not spawn.updated or spawn.updated <= last_migration:
-                    self.unknown.add(point)
+                    self.unknown[point] = spawn.spawn_id
                     continue
 
+                # may have become known outside of this process
+                self.unknown.pop(point, None)
+
                 if spawn.duration == 60:
                     spawn_time = spawn.despawn_time
                 else:
@@ -63,7 +77,11 @@ class BaseSpawns:
 
                 self.despawn_times[spawn.spawn_id] = spawn.despawn_time
                 known[point] = spawn.spawn_id, spawn_time
-        self.known = OrderedDict(sorted(known.items(), key=lambda k: k[1][1]))
+        known = sorted(known.items(), key=lambda k: k[1][1])
+        if conf.SPAWNS_SNAPSHOT:
+            self.known = snapshot.KnownSpawns.from_items(known)
+        else:
+            self.known = OrderedDict(known)
 
     def after_last(self):
         try:
@@ -73,6 +91,21 @@ class BaseSpawns:
         except (StopIteration, KeyError, TypeError):
             return False
 
+    def density(self):
+        """Number of known spawns in each minute of the hour"""
+        minutes = [0] * 60
+        for spawn in self.known.values():
+            if spawn:
+                minutes[int(spawn[1] // 60) % 60] += 1
+        return minutes
+
+    def upcoming_values(self, seconds, duration):
+        """Values of the known spawns due within duration of seconds"""
+        values = self.values
+        return [values.get(spawn[0], 0)
+                for spawn in self.known.values()
+                if spawn and (spawn[1] - seconds) % 3600 < duration]
+
     def get_despawn_time(self, spawn_id, seen):
         hour = get_current_hour(now=seen)
         try:
@@ -83,7 +116,127 @@ class BaseSpawns:
         except KeyError:
             return None
 
+    def expected_gain(self, point, second):
+        """Expected seconds a visit at second of the hour would cut from
+        the window the mystery at point could despawn in
+
+        A mystery seen between first and last seconds despawns somewhere
+        between last and first + duration. Visiting at a second after last
+        either moves last up to it or, if the Pokemon is gone, moves the end
+        of the window down to it, so the best visits split the window in
+        half. The same goes for visits before first. Visiting between first
+        and last teaches nothing, points never seen are worth the most.
+        """
+        first, last = db.MYSTERY_TIMES.get(self.unknown.get(point))
+        if first is None:
+            return 900
+        duration = 1800 if last - first < 1800 else 3600
+        window = first + duration - last
+        if window <= 0:
+            return 0
+        for seconds in (second, second + 3600, second - 3600):
+            offset = seconds - last
+            if not 0 < offset < window:
+                offset = first - seconds
+            if 0 < offset < window:
+                return 2 * offset * (window - offset) / window
+        return 0
+
+    @staticmethod
+    def region(point):
+        """Index of the polygon containing point, one past the last polygon
+        for points outside all of them, 0 unless BOUNDARIES is a MultiPolygon"""
+        if not bounds.multi:
+            return 0
+        for region, polygon in enumerate(bounds.polygons):
+            if point in polygon:
+                return region
+        return len(bounds.polygons)
+
+    def route_keys(self, points):
+        """Region and position along that region's Hilbert curve per point"""
+        if not bounds.multi:
+            return {p: (0, hilbert_index(p, bounds)) for p in points}
+        keys = {}
+        polygons = bounds.polygons
+        for p in points:
+            region = self.region(p)
+            polygon = polygons[region] if region < len(polygons) else bounds
+            keys[p] = region, hilbert_index(p, polygon)
+        return keys
+
+    def route(self, points, keys=None, cursors=None):
+        """Order points along a Hilbert curve within each region, taking
+        turns between regions so that every region's workers stay busy.
+        Each region's route starts after its cursor and wraps around.
+        """
+        if keys is None:
+            keys = self.route_keys(points)
+        regions = {}
+        for p in points:
+            region, position = keys[p]
+            regions.setdefault(region, []).append((position, p))
+        routes = []
+        for region, stops in regions.items():
+            cursor = cursors.get(region, -1) if cursors else -1
+            stops.sort(key=lambda s: (s[0] <= cursor, s[0]))
+            routes.append([p for _, p in stops])
+        return [p for p in chain.from_iterable(zip_longest(*routes)) if p is not None]
+
+    def prioritized(self, points, interval=60, tier=300):
+        """Yield points by expected gain, ranking them again every interval
+        seconds as the second of the hour moves on. Points that no visit
+        could learn from right now are left for the next sweep.
+
+        Gains are grouped in tiers and each tier is swept as a route, so
+        consecutive points are close to each other.
+        """
+        remaining = set(points)
+        keys = self.route_keys(remaining)
+        cursors = {}
+        while remaining:
+            second = time() % 3600
+            tiers = {}
+            for p in remaining:
+                gain = self.expected_gain(p, second)
+                if gain > 0:
+                    tiers.setdefault(gain // tier, []).append(p)
+            if not tiers:
+                return
+            rerank = monotonic() + interval
+            # routed lazily so each tier continues from where the last ended
+            routes = chain.from_iterable(self.route(tiers[level], keys, cursors)
+                                         for level in sorted(tiers, reverse=True))
+            for point in routes:
+                if monotonic() > rerank:
+                    break
+                remaining.discard(point)
+                cursors[keys[point][0]] = keys[point][1]
+                yield point
+
+    def snapshot_state(self):
+        return {'class_version': self.class_version,
+                'db_hash': self.db_hash.hex(),
+                'bounds_hash': hash(bounds),
+                'last_migration': conf.LAST_MIGRATION}
+
+    @staticmethod
+    def snapshot_folder():
+        return join(conf.DIRECTORY, 'pickles', 'spawns')
+
     def unpickle(self):
+        if conf.SPAWNS_SNAPSHOT:
+            try:
+                arrays = snapshot.load(self.snapshot_state(), self.snapshot_folder())
+                if arrays is not None:
+                    snapshot.restore(self, arrays)
+                    return True
+                self.log.warning('Configuration changed, reloading spawns from DB.')
+            except FileNotFoundError:
+                self.log.warning('No spawns snapshot found, will create one.')
+            except (ValueError, KeyError, OSError):
+                self.log.warning('Invalid spawns snapshot, reloading from DB.')
+            return False
         try:
             state = load_pickle('spawns', raise_exception=True)
             if all((state['class_version'] == self.class_version,
@@ -101,6 +254,9 @@ class BaseSpawns:
         return False
 
     def pickle(self):
+        if conf.SPAWNS_SNAPSHOT:
+            snapshot.save(self, self.snapshot_state(), self.snapshot_folder())
+            return
         state = self.__dict__.copy()
         del state['log']
         state.pop('cells_count', None)
@@ -123,10 +279,10 @@ class Spawns(BaseSpawns):
 
     def add_known(self, spawn_id, despawn_time, point):
         self.despawn_times[spawn_id] = despawn_time
-        self.unknown.discard(point)
+        self.unknown.pop(point, None)
 
-    def add_unknown(self, point):
-        self.unknown.add(point)
+    def add_unknown(self, point, spawn_id):
+        self.unknown[point] = spawn_id
 
     def unpickle(self):
         result = super().unpickle()
@@ -137,8 +293,7 @@ class Spawns(BaseSpawns):
         return result
 
     def mystery_gen(self):
-        for mystery in self.unknown.copy():
-            yield mystery
+        yield from self.prioritized(self.unknown)
 
 
 class MoreSpawns(BaseSpawns):
@@ -158,18 +313,18 @@ class MoreSpawns(BaseSpawns):
         self.despawn_times[spawn_id] = despawn_time
         # add so that have_point() will be up to date
         self.known[point] = None
-        self.unknown.discard(point)
+        self.unknown.pop(point, None)
         self.cell_points.discard(point)
 
-    def add_unknown(self, point):
-        self.unknown.add(point)
+    def add_unknown(self, point, spawn_id):
+        self.unknown[point] = spawn_id
         self.cell_points.discard(point)
 
     def have_point(self, point):
-        return point in chain(self.cell_points, self.known, self.unknown)
+        return point in self.cell_points or point in self.known or point in self.unknown
 
     def mystery_gen(self):
-        for mystery in chain(self.unknown.copy(), self.cell_points.copy()):
+        for mystery in chain(self.prioritized(self.unknown), self.route(self.cell_points.copy())):
             yield mystery
 
     @property
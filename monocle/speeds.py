@@ -0,0 +1,147 @@
+from asyncio import Lock
+from math import cos, radians
+from time import time
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError('VECTORIZE_SPEEDS is set but numpy is not available.') from e
+
+from .utils import Units
+from . import sanitized as conf
+
+# mean radius of the Earth in each of utils.Units
+RADII = {
+    Units.miles: 3958.7613,
+    Units.kilometers: 6371.0088,
+    Units.meters: 6371008.8
+}
+RADIUS = RADII[getattr(Units, conf.SPEED_UNIT.lower())]
+
+
+class WorkerSpeeds:
+    """Worker locations, last request times and busy flags in NumPy arrays
+
+    Workers write through to these arrays whenever their location or
+    last_request changes and whenever their busy lock is taken or released,
+    so travel speeds from every worker to a point can be computed in one
+    vectorized haversine pass instead of a Python loop over the workers.
+
+    Each worker holds a row from allocate() until it has retired, rows
+    without a worker and rows of retiring workers are kept marked busy so
+    they are never picked.
+    """
+    def __init__(self, size=0):
+        self.lats = np.zeros(size)
+        self.lons = np.zeros(size)
+        self.cos_lats = np.ones(size)
+        self.last_requests = np.zeros(size)
+        self.busy = np.ones(size, dtype=bool)
+        # worker of each row, None for free rows
+        self.owners = [None] * size
+        self.free = []
+        self.closed = set()
+
+    def __len__(self):
+        return len(self.lats)
+
+    def resize(self, size):
+        old = len(self.lats)
+        if size <= old:
+            return
+        self.lats = np.resize(self.lats, size)
+        self.lons = np.resize(self.lons, size)
+        self.cos_lats = np.resize(self.cos_lats, size)
+        self.last_requests = np.resize(self.last_requests, size)
+        self.busy = np.resize(self.busy, size)
+        self.lats[old:] = 0.0
+        self.lons[old:] = 0.0
+        self.cos_lats[old:] = 1.0
+        self.last_requests[old:] = 0.0
+        self.busy[old:] = True
+
+    def allocate(self, worker):
+        """Row for worker, reusing the rows of retired workers"""
+        if self.free:
+            index = self.free.pop()
+            self.owners[index] = worker
+        else:
+            index = len(self.owners)
+            self.owners.append(worker)
+            self.resize(index + 1)
+        self.last_requests[index] = 0.0
+        self.busy[index] = False
+        return index
+
+    def close(self, index):
+        """Stop the worker of the row from being picked while it retires"""
+        self.closed.add(index)
+        self.busy[index] = True
+
+    def release(self, index):
+        """Free the row of a worker that has retired"""
+        self.closed.discard(index)
+        self.owners[index] = None
+        self.busy[index] = True
+        self.free.append(index)
+
+    def set_location(self, index, point):
+        lat = radians(point[0])
+        self.lats[index] = lat
+        self.lons[index] = radians(point[1])
+        self.cos_lats[index] = cos(lat)
+
+    def set_last_request(self, index, timestamp):
+        self.last_requests[index] = timestamp
+
+    def set_busy(self, index, busy):
+        self.busy[index] = busy or index in self.closed
+
+    def distances(self, point, radius=RADIUS):
+        """Haversine distance in SPEED_UNITs from every worker to point"""
+        lat = np.radians(point[0])
+        lon = np.radians(point[1])
+        a = (np.sin((self.lats - lat) / 2) ** 2
+             + self.cos_lats * np.cos(lat) * np.sin((self.lons - lon) / 2) ** 2)
+        return 2 * radius * np.arcsin(np.sqrt(a))
+
+    def travel_speeds(self, point, scan_delay, idle_only=True):
+        """Speed for every worker to reach point, inf for busy workers"""
+        time_diffs = np.maximum(time() - self.last_requests, scan_delay)
+        speeds = self.distances(point) / time_diffs * 3600
+        if idle_only:
+            speeds[self.busy] = np.inf
+        return speeds
+
+    def travel_speeds_many(self, points, scan_delay, idle_only=True, radius=RADIUS):
+        """Speeds with one row per point and one column per worker"""
+        points = np.radians(np.asarray(points, dtype=float))
+        lats = points[:, 0, np.newaxis]
+        lons = points[:, 1, np.newaxis]
+        a = (np.sin((self.lats - lats) / 2) ** 2
+             + self.cos_lats * np.cos(lats) * np.sin((self.lons - lons) / 2) ** 2)
+        distances = 2 * radius * np.arcsin(np.sqrt(a))
+        time_diffs = np.maximum(time() - self.last_requests, scan_delay)
+        speeds = distances / time_diffs * 3600
+        if idle_only:
+            speeds[:, self.busy] = np.inf
+        return speeds
+
+
+class WorkerLock(Lock):
+    """Lock that mirrors whether it is held into SPEEDS.busy"""
+    def __init__(self, index, **kwargs):
+        super().__init__(**kwargs)
+        self.index = index
+
+    async def acquire(self):
+        await super().acquire()
+        SPEEDS.set_busy(self.index, True)
+        return True
+
+    def release(self):
+        super().release()
+        SPEEDS.set_busy(self.index, False)
+
+
+SPEEDS = WorkerSpeeds()
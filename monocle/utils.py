@@ -67,6 +67,8 @@ def percentage_split(seq, percentages):
 
 def get_start_coords(worker_no, grid=conf.GRID, bounds=bounds):
     """Returns center of square for given worker"""
+    # workers added beyond GRID start in the squares of the first ones
+    worker_no %= grid[0] * grid[1]
     per_column = int((grid[0] * grid[1]) / grid[0])
 
     column = worker_no % per_column
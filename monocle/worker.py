@@ -1,5 +1,6 @@
 from asyncio import gather, Lock, Semaphore, sleep, CancelledError
 from collections import deque
+from functools import partial
 from time import time, monotonic
 from queue import Empty
 from itertools import cycle
@@ -11,20 +12,29 @@ from aiopogo.auth_ptc import AuthPtc
 from cyrandom import choice, randint, uniform
 from pogeo import get_distance
 
-from .db import POKESTOP_CACHE, GYM_CACHE, MYSTERY_CACHE, SIGHTING_CACHE, RAID_CACHE, WEATHER_CACHE
-from .utils import round_coords, load_pickle, get_device_info, get_start_coords, Units, randomize_point, calc_pokemon_level
+from .db import POKESTOP_CACHE, GYM_CACHE, MYSTERY_CACHE, SIGHTING_CACHE, RAID_CACHE, WEATHER_CACHE, REPEAT_CACHE
+from .utils import get_device_info, get_start_coords, Units, randomize_point, calc_pokemon_level
+from .dispatch import GYM_QUEUE, ENCOUNTER_QUEUE
+from .records import SightingRecord, MysteryRecord, FortRecord, GymDefenderRecord, RaidRecord, PokestopRecord, WeatherRecord, TargetRecord
 from .shared import get_logger, LOOP, SessionManager, run_threaded, ACCOUNTS
 from . import altitudes, avatar, bounds, db_proc, spawns, sanitized as conf
 
 if conf.NOTIFY or conf.NOTIFY_RAIDS:
     from .notification import Notifier
 
+if conf.CAPTURE_GMO:
+    from .capture import CaptureWriter
+
+if conf.VECTORIZE_SPEEDS:
+    from .speeds import SPEEDS, WorkerLock
+
 if conf.CACHE_CELLS:
     from array import typecodes
     if 'Q' in typecodes:
         from pogeo import get_cell_ids_compact as _pogeo_cell_ids
     else:
         from pogeo import get_cell_ids as _pogeo_cell_ids
+    from .cellcache import CellCache
 else:
     from pogeo import get_cell_ids as _pogeo_cell_ids
 
@@ -49,20 +59,19 @@ class Worker:
 
     download_hash = ''
     scan_delay = conf.SCAN_DELAY if conf.SCAN_DELAY >= 10 else 10
-    g = {'seen': 0, 'captchas': 0}
+    g = {'seen': 0, 'captchas': 0, 'repeats': 0, 'cells': 0, 'cells_skipped': 0}
+    # GetMapObjects responses, bytes and processing seconds by request kind
+    gmo_stats = {'full': [0, 0, 0.0], 'partial': [0, 0, 0.0]}
+    # S2 cell ID: (current_timestamp_ms of last response, of last full response)
+    cell_timestamps = {}
+    # S2 cell ID: (digest of its forts, forts, lured Pokemon, time processed)
+    cell_digests = {}
+    # S2 cell ID: (time of the last response including it, point visited)
+    cell_scans = {}
 
     if conf.CACHE_CELLS:
-        cells = load_pickle('cells') or {}
-
-        @classmethod
-        def get_cell_ids(cls, point):
-            rounded = round_coords(point, 4)
-            try:
-                return cls.cells[rounded]
-            except KeyError:
-                cells = _pogeo_cell_ids(rounded)
-                cls.cells[rounded] = cells
-                return cells
+        cells = CellCache(_pogeo_cell_ids)
+        get_cell_ids = cells.get
     else:
         get_cell_ids = _pogeo_cell_ids
 
@@ -80,6 +89,11 @@ class Worker:
     if conf.NOTIFY or conf.NOTIFY_RAIDS:
         notifier = Notifier()
 
+    if conf.CAPTURE_GMO:
+        capture = CaptureWriter()
+    else:
+        capture = None
+
     def __init__(self, worker_no):
         self.worker_no = worker_no
         self.log = get_logger('worker-{}'.format(worker_no))
@@ -91,6 +105,9 @@ class Worker:
                 self.account = self.captcha_queue.get_nowait()
             except Empty as e:
                 raise ValueError("You don't have enough accounts for the number of workers specified in GRID.") from e
+        if conf.VECTORIZE_SPEEDS:
+            # row in SPEEDS, unlike worker_no it is reused once this worker retires
+            self.slot = SPEEDS.allocate(self)
         self.username = self.account['username']
         try:
             self.location = self.account['location'][:2]
@@ -103,6 +120,11 @@ class Worker:
         self.last_action = self.last_request
         # last time of a GetMapObjects request
         self.last_gmo = self.last_request
+        # time the location was reached if it was moved to without a request
+        self.arrived = 0
+        self.nudged = False
+        self.spawn_ids_seen = set()
+        self.spawn_points_seen = set()
         try:
             self.items = self.account['items']
             self.bag_items = sum(self.items.values())
@@ -116,7 +138,10 @@ class Worker:
         self.unused_incubators = deque()
         self.initialize_api()
         # State variables
-        self.busy = Lock(loop=LOOP)
+        if conf.VECTORIZE_SPEEDS:
+            self.busy = WorkerLock(self.slot, loop=LOOP)
+        else:
+            self.busy = Lock(loop=LOOP)
         # Other variables
         self.after_spawn = 0
         self.speed = 0
@@ -127,6 +152,7 @@ class Worker:
         self.pokestops = conf.SPIN_POKESTOPS
         self.next_spin = 0
         self.handle = HandleStub()
+        self.parked = None
 
     def initialize_api(self):
         device_info = get_device_info(self.account)
@@ -632,15 +658,58 @@ class Worker:
             pass
         return responses
 
+    if conf.VECTORIZE_SPEEDS:
+        # mirrored into SPEEDS so Overseer.best_worker can compare all workers at once
+        @property
+        def location(self):
+            return self._location
+
+        @location.setter
+        def location(self, point):
+            self._location = point
+            SPEEDS.set_location(self.slot, point)
+
+        @property
+        def last_request(self):
+            return self._last_request
+
+        @last_request.setter
+        def last_request(self, timestamp):
+            self._last_request = timestamp
+            SPEEDS.set_last_request(self.slot, timestamp)
+
     def travel_speed(self, point):
         '''Fast calculation of travel speed to point'''
-        time_diff = max(time() - self.last_request, self.scan_delay)
+        time_diff = max(time() - max(self.last_request, self.arrived), self.scan_delay)
         distance = get_distance(self.location, point, UNIT)
         # conversion from seconds to hours
         speed = (distance / time_diff) * 3600
         return speed
 
+    def nudge(self, point, speed_limit=conf.SPEED_LIMIT):
+        """Walk the location toward point without making any requests
+
+        Only goes as far as speed_limit allows since the location was
+        reached, and records when the new one would have been reached so
+        that travel_speed still accounts for the whole walk.
+        """
+        since = max(self.last_request, self.arrived)
+        distance = get_distance(self.location, point, UNIT)
+        reach = speed_limit * (time() - since) / 3600
+        if not distance or reach <= 0:
+            return False
+        fraction = min(reach / distance, 1)
+        lat, lon = self.location
+        self.location = lat + (point[0] - lat) * fraction, lon + (point[1] - lon) * fraction
+        self.arrived = since + distance * fraction / speed_limit * 3600
+        self.nudged = True
+        if conf.VECTORIZE_SPEEDS:
+            SPEEDS.set_last_request(self.slot, self.arrived)
+        return True
+
     async def bootstrap_visit(self, point):
+        self.spawn_ids_seen = set()
+        self.spawn_points_seen = set()
         for _ in range(3):
             if await self.visit(point, bootstrap=True):
                 return True
@@ -761,7 +830,7 @@ class Worker:
         start = time()
 
         cell_ids = self.get_cell_ids(point)
-        since_timestamp_ms = (0,) * len(cell_ids)
+        since_timestamp_ms = self.get_since_timestamps(cell_ids)
         request = self.api.create_request()
         request.get_map_objects(cell_id=cell_ids,
                                 since_timestamp_ms=since_timestamp_ms,
@@ -789,105 +858,29 @@ class Worker:
             await self.get_player()
             raise ex.UnexpectedResponseException('Missing GetMapObjects response.')
 
-        pokemon_seen = 0
-        forts_seen = 0
-        points_seen = 0
-        seen_target = not spawn_id
+        partial_response = any(since_timestamp_ms)
+        if conf.CELL_FULL_REFRESH:
+            self.update_cell_timestamps(map_objects.map_cells, cell_ids, since_timestamp_ms)
+        if conf.FRESHNESS_WINDOW:
+            self.mark_scanned(map_objects.map_cells, point)
+
+        if self.capture is not None:
+            self.capture.add(point, self.last_gmo, map_objects)
 
         if conf.ITEM_LIMITS and self.bag_items >= self.item_capacity:
             await self.clean_bag()
 
-        for map_cell in map_objects.map_cells:
-            request_time_ms = map_cell.current_timestamp_ms
-            for pokemon in map_cell.wild_pokemons:
-                pokemon_seen += 1
-
-                normalized = self.normalize_pokemon(pokemon)
-                seen_target = seen_target or normalized['spawn_id'] == spawn_id
-
-                if (normalized not in SIGHTING_CACHE and
-                        normalized not in MYSTERY_CACHE):
-                    if (encounter_conf == 'all'
-                            or (encounter_conf == 'some'
-                            and normalized['pokemon_id'] in conf.ENCOUNTER_IDS)):
-                        try:
-                            await self.encounter(normalized, pokemon.spawn_point_id)
-                        except CancelledError:
-                            db_proc.add(normalized)
-                            raise
-                        except Exception as e:
-                            self.log.warning('{} during encounter', e.__class__.__name__)
-
-                if notify_conf and self.notifier.eligible(normalized):
-                    if encounter_conf and 'move_1' not in normalized:
-                        try:
-                            await self.encounter(normalized, pokemon.spawn_point_id)
-                        except CancelledError:
-                            db_proc.add(normalized)
-                            raise
-                        except Exception as e:
-                            self.log.warning('{} during encounter', e.__class__.__name__)
-                    LOOP.create_task(self.notifier.notify(normalized, map_objects.time_of_day))
-                db_proc.add(normalized)
-
-            for fort in map_cell.forts:
-                if not fort.enabled:
-                    continue
-                forts_seen += 1
-                if fort.type == 1:  # pokestops
-                    if fort.HasField('lure_info'):
-                        norm = self.normalize_lured(fort, request_time_ms)
-                        pokemon_seen += 1
-                        if norm not in SIGHTING_CACHE:
-                            db_proc.add(norm)
-                    if (self.pokestops and
-                            self.bag_items < self.item_capacity
-                            and time() > self.next_spin
-                            and (not conf.SMART_THROTTLE or
-                            self.smart_throttle(2))):
-                        cooldown = fort.cooldown_complete_timestamp_ms
-                        if not cooldown or time() > cooldown / 1000:
-                            await self.spin_pokestop(fort)
-                    if fort not in POKESTOP_CACHE:
-                        pokestop = self.normalize_pokestop(fort)
-                        db_proc.add(pokestop)
-                else:
-                    if fort not in GYM_CACHE:
-                        basic_gym = self.normalize_gym(fort)
-                        extended_gym = LOOP.create_task(self.gym_get_info(basic_gym))
-                        await sleep(1)
-                        db_proc.add(await extended_gym)
-
-
-                    if fort.HasField('raid_info'):
-                        if fort not in RAID_CACHE:
-                            if conf.NOTIFY_RAIDS:
-                                LOOP.create_task(self.notifier.notify_raid(fort))
-                            raid = self.normalize_raid(fort)
-                            db_proc.add(raid)
-
-            if more_points:
-                try:
-                    for p in map_cell.spawn_points:
-                        points_seen += 1
-                        p = p.latitude, p.longitude
-                        if spawns.have_point(p) or p not in bounds:
-                            continue
-                        spawns.cell_points.add(p)
-                except KeyError:
-                    pass
-
-        if map_objects.client_weather:
-            for w in map_objects.client_weather:
-                weather = self.normalize_weather(w, map_objects.time_of_day)
-                if weather not in WEATHER_CACHE:
-                    db_proc.add(weather)
+        process_start = monotonic()
+        pokemon_seen, forts_seen, points_seen, seen_target = await self.process_map_objects(
+            map_objects, spawn_id, encounter_conf, notify_conf, more_points,
+            partial_response=partial_response)
+        stats = self.gmo_stats['partial' if partial_response else 'full']
+        stats[0] += 1
+        stats[1] += map_objects.ByteSize()
+        stats[2] += monotonic() - process_start
 
         if spawn_id:
-            db_proc.add({
-                'type': 'target',
-                'seen': seen_target,
-                'spawn_id': spawn_id})
+            db_proc.add(TargetRecord(spawn_id, seen_target))
 
         if (conf.INCUBATE_EGGS and self.unused_incubators
                 and self.eggs and (not conf.SMART_THROTTLE or self.smart_throttle(1))):
@@ -900,7 +893,8 @@ class Worker:
             self.empty_visits = 0
         else:
             self.empty_visits += 1
-            if forts_seen == 0:
+            # unchanged forts are left out of partial responses
+            if forts_seen == 0 and not partial_response:
                 self.log.warning('Nothing seen by {}. Speed: {:.2f}', self.username, self.speed)
                 self.error_code = '0 SEEN'
             else:
@@ -924,6 +918,217 @@ class Worker:
         self.handle = LOOP.call_later(60, self.unset_code)
         return pokemon_seen + forts_seen + points_seen
 
+    @classmethod
+    def get_since_timestamps(cls, cell_ids, refresh=conf.CELL_FULL_REFRESH):
+        """Ask only for changes since the last response for each cell
+
+        Cells that haven't had a full response within the last refresh
+        seconds (or ever) get 0 so the server sends everything.
+        """
+        if not refresh:
+            return (0,) * len(cell_ids)
+        oldest = (time() - refresh) * 1000
+        timestamps = cls.cell_timestamps
+        since = []
+        for cell_id in cell_ids:
+            try:
+                current, full = timestamps[cell_id]
+                since.append(current if full > oldest else 0)
+            except KeyError:
+                since.append(0)
+        return since
+
+    @classmethod
+    def update_cell_timestamps(cls, map_cells, cell_ids, since_timestamp_ms):
+        sent = dict(zip(cell_ids, since_timestamp_ms))
+        timestamps = cls.cell_timestamps
+        for map_cell in map_cells:
+            cell_id = map_cell.s2_cell_id
+            current = map_cell.current_timestamp_ms
+            try:
+                if sent[cell_id]:
+                    timestamps[cell_id] = current, timestamps[cell_id][1]
+                else:
+                    timestamps[cell_id] = current, current
+            except KeyError:
+                pass
+
+    @classmethod
+    def mark_scanned(cls, map_cells, point):
+        scans = cls.cell_scans
+        for map_cell in map_cells:
+            scans[map_cell.s2_cell_id] = map_cell.current_timestamp_ms / 1000, point
+
+    @classmethod
+    def recently_scanned(cls, point, since, radius=50):
+        """Whether a visit after since was close enough to see point's Pokemon
+
+        Only the latest visit to each of the point's cells is remembered.
+        """
+        scans = cls.cell_scans
+        for cell_id in cls.get_cell_ids(point):
+            try:
+                scanned, location = scans[cell_id]
+            except KeyError:
+                continue
+            if scanned > since and get_distance(location, point) < radius:
+                return True
+        return False
+
+    async def process_map_objects(self, map_objects, spawn_id=None,
+            encounter_conf=conf.ENCOUNTER, notify_conf=conf.NOTIFY,
+            more_points=conf.MORE_POINTS, recheck=600, partial_response=False):
+        """Normalize a GetMapObjects response and queue new objects for the DB
+
+        Returns the number of Pokemon, forts and spawn points seen, and
+        whether the targeted spawn_id (if any) was among them. The spawn IDs
+        of the wild Pokemon are left in spawn_ids_seen, and the coordinates
+        of the cells' spawn points in spawn_points_seen.
+        """
+        spawn_ids = set()
+        spawn_points = set()
+        pokemon_seen = 0
+        forts_seen = 0
+        points_seen = 0
+        repeats = 0
+        cells_seen = 0
+        cells_skipped = 0
+        seen_target = not spawn_id
+
+        for map_cell in map_objects.map_cells:
+            request_time_ms = map_cell.current_timestamp_ms
+            for pokemon in map_cell.wild_pokemons:
+                pokemon_seen += 1
+
+                known_spawn_id = REPEAT_CACHE.check(pokemon)
+                if known_spawn_id is not None:
+                    repeats += 1
+                    spawn_ids.add(known_spawn_id)
+                    seen_target = seen_target or known_spawn_id == spawn_id
+                    continue
+
+                normalized = self.normalize_pokemon(pokemon)
+                spawn_ids.add(normalized.spawn_id)
+                seen_target = seen_target or normalized.spawn_id == spawn_id
+
+                new = (normalized not in SIGHTING_CACHE
+                       and normalized not in MYSTERY_CACHE)
+                encounter = new and (encounter_conf == 'all'
+                        or (encounter_conf == 'some'
+                        and normalized.pokemon_id in conf.ENCOUNTER_IDS))
+
+                # the encounter queue gets a copy, normalized is read by the
+                # DB thread while the encounter adds IVs on this one
+                if notify_conf and self.notifier.eligible(normalized):
+                    if encounter_conf:
+                        # the queue decides whether it still has to encounter
+                        queued = normalized.copy()
+                        notify = partial(self.notifier.notify, queued, map_objects.time_of_day)
+                        ENCOUNTER_QUEUE.put(queued, pokemon.spawn_point_id, notify)
+                    else:
+                        LOOP.create_task(self.notifier.notify(normalized, map_objects.time_of_day))
+                elif encounter:
+                    ENCOUNTER_QUEUE.put(normalized.copy(), pokemon.spawn_point_id)
+                # saved right away, the encounter queue adds IVs once it gets to it
+                db_proc.add(normalized)
+                REPEAT_CACHE.add(pokemon, normalized)
+
+            if map_cell.forts and partial_response:
+                # only the changed forts are listed, which says nothing about
+                # the cell's full digest and counts, so those are left as is
+                cell_forts, cell_lures = await self.process_forts(
+                    map_cell.forts, request_time_ms)
+                forts_seen += cell_forts
+                pokemon_seen += cell_lures
+                cells_seen += 1
+            elif map_cell.forts:
+                cell_id = map_cell.s2_cell_id
+                digest = hash(tuple((f.id, f.last_modified_timestamp_ms, f.enabled,
+                                     f.raid_info.raid_end_ms, f.raid_info.raid_pokemon.pokemon_id)
+                                    for f in map_cell.forts))
+                try:
+                    previous, cell_forts, cell_lures, checked = self.cell_digests[cell_id]
+                except KeyError:
+                    previous = None
+                now = time()
+                # a cell is skipped when nothing in it changed, unless a
+                # PokéStop in it could be spun or it is due to be checked again
+                if (digest == previous and now - checked < recheck and not (
+                        self.pokestops and self.bag_items < self.item_capacity
+                        and now > self.next_spin)):
+                    cells_skipped += 1
+                else:
+                    cell_forts, cell_lures = await self.process_forts(
+                        map_cell.forts, request_time_ms)
+                    self.cell_digests[cell_id] = digest, cell_forts, cell_lures, now
+                forts_seen += cell_forts
+                pokemon_seen += cell_lures
+                cells_seen += 1
+
+            try:
+                cell_points = [(p.latitude, p.longitude) for p in map_cell.spawn_points]
+            except KeyError:
+                cell_points = ()
+            spawn_points.update(cell_points)
+            if more_points:
+                for p in cell_points:
+                    points_seen += 1
+                    if spawns.have_point(p) or p not in bounds:
+                        continue
+                    spawns.cell_points.add(p)
+
+        if map_objects.client_weather:
+            for w in map_objects.client_weather:
+                weather = self.normalize_weather(w, map_objects.time_of_day)
+                if weather not in WEATHER_CACHE:
+                    db_proc.add(weather)
+
+        self.g['repeats'] += repeats
+        self.g['cells'] += cells_seen
+        self.g['cells_skipped'] += cells_skipped
+        self.spawn_ids_seen = spawn_ids
+        self.spawn_points_seen = spawn_points
+        return pokemon_seen, forts_seen, points_seen, seen_target
+
+    async def process_forts(self, forts, request_time_ms):
+        """Queue new or changed forts and lured Pokemon, spin PokéStops
+
+        Returns the number of enabled forts and of lured Pokemon.
+        """
+        forts_seen = lures_seen = 0
+        for fort in forts:
+            if not fort.enabled:
+                continue
+            forts_seen += 1
+            if fort.type == 1:  # pokestops
+                if fort.HasField('lure_info'):
+                    norm = self.normalize_lured(fort, request_time_ms)
+                    lures_seen += 1
+                    if norm not in SIGHTING_CACHE:
+                        db_proc.add(norm)
+                if (self.pokestops and
+                        self.bag_items < self.item_capacity
+                        and time() > self.next_spin
+                        and (not conf.SMART_THROTTLE or
+                        self.smart_throttle(2))):
+                    cooldown = fort.cooldown_complete_timestamp_ms
+                    if not cooldown or time() > cooldown / 1000:
+                        await self.spin_pokestop(fort)
+                if fort not in POKESTOP_CACHE:
+                    pokestop = self.normalize_pokestop(fort)
+                    db_proc.add(pokestop)
+            else:
+                if fort not in GYM_CACHE:
+                    GYM_QUEUE.put(self.normalize_gym(fort), self)
+
+                if fort.HasField('raid_info'):
+                    if fort not in RAID_CACHE:
+                        if conf.NOTIFY_RAIDS:
+                            LOOP.create_task(self.notifier.notify_raid(fort))
+                        raid = self.normalize_raid(fort)
+                        db_proc.add(raid)
+        return forts_seen, lures_seen
+
     def smart_throttle(self, requests=1):
         try:
             # https://en.wikipedia.org/wiki/Linear_equation#Two_variables
@@ -1008,14 +1213,14 @@ class Worker:
         self.error_code = '!'
 
     async def encounter(self, pokemon, spawn_id):
-        distance_to_pokemon = get_distance(self.location, (pokemon['lat'], pokemon['lon']))
+        distance_to_pokemon = get_distance(self.location, (pokemon.lat, pokemon.lon))
 
         self.error_code = '~'
 
         if distance_to_pokemon > 48:
             percent = 1 - (47 / distance_to_pokemon)
-            lat_change = (self.location[0] - pokemon['lat']) * percent
-            lon_change = (self.location[1] - pokemon['lon']) * percent
+            lat_change = (self.location[0] - pokemon.lat) * percent
+            lon_change = (self.location[1] - pokemon.lon) * percent
             self.location = (
                 self.location[0] - lat_change,
                 self.location[1] - lon_change)
@@ -1029,7 +1234,7 @@ class Worker:
         await self.random_sleep(delay_required, delay_required + 1.5)
 
         request = self.api.create_request()
-        request = request.encounter(encounter_id=pokemon['encounter_id'],
+        request = request.encounter(encounter_id=pokemon.encounter_id,
                                     spawn_point_id=spawn_id,
                                     player_latitude=self.location[0],
                                     player_longitude=self.location[1])
@@ -1040,24 +1245,24 @@ class Worker:
             result = responses['ENCOUNTER'].status
             if result == 1:
                 pdata = responses['ENCOUNTER'].wild_pokemon.pokemon_data
-                pokemon['move_1'] = pdata.move_1
-                pokemon['move_2'] = pdata.move_2
-                pokemon['individual_attack'] = pdata.individual_attack
-                pokemon['individual_defense'] = pdata.individual_defense
-                pokemon['individual_stamina'] = pdata.individual_stamina
-                # pokemon['height'] = pdata.height_m
-                # pokemon['weight'] = pdata.weight_kg
-                pokemon['gender'] = pdata.pokemon_display.gender
-                pokemon['cp'] = pdata.cp
-                pokemon['level'] = calc_pokemon_level(pdata.cp_multiplier)
+                pokemon.move_1 = pdata.move_1
+                pokemon.move_2 = pdata.move_2
+                pokemon.individual_attack = pdata.individual_attack
+                pokemon.individual_defense = pdata.individual_defense
+                pokemon.individual_stamina = pdata.individual_stamina
+                # pokemon.height = pdata.height_m
+                # pokemon.weight = pdata.weight_kg
+                pokemon.gender = pdata.pokemon_display.gender
+                pokemon.cp = pdata.cp
+                pokemon.level = calc_pokemon_level(pdata.cp_multiplier)
             elif result == 4:
                 self.log.info('Pokemon that should be encountered has fled')
             elif result == 7:
                 self.log.warning('Could not encounter #{} because the bag of {} is full.',
-                        pokemon['pokemon_id'], self.username)
+                        pokemon.pokemon_id, self.username)
                 await self.swap_account(reason='full pkmn bag')
             else:
-                self.log.error('Failed encountering #{}: {}', pokemon['pokemon_id'], result)
+                self.log.error('Failed encountering #{}: {}', pokemon.pokemon_id, result)
         except KeyError:
             self.log.error('Missing encounter response.')
         self.error_code = '!'
@@ -1065,7 +1270,7 @@ class Worker:
 
     async def gym_get_info(self, gym):
 
-        distance_to_gym = get_distance(self.location, (gym['lat'], gym['lon']))
+        distance_to_gym = get_distance(self.location, (gym.lat, gym.lon))
         if distance_to_gym > 240:
             return gym
         self.error_code = 'G'
@@ -1074,11 +1279,11 @@ class Worker:
         self.simulate_jitter(amount=0.00001)
 
         request = self.api.create_request()
-        request.gym_get_info(gym_id=gym['external_id'],
+        request.gym_get_info(gym_id=gym.external_id,
                              player_lat_degrees=self.location[0],
                              player_lng_degrees=self.location[1],
-                             gym_lat_degrees=gym['lat'],
-                             gym_lng_degrees=gym['lon'])
+                             gym_lat_degrees=gym.lat,
+                             gym_lng_degrees=gym.lon)
         responses = await self.call(request, action=1)
 
         info = responses['GYM_GET_INFO']
@@ -1087,13 +1292,13 @@ class Worker:
 
         if result == 1:
             try:
-                gym['name'] = name
-                gym['url'] = info.url.replace('http:', 'https:')
+                gym.name = name
+                gym.url = info.url.replace('http:', 'https:')
 
                 for gym_defender in info.gym_status_and_defenders.gym_defender:
                     normalized_defender = self.normalize_gym_defender(
                         gym_defender)
-                    gym['gym_defenders'].append(normalized_defender)
+                    gym.gym_defenders.append(normalized_defender)
 
             except KeyError as e:
                 self.log.error(
@@ -1287,6 +1492,45 @@ class Worker:
             self.extra_queue.put(self.account)
             await self.new_account()
 
+    def park(self):
+        """Stop being assigned visits until woken, keeping the session"""
+        if self.parked is None:
+            self.parked = LOOP.create_future()
+            LOOP.create_task(self.hold_parked(self.parked))
+
+    async def hold_parked(self, parked):
+        # holding the busy lock keeps every scheduler away from this worker
+        async with self.busy:
+            if not parked.done():
+                self.error_code = 'PARKED'
+                await parked
+                self.error_code = None
+
+    def wake(self):
+        parked, self.parked = self.parked, None
+        if parked is not None and not parked.done():
+            parked.set_result(None)
+
+    def retire(self):
+        """Stop being assigned visits, and return the account to the extra
+        queue once the current visit ends"""
+        if conf.VECTORIZE_SPEEDS:
+            SPEEDS.close(self.slot)
+        self.wake()
+        return LOOP.create_task(self.hand_back())
+
+    async def hand_back(self):
+        async with self.busy:
+            self.error_code = 'RETIRED'
+            self.log.warning('Retiring {}, not needed for the spawns due.', self.username)
+            self.update_accounts_dict()
+            self.extra_queue.put(self.account)
+            if conf.MAP_WORKERS:
+                # or the live worker map keeps showing it
+                self.worker_dict.pop(self.worker_no, None)
+        if conf.VECTORIZE_SPEEDS:
+            SPEEDS.release(self.slot)
+
     async def swap_account(self, reason=''):
         self.error_code = 'SWAPPING'
         self.log.warning('Swapping out {} because {}.', self.username, reason)
@@ -1303,7 +1547,13 @@ class Worker:
             try:
                 self.account = self.extra_queue.get_nowait()
             except Empty:
-                self.account = await run_threaded(self.extra_queue.get)
+                # poll so that waiting workers never hold a thread for long
+                while True:
+                    try:
+                        self.account = await run_threaded(self.extra_queue.get, True, 5, pool='wait')
+                        break
+                    except Empty:
+                        pass
         self.username = self.account['username']
         try:
             self.location = self.account['location'][:2]
@@ -1314,6 +1564,7 @@ class Worker:
         self.last_request = self.account.get('time', 0)
         self.last_action = self.last_request
         self.last_gmo = self.last_request
+        self.arrived = 0
         try:
             self.items = self.account['items']
             self.bag_items = sum(self.items.values())
@@ -1335,127 +1586,105 @@ class Worker:
         tsm = raw.last_modified_timestamp_ms
         tss = round(tsm / 1000)
         tth = raw.time_till_hidden_ms
-        norm = {
-            'type': 'pokemon',
-            'encounter_id': raw.encounter_id,
-            'pokemon_id': raw.pokemon_data.pokemon_id,
-            'lat': raw.latitude,
-            'lon': raw.longitude,
-            'spawn_id': int(raw.spawn_point_id, 16) if spawn_int else raw.spawn_point_id,
-            'seen': tss
-        }
+        spawn_id = int(raw.spawn_point_id, 16) if spawn_int else raw.spawn_point_id
         if tth > 0 and tth <= 90000:
-            norm['expire_timestamp'] = round((tsm + tth) / 1000)
-            norm['time_till_hidden'] = tth / 1000
-            norm['inferred'] = False
+            norm = SightingRecord(raw.encounter_id, raw.pokemon_data.pokemon_id,
+                                  raw.latitude, raw.longitude, spawn_id)
+            norm.expire_timestamp = round((tsm + tth) / 1000)
+            norm.time_till_hidden = tth / 1000
+            norm.inferred = False
         else:
-            despawn = spawns.get_despawn_time(norm['spawn_id'], tss)
+            despawn = spawns.get_despawn_time(spawn_id, tss)
             if despawn:
-                norm['expire_timestamp'] = despawn
-                norm['time_till_hidden'] = despawn - tss
-                norm['inferred'] = True
+                norm = SightingRecord(raw.encounter_id, raw.pokemon_data.pokemon_id,
+                                      raw.latitude, raw.longitude, spawn_id)
+                norm.expire_timestamp = despawn
+                norm.time_till_hidden = despawn - tss
+                norm.inferred = True
             else:
-                norm['type'] = 'mystery'
+                norm = MysteryRecord(raw.encounter_id, raw.pokemon_data.pokemon_id,
+                                     raw.latitude, raw.longitude, spawn_id)
+        norm.seen = tss
         if raw.pokemon_data.pokemon_display:
             if raw.pokemon_data.pokemon_display.form:
-                norm['display'] = raw.pokemon_data.pokemon_display.form
+                norm.display = raw.pokemon_data.pokemon_display.form
         return norm
 
     @staticmethod
     def normalize_lured(raw, now):
         lure = raw.lure_info
-        return {
-            'type': 'pokemon',
-            'encounter_id': lure.encounter_id,
-            'pokemon_id': lure.active_pokemon_id,
-            'expire_timestamp': lure.lure_expires_timestamp_ms // 1000,
-            'lat': raw.latitude,
-            'lon': raw.longitude,
-            'spawn_id': 0 if conf.SPAWN_ID_INT else 'LURED',
-            'time_till_hidden': (lure.lure_expires_timestamp_ms - now) / 1000,
-            'inferred': 'pokestop'
-        }
+        norm = SightingRecord(lure.encounter_id, lure.active_pokemon_id,
+                              raw.latitude, raw.longitude,
+                              0 if conf.SPAWN_ID_INT else 'LURED')
+        norm.expire_timestamp = lure.lure_expires_timestamp_ms // 1000
+        norm.time_till_hidden = (lure.lure_expires_timestamp_ms - now) / 1000
+        norm.inferred = 'pokestop'
+        return norm
 
     @staticmethod
     def normalize_gym(raw):
-        return {
-            'type': 'fort',
-            'external_id': raw.id,
-            'lat': raw.latitude,
-            'lon': raw.longitude,
-            'team': raw.owned_by_team,
-            'prestige': raw.gym_points,
-            'guard_pokemon_id': raw.guard_pokemon_id,
-            'last_modified': raw.last_modified_timestamp_ms // 1000,
-            'slots_available': raw.gym_display.slots_available,
-            'name': None,
-            'url': None,
-            'gym_defenders': [],
-        }
+        return FortRecord(
+            raw.id,
+            raw.latitude,
+            raw.longitude,
+            raw.owned_by_team,
+            raw.gym_points,
+            raw.guard_pokemon_id,
+            raw.last_modified_timestamp_ms // 1000,
+            raw.gym_display.slots_available
+        )
 
     @staticmethod
     def normalize_raid(raw):
-        return {
-            'type': 'raid',
-            'external_id': raw.raid_info.raid_seed,
-            'fort_external_id': raw.id,
-            'lat': raw.latitude,
-            'lon': raw.longitude,
-            'level': raw.raid_info.raid_level,
-            'pokemon_id': raw.raid_info.raid_pokemon.pokemon_id if raw.raid_info.raid_pokemon else 0,
-            'move_1': raw.raid_info.raid_pokemon.move_1 if raw.raid_info.raid_pokemon else 0,
-            'move_2': raw.raid_info.raid_pokemon.move_2 if raw.raid_info.raid_pokemon else 0,
-            'time_spawn': raw.raid_info.raid_spawn_ms // 1000,
-            'time_battle': raw.raid_info.raid_battle_ms // 1000,
-            'time_end': raw.raid_info.raid_end_ms // 1000,
-            'cp': raw.raid_info.raid_pokemon.cp if raw.raid_info.raid_pokemon else 0
-        }
-
+        raid_info = raw.raid_info
+        raid_pokemon = raid_info.raid_pokemon
+        return RaidRecord(
+            raid_info.raid_seed,
+            raw.id,
+            raw.latitude,
+            raw.longitude,
+            raid_info.raid_level,
+            raid_pokemon.pokemon_id if raid_pokemon else 0,
+            raid_pokemon.move_1 if raid_pokemon else 0,
+            raid_pokemon.move_2 if raid_pokemon else 0,
+            raid_info.raid_spawn_ms // 1000,
+            raid_info.raid_battle_ms // 1000,
+            raid_info.raid_end_ms // 1000,
+            raid_pokemon.cp if raid_pokemon else 0
+        )
 
     @staticmethod
     def normalize_gym_defender(raw):
-
         pokemon = raw.motivated_pokemon.pokemon
-
-        obj = {
-            'type': 'gym_defender',
-            'external_id': pokemon.id,
-            'pokemon_id': pokemon.pokemon_id,
-            'owner_name': pokemon.owner_name,
-            'nickname': pokemon.nickname,
-            'cp': pokemon.cp,
-            'stamina': pokemon.stamina,
-            'stamina_max': pokemon.stamina_max,
-            'atk_iv': pokemon.individual_attack,
-            'def_iv': pokemon.individual_defense,
-            'sta_iv': pokemon.individual_stamina,
-            'move_1': pokemon.move_1,
-            'move_2': pokemon.move_2,
-            'battles_attacked': pokemon.battles_attacked,
-            'battles_defended': pokemon.battles_defended,
-            'num_upgrades': 0,
-        }
-
-        if hasattr(pokemon, 'num_upgrades'):
-            obj['num_upgrades'] = pokemon.num_upgrades
-
-        return obj
+        return GymDefenderRecord(
+            pokemon.id,
+            pokemon.pokemon_id,
+            pokemon.owner_name,
+            pokemon.nickname,
+            pokemon.cp,
+            pokemon.stamina,
+            pokemon.stamina_max,
+            pokemon.individual_attack,
+            pokemon.individual_defense,
+            pokemon.individual_stamina,
+            pokemon.move_1,
+            pokemon.move_2,
+            pokemon.battles_attacked,
+            pokemon.battles_defended,
+            getattr(pokemon, 'num_upgrades', 0)
+        )
 
     @staticmethod
     def normalize_pokestop(raw):
         lure_start = 0
         if 501 in raw.active_fort_modifier: #501 is the code for lure
             lure_start = raw.last_modified_timestamp_ms // 1000
-        return {
-            'type': 'pokestop',
-            'external_id': raw.id,
-            'lat': raw.latitude,
-            'lon': raw.longitude,
-            'lure_start': lure_start,
-            'lure_username': None,
-            'name': None,
-            'url': None
-        }
+        return PokestopRecord(
+            raw.id,
+            raw.latitude,
+            raw.longitude,
+            lure_start
+        )
 
     @staticmethod
     def normalize_weather(raw, time_of_day):
@@ -1466,14 +1695,13 @@ class Worker:
                 warn = warn or a.warn_weather
                 if a.severity > alert_severity:
                     alert_severity = a.severity
-        return {
-            'type': 'weather',
-            's2_cell_id': raw.s2_cell_id,
-            'condition': raw.gameplay_weather.gameplay_condition,
-            'alert_severity': alert_severity,
-            'warn': warn,
-            'day': time_of_day
-        }
+        return WeatherRecord(
+            raw.s2_cell_id,
+            raw.gameplay_weather.gameplay_condition,
+            alert_severity,
+            warn,
+            time_of_day
+        )
 
     @staticmethod
     async def random_sleep(minimum=10.1, maximum=14, loop=LOOP):
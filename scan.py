@@ -14,7 +14,7 @@ from multiprocessing.managers import BaseManager, DictProxy
 from queue import Queue, Full
 from argparse import ArgumentParser
 from signal import signal, SIGINT, SIGTERM, SIG_IGN
-from logging import getLogger, basicConfig, WARNING, INFO
+from logging import getLogger, basicConfig, Formatter, StreamHandler, WARNING, INFO
 from logging.handlers import RotatingFileHandler
 from os.path import exists, join
 from sys import platform
@@ -23,12 +23,13 @@ from time import monotonic, sleep
 from sqlalchemy.exc import DBAPIError
 from aiopogo import close_sessions, activate_hash_server
 
-from monocle.shared import LOOP, get_logger, SessionManager, ACCOUNTS
+from monocle.shared import LOOP, LOG_QUEUE, get_logger, SessionManager, ACCOUNTS
 from monocle.utils import get_address, dump_pickle
 from monocle.worker import Worker
 from monocle.overseer import Overseer
 from monocle.db import GYM_CACHE, RAID_CACHE
-from monocle import altitudes, db_proc, spawns
+from monocle.dispatch import GYM_QUEUE, ENCOUNTER_QUEUE
+from monocle import altitudes, db_proc, monitor, spawns
 
 
 class AccountManager(BaseManager):
@@ -105,16 +106,16 @@ def parse_args():
 
 def configure_logger(filename='scan.log'):
     if filename:
-        handlers = (RotatingFileHandler(filename, maxBytes=500000, backupCount=4),)
+        handler = RotatingFileHandler(filename, maxBytes=500000, backupCount=4)
     else:
-        handlers = None
-    basicConfig(
-        format='[{asctime}][{levelname:>8s}][{name}] {message}',
+        handler = StreamHandler()
+    handler.setFormatter(Formatter(
+        fmt='[{asctime}][{levelname:>8s}][{name}] {message}',
         datefmt='%Y-%m-%d %X',
-        style='{',
-        level=INFO,
-        handlers=handlers
-    )
+        style='{'
+    ))
+    LOG_QUEUE.listen((handler,))
+    basicConfig(level=INFO, handlers=(LOG_QUEUE,))
 
 
 def exception_handler(loop, context):
@@ -130,6 +131,10 @@ def cleanup(overseer, manager):
     try:
         overseer.print_handle.cancel()
         overseer.running = False
+        GYM_QUEUE.close()
+        ENCOUNTER_QUEUE.close()
+        for worker in overseer.workers:
+            worker.wake()
         print('Exiting, please wait until all tasks finish')
 
         log = get_logger('cleanup')
@@ -146,6 +151,7 @@ def cleanup(overseer, manager):
             log.exception('A wild {} appeared during exit!', e.__class__.__name__)
 
         db_proc.stop()
+        monitor.stop()
         overseer.refresh_dict()
 
         print('Dumping pickles...')
@@ -153,7 +159,9 @@ def cleanup(overseer, manager):
         GYM_CACHE.pickle()
         altitudes.pickle()
         if conf.CACHE_CELLS:
-            dump_pickle('cells', Worker.cells)
+            Worker.cells.close()
+        if conf.CAPTURE_GMO:
+            Worker.capture.close()
 
         spawns.pickle()
         while not db_proc.queue.empty():
@@ -168,6 +176,7 @@ def cleanup(overseer, manager):
         SessionManager.close()
         close_sessions()
         LOOP.close()
+        LOG_QUEUE.stop()
         print('Done.')
 
 
@@ -198,6 +207,8 @@ def main():
             raise OSError('Another instance is running with the same socket. Stop that process or: rm {}'.format(address)) from e
 
     LOOP.set_exception_handler(exception_handler)
+    if conf.LOOP_LAG_THRESHOLD:
+        monitor.start()
 
     overseer = Overseer(manager)
     overseer.start(args.status_bar)
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+
+import sys
+import tracemalloc
+
+from argparse import ArgumentParser
+from pathlib import Path
+from queue import Queue
+from timeit import timeit
+from types import SimpleNamespace
+
+monocle_dir = Path(__file__).resolve().parents[1]
+sys.path.append(str(monocle_dir))
+
+from monocle.records import SightingRecord, MysteryRecord, FortRecord, PokestopRecord
+
+parser = ArgumentParser(description='Compare the slotted records passed to '
+                        'db_proc with the dicts they replaced.')
+parser.add_argument(
+    '-n', '--number',
+    type=int,
+    default=100000,
+    help='objects to create per measurement'
+)
+args = parser.parse_args()
+
+
+RAW_POKEMON = SimpleNamespace(
+    encounter_id=12834727818719182,
+    last_modified_timestamp_ms=1500000000000,
+    time_till_hidden_ms=45000,
+    spawn_point_id='87528ff5c5b',
+    latitude=40.7645,
+    longitude=-111.8911,
+    pokemon_data=SimpleNamespace(pokemon_id=16, pokemon_display=None))
+RAW_FORT = SimpleNamespace(
+    id='ab3241ae3f4d4bd3a14ba31f4ecce5d7.16',
+    latitude=40.7645,
+    longitude=-111.8911,
+    owned_by_team=2,
+    gym_points=0,
+    guard_pokemon_id=149,
+    last_modified_timestamp_ms=1500000000000,
+    gym_display=SimpleNamespace(slots_available=3),
+    active_fort_modifier=())
+
+
+def pokemon_dict(raw):
+    tsm = raw.last_modified_timestamp_ms
+    tth = raw.time_till_hidden_ms
+    norm = {
+        'type': 'pokemon',
+        'encounter_id': raw.encounter_id,
+        'pokemon_id': raw.pokemon_data.pokemon_id,
+        'lat': raw.latitude,
+        'lon': raw.longitude,
+        'spawn_id': int(raw.spawn_point_id, 16),
+        'seen': round(tsm / 1000)
+    }
+    norm['expire_timestamp'] = round((tsm + tth) / 1000)
+    norm['time_till_hidden'] = tth / 1000
+    norm['inferred'] = False
+    return norm
+
+
+def pokemon_record(raw):
+    tsm = raw.last_modified_timestamp_ms
+    tth = raw.time_till_hidden_ms
+    norm = SightingRecord(raw.encounter_id, raw.pokemon_data.pokemon_id,
+                          raw.latitude, raw.longitude, int(raw.spawn_point_id, 16))
+    norm.expire_timestamp = round((tsm + tth) / 1000)
+    norm.time_till_hidden = tth / 1000
+    norm.inferred = False
+    norm.seen = round(tsm / 1000)
+    return norm
+
+
+def gym_dict(raw):
+    return {
+        'type': 'fort',
+        'external_id': raw.id,
+        'lat': raw.latitude,
+        'lon': raw.longitude,
+        'team': raw.owned_by_team,
+        'prestige': raw.gym_points,
+        'guard_pokemon_id': raw.guard_pokemon_id,
+        'last_modified': raw.last_modified_timestamp_ms // 1000,
+        'slots_available': raw.gym_display.slots_available,
+        'name': None,
+        'url': None,
+        'gym_defenders': [],
+    }
+
+
+def gym_record(raw):
+    return FortRecord(
+        raw.id,
+        raw.latitude,
+        raw.longitude,
+        raw.owned_by_team,
+        raw.gym_points,
+        raw.guard_pokemon_id,
+        raw.last_modified_timestamp_ms // 1000,
+        raw.gym_display.slots_available
+    )
+
+
+COUNTS = [0, 0, 0]
+
+
+def add_pokemon(item):
+    COUNTS[0] += 1
+
+
+def add_mystery(item):
+    COUNTS[1] += 1
+
+
+def add_fort(item):
+    COUNTS[2] += 1
+
+
+def add_other(item):
+    pass
+
+
+def dispatch_chain(items):
+    for item in items:
+        item_type = item['type']
+        if item_type == 'pokemon':
+            add_pokemon(item)
+        elif item_type == 'mystery':
+            add_mystery(item)
+        elif item_type == 'raid':
+            add_other(item)
+        elif item_type == 'fort':
+            add_fort(item)
+        elif item_type == 'pokestop':
+            add_other(item)
+
+
+HANDLERS = {
+    SightingRecord: add_pokemon,
+    MysteryRecord: add_mystery,
+    FortRecord: add_fort,
+    PokestopRecord: add_other
+}
+
+
+def dispatch_table(items, handlers=HANDLERS):
+    for item in items:
+        handlers[item.__class__](item)
+
+
+def queued_memory(factory, raw, number):
+    """Bytes allocated per object while number of them wait in a Queue"""
+    queue = Queue()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for _ in range(number):
+        queue.put(factory(raw))
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / number
+
+
+def per_call(stmt, number):
+    return timeit(stmt, number=number) / number * 1000000000
+
+
+def main():
+    number = args.number
+
+    print('Allocation per queued object (bytes):')
+    for name, factories, raw in (
+            ('pokemon', (pokemon_dict, pokemon_record), RAW_POKEMON),
+            ('gym', (gym_dict, gym_record), RAW_FORT)):
+        old, new = (queued_memory(f, raw, number) for f in factories)
+        print('  {:8} dict {:7.1f}  record {:7.1f}  ({:.0%} of dict)'.format(
+            name, old, new, new / old))
+
+    print('Normalization time per object (ns):')
+    for name, factories, raw in (
+            ('pokemon', (pokemon_dict, pokemon_record), RAW_POKEMON),
+            ('gym', (gym_dict, gym_record), RAW_FORT)):
+        old, new = (per_call(lambda: f(raw), number) for f in factories)
+        print('  {:8} dict {:7.1f}  record {:7.1f}'.format(name, old, new))
+
+    old_items = [pokemon_dict(RAW_POKEMON), gym_dict(RAW_FORT)] * (number // 2)
+    new_items = [pokemon_record(RAW_POKEMON), gym_record(RAW_FORT)] * (number // 2)
+    old = timeit(lambda: dispatch_chain(old_items), number=5) / 5 / len(old_items) * 1000000000
+    new = timeit(lambda: dispatch_table(new_items), number=5) / 5 / len(new_items) * 1000000000
+    print('Dispatch time per item (ns):')
+    print('  if/elif on type {:7.1f}  table on class {:7.1f}'.format(old, new))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+import sys
+
+from argparse import ArgumentParser
+from pathlib import Path
+from random import uniform
+from time import time
+from timeit import timeit
+
+monocle_dir = Path(__file__).resolve().parents[1]
+sys.path.append(str(monocle_dir))
+
+from pogeo import get_distance
+
+from monocle import sanitized as conf
+from monocle.speeds import WorkerSpeeds
+from monocle.utils import Units
+
+parser = ArgumentParser(description='Compare finding the slowest idle worker '
+                        'with a Python loop and with VECTORIZE_SPEEDS.')
+parser.add_argument(
+    'workers',
+    nargs='*',
+    type=int,
+    default=[1000, 10000],
+    help='worker counts to measure'
+)
+parser.add_argument(
+    '-p', '--points',
+    type=int,
+    default=100,
+    help='points per batch for the batched measurement'
+)
+args = parser.parse_args()
+
+UNIT = getattr(Units, conf.SPEED_UNIT.lower()).value
+SCAN_DELAY = 10
+
+
+class FakeWorker:
+    __slots__ = ('location', 'last_request', 'busy')
+
+    def __init__(self, location, last_request, busy):
+        self.location = location
+        self.last_request = last_request
+        self.busy = busy
+
+    def travel_speed(self, point):
+        time_diff = max(time() - self.last_request, SCAN_DELAY)
+        distance = get_distance(self.location, point, UNIT)
+        return (distance / time_diff) * 3600
+
+
+def random_point():
+    return uniform(40.70, 40.80), uniform(-111.95, -111.85)
+
+
+def python_best(workers, point):
+    """The loop in Overseer.best_worker, without GOOD_ENOUGH"""
+    lowest_speed = float('inf')
+    worker = None
+    for w in workers:
+        if w.busy:
+            continue
+        speed = w.travel_speed(point)
+        if speed < lowest_speed:
+            lowest_speed = speed
+            worker = w
+    return worker, lowest_speed
+
+
+def vectorized_best(speeds, point):
+    result = speeds.travel_speeds(point, SCAN_DELAY)
+    i = result.argmin()
+    return i, result[i]
+
+
+def main():
+    now = time()
+    for count in args.workers:
+        workers = []
+        speeds = WorkerSpeeds(count)
+        for i in range(count):
+            w = FakeWorker(random_point(), now - uniform(0, 60), i % 4 == 0)
+            workers.append(w)
+            speeds.set_location(i, w.location)
+            speeds.set_last_request(i, w.last_request)
+            speeds.set_busy(i, w.busy)
+
+        points = [random_point() for _ in range(args.points)]
+        _, python_speed = python_best(workers, points[0])
+        _, vector_speed = vectorized_best(speeds, points[0])
+
+        number = max(10, 100000 // count)
+        loop = timeit(lambda: python_best(workers, points[0]), number=number) / number
+        vector = timeit(lambda: vectorized_best(speeds, points[0]), number=number) / number
+        batch = timeit(lambda: speeds.travel_speeds_many(points, SCAN_DELAY).argmin(axis=1),
+                       number=max(1, number // 10)) / max(1, number // 10)
+
+        print('{} workers:'.format(count))
+        print('  lowest speed: loop {:.4f}, vectorized {:.4f}'.format(python_speed, vector_speed))
+        print('  one point:  loop {:8.3f}ms  vectorized {:8.3f}ms  ({:.1f}x)'.format(
+            loop * 1000, vector * 1000, loop / vector))
+        print('  {} points: loop {:8.3f}ms  vectorized {:8.3f}ms'.format(
+            len(points), loop * len(points) * 1000, batch * 1000))
+
+
+if __name__ == '__main__':
+    main()
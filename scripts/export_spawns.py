@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+
+import sys
+
+from argparse import ArgumentParser
+from pathlib import Path
+
+monocle_dir = Path(__file__).resolve().parents[1]
+sys.path.append(str(monocle_dir))
+
+parser = ArgumentParser(description='Export spawn points within the configured boundaries, '
+                        'with their mystery sighting ranges, to a bundle for import_spawns.py.')
+parser.add_argument(
+    'path',
+    help='bundle to write, e.g. spawns.bundle'
+)
+parser.add_argument(
+    '--box',
+    nargs=4,
+    type=float,
+    metavar=('SOUTH', 'WEST', 'NORTH', 'EAST'),
+    help='export this rectangle instead of the configured boundaries'
+)
+parser.add_argument(
+    '--all',
+    action='store_true',
+    help='export every spawn point in the database'
+)
+args = parser.parse_args()
+
+from monocle import bounds
+from monocle.bundle import export_bundle
+
+if args.all:
+    within = None
+elif args.box:
+    south, west, north, east = args.box
+    within = lambda p: south <= p[0] <= north and west <= p[1] <= east
+else:
+    within = lambda p: (bounds.south <= p[0] <= bounds.north
+                        and bounds.west <= p[1] <= bounds.east
+                        and p in bounds)
+
+spawn_count, mystery_count = export_bundle(args.path, within)
+print('Exported {} spawn points and {} mystery ranges to {}.'.format(
+    spawn_count, mystery_count, args.path))
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+
+import sys
+
+from argparse import ArgumentParser
+from datetime import datetime
+from pathlib import Path
+
+monocle_dir = Path(__file__).resolve().parents[1]
+sys.path.append(str(monocle_dir))
+
+parser = ArgumentParser(description='Load a bundle written by export_spawns.py into the '
+                        'configured database and write a spawns snapshot, so that the '
+                        'scanner starts with known spawns instead of bootstrapping.')
+parser.add_argument(
+    'path',
+    help='bundle to read'
+)
+args = parser.parse_args()
+
+from monocle import spawns
+from monocle.bundle import read_bundle, import_spawnpoints, import_mystery_ranges
+
+created, spawnpoints, mysteries = read_bundle(args.path)
+print('Bundle created {:%Y-%m-%d %H:%M}: {} spawn points, {} mystery ranges.'.format(
+    datetime.fromtimestamp(created), len(spawnpoints), len(mysteries)))
+
+inserted, updated = import_spawnpoints(spawnpoints)
+print('Inserted {} spawn points and updated {}.'.format(inserted, updated))
+
+inserted, updated = import_mystery_ranges(mysteries, created)
+print('Inserted {} mystery ranges and updated {}.'.format(inserted, updated))
+
+spawns.update()
+spawns.pickle()
+print('Wrote spawns snapshot: {} known, {} unknown.'.format(len(spawns), len(spawns.unknown)))
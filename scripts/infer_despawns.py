@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+import sys
+
+from argparse import ArgumentParser
+from pathlib import Path
+from time import monotonic
+
+monocle_dir = Path(__file__).resolve().parents[1]
+sys.path.append(str(monocle_dir))
+
+parser = ArgumentParser(description='Infer the despawn times of unknown spawn points from '
+                        'their mystery sightings and mark them as known. Can be run while '
+                        'scanning, e.g. daily from cron, the scanner picks them up on its '
+                        'next spawns update.')
+parser.add_argument(
+    '-m', '--min-sightings',
+    type=int,
+    default=3,
+    help='only infer spawn points with at least this many sightings'
+)
+parser.add_argument(
+    '-t', '--tolerance',
+    type=int,
+    default=120,
+    help='only infer spawn points whose despawn window narrowed to this many seconds'
+)
+parser.add_argument(
+    '-n', '--dry-run',
+    action='store_true',
+    help='report what would be inferred without updating spawn points'
+)
+args = parser.parse_args()
+
+from monocle.db import session_scope, get_unknown_windows, update_inferred_spawnpoints
+from monocle.inference import load_windows, infer
+
+with session_scope() as session:
+    start = monotonic()
+    spawn_ids, firsts, lasts = load_windows(get_unknown_windows(session))
+    loaded = monotonic()
+    inferred = infer(spawn_ids, firsts, lasts, args.min_sightings, args.tolerance)
+    print('Loaded {} sightings of unknown spawn points in {:.1f}s, inferred {} of them in {:.2f}s.'.format(
+        len(spawn_ids), loaded - start, len(inferred[0]), monotonic() - loaded))
+    if args.dry_run:
+        session.rollback()
+    else:
+        inferred_ids, despawn_times, durations = inferred
+        print('Updated {} spawn points.'.format(update_inferred_spawnpoints(session, dict(zip(
+            inferred_ids.tolist(), zip(despawn_times.tolist(), durations.tolist()))))))
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+import sys
+
+from argparse import ArgumentParser
+from asyncio import sleep
+from pathlib import Path
+from time import monotonic
+
+monocle_dir = Path(__file__).resolve().parents[1]
+sys.path.append(str(monocle_dir))
+
+parser = ArgumentParser(description='Feed captured GetMapObjects responses '
+                        'through normalization and the DB processor as fast as possible. '
+                        'Point DB_ENGINE at a scratch database, sightings will be written to it.')
+parser.add_argument(
+    'paths',
+    nargs='*',
+    help='capture segments or folders containing them (default: DIRECTORY/captures)'
+)
+parser.add_argument(
+    '-l', '--loops',
+    type=int,
+    default=1,
+    help='replay the captures this many times'
+)
+args = parser.parse_args()
+
+from monocle import db_proc, sanitized as conf
+from monocle.capture import read_captures
+from monocle.db import MYSTERY_CACHE, REPEAT_CACHE, SIGHTING_CACHE
+from monocle.dispatch import GYM_QUEUE
+from monocle.shared import LOOP, get_logger
+from monocle.worker import Worker
+
+if conf.VECTORIZE_SPEEDS:
+    from monocle.speeds import SPEEDS
+
+
+class ReplayWorker(Worker):
+    """Worker that never touches the network"""
+    def __init__(self):
+        self.worker_no = 0
+        self.log = get_logger('replay')
+        if conf.VECTORIZE_SPEEDS:
+            self.slot = SPEEDS.allocate(self)
+        self.location = (0.0, 0.0)
+        self.pokestops = False
+        self.bag_items = 0
+        self.item_capacity = 350
+        self.next_spin = 0
+
+
+async def replay(worker, paths, loops):
+    records = pokemon = forts = 0
+    parse_time = process_time = 0.0
+    for _ in range(loops):
+        # every loop processes the responses like the first time they were seen
+        for cache in (REPEAT_CACHE, SIGHTING_CACHE, MYSTERY_CACHE):
+            cache.store.clear()
+        worker.cell_digests.clear()
+        captures = read_captures(paths)
+        while True:
+            parse_start = monotonic()
+            try:
+                point, timestamp, map_objects = next(captures)
+            except StopIteration:
+                break
+            process_start = monotonic()
+            parse_time += process_start - parse_start
+            worker.location = point
+            pokemon_seen, forts_seen, _, _ = await worker.process_map_objects(
+                map_objects, encounter_conf=None, notify_conf=False)
+            process_time += monotonic() - process_start
+            records += 1
+            pokemon += pokemon_seen
+            forts += forts_seen
+
+    # no workers fetch gym details here, save the queued gyms as they are
+    GYM_QUEUE.close()
+    drain_start = monotonic()
+    while not db_proc.queue.empty():
+        await sleep(.05, loop=LOOP)
+    drain_time = monotonic() - drain_start
+    return records, pokemon, forts, parse_time, process_time, drain_time
+
+
+def main():
+    paths = args.paths or [str(Path(conf.DIRECTORY) / 'captures')]
+    db_proc.start()
+    start = monotonic()
+    try:
+        records, pokemon, forts, parse_time, process_time, drain_time = LOOP.run_until_complete(
+            replay(ReplayWorker(), paths, args.loops))
+    finally:
+        db_proc.stop()
+        db_proc.join()
+    total = monotonic() - start
+
+    if not records:
+        print('No captured responses found.')
+        return
+    print('Replayed {} responses: {} Pokemon, {} forts'.format(records, pokemon, forts))
+    print('Parsing: {:.3f}s, {:.1f}µs per response'.format(
+        parse_time, parse_time / records * 1000000))
+    print('Normalization and cache checks: {:.3f}s, {:.1f}µs per response'.format(
+        process_time, process_time / records * 1000000))
+    if Worker.g['cells']:
+        print('Unchanged map cells skipped: {} of {}'.format(
+            Worker.g['cells_skipped'], Worker.g['cells']))
+    print('DB queue drained {:.3f}s after the last response, {} objects saved'.format(
+        drain_time, db_proc.count))
+    print('Total: {:.3f}s, {:.1f} responses per second'.format(total, records / total))
+
+
+if __name__ == '__main__':
+    main()
@@ -40,5 +40,6 @@ setup(
         'socks': ['aiosocks>=0.2.3'],
         'sanic': ['sanic>=0.4', 'asyncpg>=0.8', 'ujson>=1.35'],
         'google': ['gpsoauth>=0.4.0'],
+        'numpy': ['numpy>=1.11'],
     }
 )
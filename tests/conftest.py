@@ -0,0 +1,25 @@
+import sys
+
+from os import mkdir
+from os.path import join
+from pathlib import Path
+from tempfile import mkdtemp
+from types import ModuleType
+
+# Modules that read the configuration get these settings instead of a
+# config.py, with every file they write kept in a temporary directory.
+ROOT = Path(__file__).resolve().parents[1]
+DIRECTORY = mkdtemp(prefix='monocle-tests-')
+mkdir(join(DIRECTORY, 'pickles'))
+
+config = ModuleType('monocle.config')
+config.DIRECTORY = DIRECTORY
+config.DB_ENGINE = 'sqlite:///' + join(DIRECTORY, 'db.sqlite')
+config.ACCOUNTS = [('tester', 'password', 'ptc')]
+config.GRID = (2, 2)
+config.MAP_START = (40.7913, -111.9398)
+config.MAP_END = (40.7143, -111.8046)
+
+sys.path.insert(0, str(ROOT))
+import monocle
+monocle.config = sys.modules['monocle.config'] = config
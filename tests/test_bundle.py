@@ -0,0 +1,110 @@
+from time import time
+
+import pytest
+
+bundle = pytest.importorskip('monocle.bundle')
+from monocle import db
+
+NOW = int(time())
+SPAWNPOINTS = [
+    {'spawn_id': 1, 'lat': 40.75, 'lon': -111.875, 'despawn_time': 1200,
+     'duration': 60, 'updated': NOW, 'failures': 0},
+    {'spawn_id': 2, 'lat': 40.8125, 'lon': -111.9375, 'despawn_time': None,
+     'duration': None, 'updated': None, 'failures': 0}
+]
+
+
+def add_mystery(session, spawn_id, encounter_id, first, last):
+    session.add(db.Mystery(spawn_id=spawn_id, encounter_id=encounter_id, pokemon_id=16,
+                           first_seen=NOW, first_seconds=first, last_seconds=last,
+                           seen_range=last - first))
+
+
+@pytest.fixture
+def tables():
+    db.Base.metadata.create_all(db._engine)
+    yield
+    with db.session_scope() as session:
+        session.query(db.MysteryRange).delete()
+        session.query(db.Mystery).delete()
+        session.query(db.Spawnpoint).delete()
+
+
+@pytest.fixture
+def scanned(tables):
+    with db.session_scope() as session:
+        session.bulk_insert_mappings(db.Spawnpoint, SPAWNPOINTS)
+        add_mystery(session, 2, 10, 100, 300)
+        add_mystery(session, 2, 11, 50, 200)
+        # not a spawn point in the bundle
+        add_mystery(session, 3, 12, 0, 10)
+
+
+def mystery_ranges():
+    with db.session_scope() as session:
+        return db.get_mystery_ranges(session)
+
+
+def test_round_trip(scanned, tmp_path):
+    path = str(tmp_path / 'spawns.bundle')
+    assert bundle.export_bundle(path) == (2, 1)
+    created, spawnpoints, mysteries = bundle.read_bundle(path)
+    assert abs(created - time()) < 60
+    assert sorted(spawnpoints, key=lambda s: s['spawn_id']) == SPAWNPOINTS
+    assert mysteries == {2: (50, 300)}
+
+    with db.session_scope() as session:
+        session.query(db.Mystery).delete()
+        session.query(db.Spawnpoint).delete()
+    assert bundle.import_spawnpoints(spawnpoints) == (2, 0)
+    assert bundle.import_mystery_ranges(mysteries, created) == (1, 0)
+    assert mystery_ranges() == {2: (50, 300)}
+    with db.session_scope() as session:
+        # never taken for a sighting, whose range decides the duration
+        assert session.query(db.Mystery).count() == 0
+        assert db.get_widest_range(session, 2) is None
+
+    # importing the same bundle again changes nothing
+    assert bundle.import_spawnpoints(spawnpoints) == (0, 0)
+    assert bundle.import_mystery_ranges(mysteries, created) == (0, 0)
+
+
+def test_export_within(scanned, tmp_path):
+    path = str(tmp_path / 'spawns.bundle')
+    assert bundle.export_bundle(path, within=lambda p: p[0] < 40.8) == (1, 0)
+    _, spawnpoints, mysteries = bundle.read_bundle(path)
+    assert [s['spawn_id'] for s in spawnpoints] == [1]
+    assert mysteries == {}
+
+
+def test_import_updates_older_rows(tables):
+    old = dict(SPAWNPOINTS[1])
+    bundle.import_spawnpoints([old])
+    known = dict(old, despawn_time=600, duration=60, updated=NOW)
+    assert bundle.import_spawnpoints([known]) == (0, 1)
+    with db.session_scope() as session:
+        spawn = session.query(db.Spawnpoint).filter(db.Spawnpoint.spawn_id == 2).one()
+        assert (spawn.despawn_time, spawn.duration, spawn.updated) == (600, 60, NOW)
+
+
+def test_import_widens_ranges(tables):
+    assert bundle.import_mystery_ranges({2: (100, 300)}, NOW) == (1, 0)
+    assert bundle.import_mystery_ranges({2: (50, 200)}, NOW) == (0, 1)
+    assert mystery_ranges() == {2: (50, 300)}
+
+
+def test_imported_ranges_merge_with_sightings(tables):
+    bundle.import_mystery_ranges({2: (100, 300), 4: (10, 20)}, NOW)
+    with db.session_scope() as session:
+        add_mystery(session, 2, 10, 50, 200)
+    assert mystery_ranges() == {2: (50, 300), 4: (10, 20)}
+    assert bundle.import_mystery_ranges({5: (0, 10)}, db.conf.LAST_MIGRATION - 1) == (1, 0)
+    assert 5 not in mystery_ranges()
+
+
+def test_not_a_bundle(tmp_path):
+    path = tmp_path / 'spawns.bundle'
+    with bundle.gzip_open(str(path), 'wb') as f:
+        f.write(b'not a bundle')
+    with pytest.raises(ValueError):
+        bundle.read_bundle(str(path))
@@ -0,0 +1,137 @@
+from asyncio import sleep
+
+import pytest
+
+cellcache = pytest.importorskip('monocle.cellcache')
+from monocle.shared import LOOP
+
+
+class CellIds:
+    """Stands in for pogeo's cell ID lookup and counts the calls"""
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, point):
+        self.calls += 1
+        lat, lon = point
+        return [int(lat * 10000), int(-lon * 10000), self.calls]
+
+
+@pytest.fixture
+def folder(tmp_path, monkeypatch):
+    monkeypatch.setattr(cellcache.conf, 'DIRECTORY', str(tmp_path))
+    return tmp_path / 'pickles'
+
+
+def test_pack_point_sorts_like_points():
+    points = [(-45.5, 170.25), (-45.5, 170.5), (12.0, -120.0), (40.75, -111.9)]
+    packed = [cellcache.pack_point(p) for p in points]
+    assert packed == sorted(packed)
+    assert len(set(packed)) == len(points)
+
+
+def test_pending_cells_are_reused(folder):
+    get_cell_ids = CellIds()
+    cache = cellcache.CellCache(get_cell_ids)
+    try:
+        cells = cache.get((40.750001, -111.900001))
+        assert cache.get((40.75, -111.9)) == cells
+        assert get_cell_ids.calls == 1
+        assert len(cache) == 1
+    finally:
+        cache.close()
+
+
+def test_cells_are_read_back(folder):
+    get_cell_ids = CellIds()
+    cache = cellcache.CellCache(get_cell_ids)
+    points = [(40.75 + i / 1000, -111.9 - i / 1000) for i in range(50)]
+    expected = [cache.get(p) for p in points]
+    cache.close()
+
+    reopened = cellcache.CellCache(get_cell_ids)
+    try:
+        assert len(reopened) == len(points)
+        assert [reopened.get(p) for p in points] == expected
+        assert get_cell_ids.calls == len(points)
+    finally:
+        reopened.close()
+
+
+def test_compact_merges_new_points(folder):
+    get_cell_ids = CellIds()
+    cache = cellcache.CellCache(get_cell_ids)
+    try:
+        first = [cache.get((40.75, -111.9 - i / 100)) for i in range(4)]
+        LOOP.run_until_complete(cache.compact())
+        assert not cache.pending
+        second = [cache.get((40.76, -111.9 - i / 100)) for i in range(4)]
+        LOOP.run_until_complete(cache.compact())
+        assert not cache.pending
+        assert len(cache) == 8
+        assert [cache.get((40.75, -111.9 - i / 100)) for i in range(4)] == first
+        assert [cache.get((40.76, -111.9 - i / 100)) for i in range(4)] == second
+        assert get_cell_ids.calls == 8
+    finally:
+        cache.close()
+
+
+def test_one_compaction_is_scheduled(folder):
+    cache = cellcache.CellCache(CellIds(), batch=4)
+    try:
+        points = [(40.75, -111.9 - i / 100) for i in range(6)]
+        for point in points:
+            cache.get(point)
+        assert cache.compacting
+        for _ in range(500):
+            if not cache.compacting:
+                break
+            LOOP.run_until_complete(sleep(.01))
+        assert not cache.pending
+        assert len(cache) == len(points)
+        assert cache.next_compaction == 4
+    finally:
+        cache.close()
+
+
+def test_read_only_while_locked(folder):
+    writer = cellcache.CellCache(CellIds())
+    try:
+        if cellcache.flock is None:
+            pytest.skip('file locking is not available')
+        reader = cellcache.CellCache(CellIds())
+        assert writer.writer
+        assert not reader.writer
+        reader.close()
+    finally:
+        writer.close()
+
+
+@pytest.mark.parametrize('damage', ['truncate', 'remove_data', 'bad_magic'])
+def test_damaged_files_are_rebuilt(folder, damage):
+    get_cell_ids = CellIds()
+    cache = cellcache.CellCache(get_cell_ids)
+    cache.get((40.75, -111.9))
+    cache.close()
+
+    index = folder / 'cells.idx'
+    if damage == 'truncate':
+        index.write_bytes(index.read_bytes()[:3])
+    elif damage == 'remove_data':
+        (folder / 'cells.dat').unlink()
+    else:
+        index.write_bytes(b'XXXX' + index.read_bytes()[4:])
+
+    cache = cellcache.CellCache(get_cell_ids)
+    try:
+        assert len(cache) == 0
+        assert not index.exists()
+        cache.get((40.75, -111.9))
+        assert get_cell_ids.calls == 2
+    finally:
+        cache.close()
+    cache = cellcache.CellCache(get_cell_ids)
+    try:
+        assert len(cache) == 1
+    finally:
+        cache.close()
@@ -0,0 +1,303 @@
+from asyncio import Lock, sleep
+from time import time
+from types import SimpleNamespace
+
+import pytest
+
+dispatch = pytest.importorskip('monocle.dispatch')
+from monocle.shared import LOOP
+
+
+class RecordingQueue(dispatch.WorkerQueue):
+    """Serves any job with a worker that isn't marked as out of reach"""
+    def __init__(self):
+        super().__init__('test-queue')
+        self.served_by = []
+        self.finished = []
+
+    def reachable(self, worker, job):
+        return worker.reach
+
+    async def serve(self, worker, job):
+        if job.item == 'fail':
+            raise RuntimeError(job.item)
+        self.served_by.append((job.item, worker.worker_no))
+
+    def finish(self, job):
+        self.finished.append(job.item)
+
+
+class Worker:
+    """What the queues use of a worker, with requests that always succeed"""
+    def __init__(self, worker_no, location, reach=True, speed=0):
+        self.worker_no = worker_no
+        self.location = location
+        self.reach = reach
+        self.speed = speed
+        self.busy = Lock()
+        self.authenticated = True
+        self.gyms = []
+
+    def travel_speed(self, point):
+        return self.speed
+
+    async def gym_get_info(self, gym):
+        self.gyms.append(gym.external_id)
+        gym.name = 'Gym'
+
+    async def encounter(self, sighting, spawn_point_id):
+        for field in dispatch.EncounterCache.fields:
+            setattr(sighting, field, 1)
+
+
+def make_job(item, point=(40.75, -111.9), wait=60, priority=0):
+    return dispatch.Job(item, point, time() + wait, priority)
+
+
+def make_gym(gym_id, lat=40.75, lon=-111.9):
+    return SimpleNamespace(external_id=gym_id, lat=lat, lon=lon)
+
+
+def make_sighting(encounter_id, expires=60):
+    return SimpleNamespace(encounter_id=encounter_id, lat=40.75, lon=-111.9,
+                           expire_timestamp=time() + expires)
+
+
+def settle():
+    LOOP.run_until_complete(sleep(.01))
+
+
+@pytest.fixture
+def saved(monkeypatch):
+    saved = []
+    monkeypatch.setattr(dispatch.db_proc, 'add', saved.append)
+    return saved
+
+
+def test_worker_queue_is_abstract():
+    with pytest.raises(TypeError):
+        dispatch.WorkerQueue('abstract')
+
+
+def test_nearest_idle_worker_serves():
+    queue = RecordingQueue()
+    workers = [Worker(0, (40.70, -111.9)), Worker(1, (40.76, -111.9))]
+    queue.jobs['a'] = make_job('a')
+    queue.dispatch(workers)
+    settle()
+    assert queue.served_by == [('a', 1)]
+    assert queue.finished == ['a']
+    assert queue.served == 1
+    assert not queue.jobs
+
+
+def test_busy_and_unauthenticated_workers_are_skipped():
+    queue = RecordingQueue()
+    busy = Worker(0, (40.75, -111.9))
+    LOOP.run_until_complete(busy.busy.acquire())
+    offline = Worker(1, (40.75, -111.9))
+    offline.authenticated = False
+    queue.jobs['a'] = make_job('a')
+    queue.dispatch([busy, offline])
+    settle()
+    assert 'a' in queue.jobs
+    assert not queue.finished
+    busy.busy.release()
+
+
+def test_lowest_priority_first():
+    queue = RecordingQueue()
+    queue.jobs['late'] = make_job('late', priority=2)
+    queue.jobs['early'] = make_job('early', priority=1)
+    queue.dispatch([Worker(0, (40.75, -111.9))])
+    settle()
+    assert queue.served_by == [('early', 0)]
+    assert list(queue.jobs) == ['late']
+
+
+def test_expired_jobs_are_finished():
+    queue = RecordingQueue()
+    queue.jobs['a'] = make_job('a', wait=-1)
+    queue.dispatch([Worker(0, (40.75, -111.9))])
+    settle()
+    assert queue.finished == ['a']
+    assert queue.expired == 1
+    assert not queue.served_by
+
+
+def test_unreachable_jobs_stay_queued():
+    queue = RecordingQueue()
+    queue.jobs['a'] = make_job('a')
+    queue.dispatch([Worker(0, (40.75, -111.9), reach=False)])
+    settle()
+    assert 'a' in queue.jobs
+    assert not queue.finished
+
+
+def test_failed_jobs_are_finished_once():
+    queue = RecordingQueue()
+    worker = Worker(0, (40.75, -111.9))
+    LOOP.run_until_complete(queue.serve_job(worker, 'fail', make_job('fail')))
+    assert queue.finished == ['fail']
+    assert queue.served == 0
+    assert not worker.busy.locked()
+
+
+def test_close_finishes_waiting_jobs():
+    queue = RecordingQueue()
+    queue.jobs['a'] = make_job('a')
+    queue.jobs['b'] = make_job('b')
+    queue.close()
+    assert sorted(queue.finished) == ['a', 'b']
+    assert not queue.jobs
+    assert not queue.running
+
+
+def test_gym_queue_keeps_the_latest_sighting(saved):
+    queue = dispatch.GymQueue()
+    first, second = make_gym('gym'), make_gym('gym')
+    queue.put(first)
+    queue.put(second)
+    assert len(queue) == 1
+    assert queue.jobs['gym'].item is second
+
+    queue.fetched['other'] = time()
+    skipped = make_gym('other')
+    queue.put(skipped, interval=60)
+    assert 'other' not in queue.jobs
+    assert saved == [skipped]
+    assert queue.skipped == 1
+
+
+def test_gym_queue_range_and_speed(saved):
+    queue = dispatch.GymQueue()
+    queue.put(make_gym('gym'))
+    far = Worker(0, (40.76, -111.9))
+    fast = Worker(1, (40.75, -111.9), speed=1000)
+    queue.dispatch([far, fast])
+    settle()
+    assert 'gym' in queue.jobs
+    near = Worker(2, (40.7501, -111.9))
+    queue.dispatch([far, near])
+    settle()
+    assert near.gyms == ['gym']
+    assert saved[0].name == 'Gym'
+    assert queue.dropped == 0
+
+
+def test_gym_queue_falls_back_to_the_visiting_worker(saved):
+    queue = dispatch.GymQueue()
+    visitor = Worker(0, (40.7501, -111.9))
+    LOOP.run_until_complete(visitor.busy.acquire())
+    queue.put(make_gym('gym'), visitor, wait=-1)
+    queue.dispatch([visitor])
+    settle()
+    # waits for the visit to end
+    assert not saved
+    visitor.busy.release()
+    settle()
+    assert visitor.gyms == ['gym']
+    assert len(saved) == 1
+    assert queue.dropped == 0
+
+
+def test_gym_queue_drops_gyms_out_of_reach(saved):
+    queue = dispatch.GymQueue()
+    visitor = Worker(0, (40.76, -111.9))
+    queue.put(make_gym('gym'), visitor, wait=-1)
+    queue.dispatch([])
+    settle()
+    assert not visitor.gyms
+    assert len(saved) == 1
+    assert queue.dropped == 1
+
+
+def test_gym_queue_prunes_fetch_times(saved):
+    queue = dispatch.GymQueue()
+    queue.fetched['old'] = time() - 120
+    queue.fetched['recent'] = time() - 30
+    queue.put(make_gym('gym'), interval=60)
+    assert set(queue.fetched) == {'recent'}
+
+
+def test_job_requeued_when_worker_moved_away():
+    queue = RecordingQueue()
+    job = make_job('a')
+    worker = Worker(0, (40.75, -111.9), reach=False)
+    LOOP.run_until_complete(queue.serve_job(worker, 'a', job))
+    assert queue.jobs == {'a': job}
+    assert not queue.finished
+
+
+def test_encounter_deadline(saved):
+    queue = dispatch.EncounterQueue()
+    now = time()
+    queue.put(make_sighting(1, expires=60), 'spawn', wait=300, margin=15)
+    assert now + 44 <= queue.jobs[1].deadline <= now + 46
+    queue.put(make_sighting(2, expires=600), 'spawn', wait=30)
+    assert now + 29 <= queue.jobs[2].deadline <= now + 31
+
+
+def test_encounter_callback_after_encounter(saved):
+    queue = dispatch.EncounterQueue()
+    notified = []
+    sighting = make_sighting(1)
+
+    async def notify():
+        notified.append(sighting.individual_attack)
+
+    queue.put(sighting, 'spawn', notify)
+    queue.dispatch([Worker(0, (40.75, -111.9))])
+    settle()
+    assert notified == [1]
+    assert len(saved) == 1
+
+
+def test_repeat_sightings_get_cached_results(saved):
+    queue = dispatch.EncounterQueue()
+    queue.put(make_sighting(1), 'spawn')
+    queue.dispatch([Worker(0, (40.75, -111.9))])
+    settle()
+
+    notified = []
+    repeat = make_sighting(1)
+
+    async def notify():
+        notified.append(repeat.individual_attack)
+
+    queue.put(repeat, 'spawn', notify)
+    settle()
+    assert not queue.jobs
+    assert notified == [1]
+    assert queue.results.hits == 1
+
+
+def test_repeat_sightings_wait_for_encounters_in_progress(saved):
+    queue = dispatch.EncounterQueue()
+    queue.put(make_sighting(1), 'spawn')
+
+    notified = []
+    repeat = make_sighting(1)
+
+    async def notify():
+        notified.append(repeat.individual_attack)
+
+    queue.put(repeat, 'spawn', notify)
+    assert len(queue) == 1
+    settle()
+    assert not notified
+    queue.dispatch([Worker(0, (40.75, -111.9))])
+    settle()
+    assert notified == [1]
+
+
+def test_failed_encounters_are_tried_again(saved):
+    queue = dispatch.EncounterQueue()
+    queue.put(make_sighting(1, expires=60), 'spawn', wait=-1)
+    job = queue.jobs[1]
+    queue.dispatch([])
+    settle()
+    assert job.future.result() is None
+    assert queue.results.get(1) is None
+    queue.put(make_sighting(1), 'spawn')
+    assert len(queue) == 1
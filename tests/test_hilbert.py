@@ -0,0 +1,37 @@
+from types import SimpleNamespace
+
+from monocle.hilbert import hilbert_index
+
+BOUNDS = SimpleNamespace(north=41.0, south=40.0, east=-111.0, west=-112.0)
+
+
+def cell_center(x, y, order):
+    side = 1 << order
+    return (BOUNDS.south + (y + .5) / side * (BOUNDS.north - BOUNDS.south),
+            BOUNDS.west + (x + .5) / side * (BOUNDS.east - BOUNDS.west))
+
+
+def test_hilbert_index_visits_every_cell_once():
+    order = 3
+    side = 1 << order
+    cells = {hilbert_index(cell_center(x, y, order), BOUNDS, order): (x, y)
+             for x in range(side) for y in range(side)}
+    assert sorted(cells) == list(range(side * side))
+    # consecutive positions along the curve are neighbouring cells
+    for i in range(1, side * side):
+        (x1, y1), (x2, y2) = cells[i - 1], cells[i]
+        assert abs(x1 - x2) + abs(y1 - y2) == 1
+
+
+def test_hilbert_index_clamps_points_outside_bounds():
+    order = 4
+    last = (1 << order) ** 2
+    for point in ((39.0, -113.0), (42.0, -110.0), (40.5, -110.0), (39.0, -111.5)):
+        assert 0 <= hilbert_index(point, BOUNDS, order) < last
+    assert hilbert_index((39.0, -113.0), BOUNDS, order) == \
+        hilbert_index((BOUNDS.south, BOUNDS.west), BOUNDS, order)
+
+
+def test_hilbert_index_with_flat_bounds():
+    flat = SimpleNamespace(north=40.0, south=40.0, east=-111.0, west=-111.0)
+    assert hilbert_index((40.0, -111.0), flat, 2) == 0
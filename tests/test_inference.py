@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+inference = pytest.importorskip('monocle.inference')
+
+
+def sightings(*spawns):
+    """Arrays sorted by spawn_id from (spawn_id, [(first, last), ...]) pairs"""
+    rows = sorted((spawn_id, first, last) for spawn_id, windows in spawns
+                  for first, last in windows)
+    rows = np.array(rows, dtype=np.int64)
+    return rows[:, 0], rows[:, 1], rows[:, 2]
+
+
+# an hour spawn despawning between 990 and 1010, the first sighting spans
+# almost the whole hour so it can't be a 30 minute spawn
+HOUR = 1, [(1010, 4590), (1400, 1500), (2400, 3300)]
+# the same with its window wrapping around the hour, from 3585 to 5
+WRAPPED = 2, [(5, 3585), (800, 900), (1800, 2300)]
+# seen briefly, which fits either duration
+BRIEF = 3, [(100, 200), (1000, 1100), (1900, 2000)]
+
+
+def test_feasible_window():
+    group = np.zeros(3, dtype=np.int64)
+    _, firsts, lasts = sightings(HOUR)
+    hour = inference.feasible(group, firsts, lasts, 3600, 1)
+    assert hour.shape == (1, 3600)
+    assert np.flatnonzero(hour[0]).tolist() == list(range(990, 1011))
+    assert not inference.feasible(group, firsts, lasts, 1800, 1).any()
+
+
+def test_infer_hour_spawns():
+    spawn_ids, despawn_times, durations = inference.infer(*sightings(HOUR, WRAPPED))
+    assert spawn_ids.tolist() == [1, 2]
+    # the latest possible second is used
+    assert despawn_times.tolist() == [1010, 5]
+    assert durations.tolist() == [60, 60]
+
+
+def test_infer_leaves_undecided_spawns_unknown():
+    spawn_ids, _, _ = inference.infer(*sightings(BRIEF))
+    assert len(spawn_ids) == 0
+
+
+def test_infer_needs_enough_sightings():
+    spawn_id, windows = HOUR
+    spawn_ids, _, _ = inference.infer(*sightings((spawn_id, windows[:2])))
+    assert len(spawn_ids) == 0
+    spawn_ids, _, _ = inference.infer(*sightings((spawn_id, windows[:2])), min_sightings=2)
+    assert spawn_ids.tolist() == [1]
+
+
+def test_infer_tolerance():
+    spawn_ids, _, _ = inference.infer(*sightings(HOUR), tolerance=10)
+    assert len(spawn_ids) == 0
+
+
+def test_infer_in_chunks():
+    arrays = sightings(HOUR, WRAPPED, BRIEF)
+    expected = inference.infer(*arrays)
+    for result, chunked in zip(expected, inference.infer(*arrays, chunk=1)):
+        assert result.tolist() == chunked.tolist()
+
+
+def test_infer_without_sightings():
+    empty = np.empty(0, dtype=np.int64)
+    assert all(len(a) == 0 for a in inference.infer(empty, empty, empty))
+
+
+def test_load_windows_sorts_by_spawn_id():
+    rows = [(2, 5, 3585), (1, 1010, 4590), (2, 800, 900), (1, 1400, 1500)]
+    spawn_ids, firsts, lasts = inference.load_windows(rows, batch=3)
+    assert spawn_ids.tolist() == [1, 1, 2, 2]
+    # sightings of the same spawn point keep their order
+    assert firsts.tolist() == [1010, 1400, 5, 800]
+    assert lasts.tolist() == [4590, 1500, 3585, 900]
+
+
+def test_load_windows_without_rows():
+    assert all(len(a) == 0 for a in inference.load_windows(iter(())))
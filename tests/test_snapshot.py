@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+
+import pytest
+
+snapshot = pytest.importorskip('monocle.snapshot')
+KnownSpawns = snapshot.KnownSpawns
+
+ITEMS = [((40.75, -111.9), (1, 30)),
+         ((40.76, -111.91), (2, 1200)),
+         ((40.77, -111.92), (3, 3500))]
+
+
+def test_known_spawns_follow_the_array():
+    known = KnownSpawns.from_items(ITEMS)
+    assert len(known) == 3
+    assert list(known) == [p for p, _ in ITEMS]
+    assert list(known.values()) == [s for _, s in ITEMS]
+    assert list(known.items()) == ITEMS
+    assert list(reversed(known)) == [p for p, _ in reversed(ITEMS)]
+
+
+def test_known_spawns_lookups():
+    known = KnownSpawns.from_items(ITEMS)
+    assert known.index is None
+    assert known[(40.76, -111.91)] == (2, 1200)
+    assert (40.77, -111.92) in known
+    assert (40.78, -111.93) not in known
+    with pytest.raises(KeyError):
+        known[(40.78, -111.93)]
+
+
+def test_known_spawns_extra_points():
+    known = KnownSpawns.from_items(ITEMS)
+    point = 40.78, -111.93
+    known[point] = None
+    assert len(known) == 4
+    assert point in known
+    assert known[point] is None
+    assert list(known)[-1] == point
+    assert next(reversed(known)) == point
+
+
+def test_known_spawns_copy():
+    known = KnownSpawns.from_items(ITEMS)
+    assert (40.75, -111.9) in known
+    other = known.copy()
+    other[(40.78, -111.93)] = None
+    assert other.index is known.index
+    assert len(known) == 3
+    assert len(other) == 4
+
+
+def test_empty_known_spawns():
+    known = KnownSpawns.from_items(())
+    assert not known
+    assert list(known.items()) == []
+
+
+def test_save_and_restore(tmp_path):
+    folder = str(tmp_path / 'spawns')
+    state = {'class_version': 1}
+    spawns = SimpleNamespace(
+        known=KnownSpawns.from_items(ITEMS),
+        despawn_times={1: 1830, 2: 3000, 3: 1700},
+        values={2: 1.5},
+        unknown={(40.8, -111.95): 4},
+        cell_points={(40.81, -111.96)})
+    spawns.known[(40.78, -111.93)] = (5, 600)
+    snapshot.save(spawns, state, folder)
+
+    restored = SimpleNamespace(cell_points=set())
+    assert snapshot.load({'class_version': 2}, folder) is None
+    snapshot.restore(restored, snapshot.load(state, folder))
+    # points added later are sorted into the array by spawn_seconds
+    assert list(restored.known.items()) == [ITEMS[0], ((40.78, -111.93), (5, 600))] + ITEMS[1:]
+    assert restored.despawn_times == spawns.despawn_times
+    assert restored.values == spawns.values
+    assert restored.unknown == spawns.unknown
+    assert restored.cell_points == spawns.cell_points
+
+
+def test_partly_replaced_snapshot_is_ignored(tmp_path):
+    folder = str(tmp_path / 'spawns')
+    spawns = SimpleNamespace(known=KnownSpawns.from_items(ITEMS), despawn_times={},
+                             values={}, unknown={})
+    snapshot.save(spawns, {}, folder)
+    spawns.known = KnownSpawns.from_items(ITEMS[:1])
+    # as if interrupted before meta.json was replaced
+    snapshot.np.save(str(tmp_path / 'spawns' / 'known.npy'), spawns.known.array)
+    assert snapshot.load({}, folder) is None